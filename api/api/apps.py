@@ -1,7 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ApiConfig(AppConfig):
     name = "api"
     verbose_name = "API"
     default_auto_field = "django.db.models.AutoField"
+
+    def ready(self):
+        # Connect the receivers of the ASGI lifespan signals, which are sent
+        # before any request imports the controllers
+        import api.controllers.search_controller  # noqa: F401
+        from api.utils.request_counters import instrument_redis
+
+        if settings.ENABLE_REDIS_ROUND_TRIP_COUNTING:
+            instrument_redis()
@@ -1,33 +1,47 @@
 from __future__ import annotations
 
 import functools
+import inspect
 import pprint
 import time
-from itertools import accumulate
 from math import ceil
 
 from django.conf import settings
 
 import structlog
-from elasticsearch import BadRequestError, NotFoundError
-from elasticsearch_dsl import Search
+from elasticsearch import ApiError, BadRequestError, NotFoundError, TransportError
+from elasticsearch_dsl import MultiSearch, Search
+from elasticsearch_dsl.response import Response
 
-from api.utils.dead_link_mask import get_query_hash, get_query_mask
+from api.utils.async_elasticsearch import get_async_es_client
+from api.utils.dead_link_mask import (
+    get_query_hash,
+    get_query_mask,
+    migrate_legacy_query_mask,
+)
+from api.utils.request_counters import increment_request_counter
+from api.utils.stage_timing import time_stage
 
 
 logger = structlog.get_logger(__name__)
 
 
-def log_timing_info(func):
-    @functools.wraps(func)
-    def wrapper(*args, es_query, **kwargs):
-        start_time = time.time()
+def count_es_round_trip() -> int:
+    """
+    Increment the number of Elasticsearch round trips made by the current request.
+
+    :return: The number of round trips made so far, including this one.
+    """
+    return increment_request_counter("es_round_trips")
 
-        # Call the original function
-        result = func(*args, **kwargs)
 
+def log_timing_info(func):
+    def log(result, start_time, es_query):
         response_time_in_ms = int((time.time() - start_time) * 1000)
-        if hasattr(result, "took"):
+        if isinstance(result, list):
+            # Multi search responses report ``took`` for each search
+            es_time_in_ms = max((r.took for r in result), default=None)
+        elif hasattr(result, "took"):
             es_time_in_ms = result.took
         else:
             es_time_in_ms = result.get("took")
@@ -37,8 +51,33 @@ def log_timing_info(func):
             response_time=response_time_in_ms,
             es_time=es_time_in_ms,
             es_query=es_query,
+            es_round_trip=count_es_round_trip(),
         )
 
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, es_query, **kwargs):
+            start_time = time.time()
+
+            # Await the original function
+            with time_stage("es"):
+                result = await func(*args, **kwargs)
+
+            log(result, start_time, es_query)
+            return result
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, es_query, **kwargs):
+        start_time = time.time()
+
+        # Call the original function
+        with time_stage("es"):
+            result = func(*args, **kwargs)
+
+        log(result, start_time, es_query)
         return result
 
     return wrapper
@@ -60,6 +99,118 @@ def get_es_response(s, *args, **kwargs):
     return search_response
 
 
+@log_timing_info
+async def aget_es_response(s: Search, *args, **kwargs) -> Response:
+    """
+    Execute the search using the async Elasticsearch client.
+
+    This is the async counterpart to ``get_es_response``. The ``Search`` object
+    is still built by ``elasticsearch_dsl`` as usual and the response is wrapped
+    in the same ``Response`` class that ``Search.execute`` would have used.
+    """
+
+    if settings.VERBOSE_ES_RESPONSE:
+        logger.info(pprint.pprint(s.to_dict()))
+
+    es = await get_async_es_client()
+    try:
+        raw_response = await es.search(index=s._index, body=s.to_dict(), **s._params)
+        search_response = s._response_class(s, raw_response.body)
+
+        if settings.VERBOSE_ES_RESPONSE:
+            logger.info(pprint.pprint(search_response.to_dict()))
+    except (BadRequestError, NotFoundError) as e:
+        raise ValueError(e)
+
+    return search_response
+
+
+@log_timing_info
+async def aget_es_multi_response(
+    searches: list[Search], *args, **kwargs
+) -> list[Response]:
+    """
+    Execute several searches in a single ``_msearch`` round trip.
+
+    The index and parameters of each ``Search`` are sent in its own header, so
+    searches against different indices can be combined freely. Errors for
+    individual searches are raised the same way as in ``aget_es_response``.
+
+    :param searches: The searches to execute.
+    :return: The responses, in the same order as ``searches``.
+    """
+
+    ms = MultiSearch()
+    for s in searches:
+        ms = ms.add(s)
+
+    if settings.VERBOSE_ES_RESPONSE:
+        logger.info(pprint.pprint(ms.to_dict()))
+
+    es = await get_async_es_client()
+    try:
+        raw_response = await es.msearch(body=ms.to_dict())
+    except (BadRequestError, NotFoundError) as e:
+        raise ValueError(e)
+
+    search_responses = []
+    for s, r in zip(searches, raw_response["responses"]):
+        if r.get("error"):
+            e = ApiError(r["error"].get("type", "N/A"), meta=raw_response.meta, body=r)
+            if r.get("status") in {400, 404}:
+                raise ValueError(e)
+            raise e
+        search_responses.append(s._response_class(s, r))
+
+    if settings.VERBOSE_ES_RESPONSE:
+        logger.info(pprint.pprint([r.to_dict() for r in search_responses]))
+
+    return search_responses
+
+
+@log_timing_info
+async def aopen_point_in_time(
+    index: str, keep_alive: str, preference: str | None = None, *args, **kwargs
+) -> dict:
+    """
+    Open a point in time (PIT) on the index, to search a snapshot of it.
+
+    Searches with the PIT must not set an index or preference, as they are
+    those the PIT was opened with.
+
+    :param index: The index of the PIT.
+    :param keep_alive: How long to keep the PIT open, as an ES time unit.
+    :param preference: The nodes or shards to route the searches to.
+    :return: The response, with the ID of the PIT at ``id``.
+    """
+
+    es = await get_async_es_client()
+    try:
+        raw_response = await es.open_point_in_time(
+            index=index, keep_alive=keep_alive, preference=preference
+        )
+    except (BadRequestError, NotFoundError) as e:
+        raise ValueError(e)
+
+    return raw_response.body
+
+
+async def aclose_point_in_time(pit_id: str) -> None:
+    """
+    Close the point in time, freeing its resources before it expires.
+
+    Closing is best effort, as the PIT expires anyway after its keep alive.
+    """
+
+    es = await get_async_es_client()
+    count_es_round_trip()
+    try:
+        with time_stage("es"):
+            await es.close_point_in_time(id=pit_id)
+    except (ApiError, TransportError) as e:
+        logger.warning("Could not close point in time", error=str(e))
+
+
 @log_timing_info
 def get_raw_es_response(index, body, *args, **kwargs):
     return settings.ES.search(index=index, body=body, *args, **kwargs)
@@ -87,7 +238,7 @@ def _unmasked_query_end(page_size, page):
 
 
 def _paginate_with_dead_link_mask(
-    s: Search, page_size: int, page: int
+    s: Search, page_size: int, page: int, query_hash: str | None = None
 ) -> tuple[int, int]:
     """
     Return the start and end of the results slice, given the query, page and page size.
@@ -100,21 +251,24 @@ def _paginate_with_dead_link_mask(
     :param s: The elasticsearch Search object
     :param page_size: How big the page should be.
     :param page: The page number.
+    :param query_hash: The hash of the query, computed from ``s`` if not given.
     :return: Tuple of start and end.
     """
-    query_hash = get_query_hash(s)
+    query_hash = query_hash or get_query_hash(s)
     query_mask = get_query_mask(query_hash)
+    if not query_mask and settings.DEAD_LINK_MASK_LEGACY_HASH_FALLBACK:
+        query_mask = migrate_legacy_query_mask(s, query_hash)
     if not query_mask:  # branch 1
         start = 0
         end = _unmasked_query_end(page_size, page)
-    elif page_size * (page - 1) > sum(query_mask):  # branch 2
+    elif page_size * (page - 1) > query_mask.live_count:  # branch 2
         start = len(query_mask)
         end = _unmasked_query_end(page_size, page)
     else:  # branch 3
-        # query_mask is a list of 0 and 1 where 0 indicates the result position
-        # for the given query will be an invalid link. If we accumulate a query
-        # mask you end up, at each index, with the number of live results you
-        # will get back when you query that deeply.
+        # query_mask is a bitmap where 0 indicates the result position for the
+        # given query will be an invalid link. If we count the live bits up to
+        # each position, you end up, at each index, with the number of live
+        # results you will get back when you query that deeply.
         # We then query for the start and end index _of the results_ in ES based
         # on the number of results that we think will be valid based on the query mask.
         # If we're requesting `page=2 page_size=3` and the mask is [0, 1, 0, 1, 0, 1],
@@ -125,39 +279,44 @@ def _paginate_with_dead_link_mask(
         # account for the entire range, then we follow the typical assumption when
         # a mask is not available that the end should be `page * page_size / 0.5`
         # (i.e., double the page size)
-        accu_query_mask = list(accumulate(query_mask))
         start = 0
         if page > 1:
             try:  # branch 3_start_A
                 # find the index at which we can skip N valid results where N = all
                 # the results that would be skipped to arrive at the start of the
                 # requested page
-                # This will effectively be the index at which we have the number of
-                # previous valid results + 1 because we don't want to include the
+                # This will effectively be the index of the first valid result
+                # after the previous pages because we don't want to include the
                 # last valid result from the previous page
-                start = accu_query_mask.index(page_size * (page - 1) + 1)
+                start = query_mask.live_result_position(page_size * (page - 1) + 1)
             except ValueError:  # branch 3_start_B
                 # Cannot fail because of the check on branch 2 which verifies that
                 # the query mask already includes at least enough masked valid
                 # results to fulfill the requested page size
-                start = accu_query_mask.index(page_size * (page - 1)) + 1
+                start = query_mask.live_result_position(page_size * (page - 1)) + 1
         # else:  branch 3_start_C
         # Always start page=1 queries at 0
 
-        if page_size * page > sum(query_mask):  # branch 3_end_A
+        if page_size * page > query_mask.live_count:  # branch 3_end_A
             end = _unmasked_query_end(page_size, page)
         else:  # branch 3_end_B
-            end = accu_query_mask.index(page_size * page) + 1
+            end = query_mask.live_result_position(page_size * page) + 1
     return start, end
 
 
 def get_query_slice(
-    s: Search, page_size: int, page: int, filter_dead: bool | None = False
+    s: Search,
+    page_size: int,
+    page: int,
+    filter_dead: bool | None = False,
+    query_hash: str | None = None,
 ) -> tuple[int, int]:
     """Select the start and end of the search results for this query."""
 
     if filter_dead:
-        start_slice, end_slice = _paginate_with_dead_link_mask(s, page_size, page)
+        start_slice, end_slice = _paginate_with_dead_link_mask(
+            s, page_size, page, query_hash
+        )
     else:
         # Paginate search query.
         start_slice = page_size * (page - 1)
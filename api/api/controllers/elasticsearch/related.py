@@ -9,6 +9,7 @@ from api.controllers.search_controller import (
     _post_process_results,
     get_excluded_sources_query,
 )
+from api.utils.dead_link_mask import get_query_hash
 
 
 def related_media(uuid: str, index: str, filter_dead: bool) -> list[Hit]:
@@ -29,7 +30,9 @@ def related_media(uuid: str, index: str, filter_dead: bool) -> list[Hit]:
     item_search = Search(index=index)
     # This will raise ``IndexError`` if no hits are found. This error is caught
     # in the viewset handler function.
-    item_hit = item_search.query(Term(identifier=uuid)).execute().hits[0]
+    item_hit = get_es_response(
+        item_search.query(Term(identifier=uuid)), es_query="related_item"
+    ).hits[0]
 
     # Match related using title.
     title = getattr(item_hit, "title", None)
@@ -67,9 +70,12 @@ def related_media(uuid: str, index: str, filter_dead: bool) -> list[Hit]:
     s = s.query("bool", **related_query)
 
     page, page_size = 1, 10
-    start, end = get_query_slice(s, page_size, page, filter_dead)
+    query_hash = get_query_hash(s) if filter_dead else None
+    start, end = get_query_slice(s, page_size, page, filter_dead, query_hash)
     s = s[start:end]
 
     response = get_es_response(s, es_query="related_media")
-    results = _post_process_results(s, start, end, page_size, response, filter_dead)
+    results = _post_process_results(
+        s, start, end, page_size, response, filter_dead, query_hash=query_hash
+    )
     return results or []
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
 import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from math import ceil
 from typing import TYPE_CHECKING
 
 from django.conf import settings
 from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 import structlog
+from asgiref.sync import sync_to_async
 from decouple import config
+from django_asgi_lifespan.signals import asgi_startup
 from elasticsearch.exceptions import NotFoundError
 from elasticsearch_dsl import Q, Search
 from elasticsearch_dsl.query import EMPTY_QUERY
@@ -16,19 +22,29 @@ from elasticsearch_dsl.response import Hit, Response
 from redis.exceptions import ConnectionError
 
 import api.models as models
-from api.constants.media_types import OriginIndex, SearchIndex
+from api.constants import restricted_features
+from api.constants.media_types import MEDIA_TYPES, OriginIndex, SearchIndex
 from api.constants.search import SearchStrategy
 from api.constants.sorting import INDEXED_ON
 from api.controllers.elasticsearch.helpers import (
+    DEAD_LINK_RATIO,
     ELASTICSEARCH_MAX_RESULT_WINDOW,
+    aclose_point_in_time,
+    aget_es_multi_response,
+    aget_es_response,
+    aopen_point_in_time,
     get_es_response,
     get_query_slice,
     get_raw_es_response,
 )
 from api.utils import tallies
-from api.utils.check_dead_links import check_dead_links
+from api.utils.check_dead_links import acheck_dead_links, check_dead_links
 from api.utils.dead_link_mask import get_query_hash
+from api.utils.local_cache import LocalTTLCache
 from api.utils.search_context import SearchContext
+from api.utils.search_cursor import CursorExpired, CursorMismatch, SearchCursor
+from api.utils.search_response_cache import invalidate_search_response_cache
+from api.utils.stage_timing import timed_stage
 
 
 # Using TYPE_CHECKING to avoid circular imports when importing types
@@ -40,12 +56,38 @@ logger = structlog.get_logger(__name__)
 
 NESTING_THRESHOLD = config("POST_PROCESS_NESTING_THRESHOLD", cast=int, default=5)
 SOURCE_CACHE_TIMEOUT = 60 * 60 * 4  # 4 hours
-FILTER_CACHE_TIMEOUT = 30
+# Stale sources are served while they are refreshed in the background
+SOURCE_CACHE_STALE_TIMEOUT = 60 * 60 * 24  # 1 day
+SOURCE_REFRESH_LOCK_TIMEOUT = 60
+_sources_refresh_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="sources_refresh"
+)
+# Sources are also cached in the memory of each worker, in front of Redis
+SOURCE_LOCAL_CACHE_TIMEOUT = config("SOURCE_LOCAL_CACHE_TIMEOUT", cast=int, default=60)
+_sources_local_cache = LocalTTLCache(maxsize=16, ttl=SOURCE_LOCAL_CACHE_TIMEOUT)
+# Changes to the filtered sources bump the version of their cache, see
+# ``invalidate_filtered_sources``, so they can be cached for long in Redis, and
+# for a few seconds in the memory of each worker
+FILTER_CACHE_TIMEOUT = 60 * 60  # 1 hour
+FILTER_LOCAL_CACHE_TIMEOUT = config("FILTER_LOCAL_CACHE_TIMEOUT", cast=int, default=5)
+_filtered_sources_local_cache = LocalTTLCache(maxsize=1, ttl=FILTER_LOCAL_CACHE_TIMEOUT)
 FILTERED_SOURCES_CACHE_KEY = "filtered_sources"
 FILTERED_SOURCES_CACHE_VERSION = 1
+# The current version of the cached filtered sources, if not the initial one
+FILTERED_SOURCES_VERSION_KEY = "filtered_sources_version"
+# Hits are only counted as deep as any request can paginate, so that ES can
+# stop counting the hits of broad queries early, see ``_get_total_hits``
+TRACK_TOTAL_HITS = max(
+    restricted_features.MAX_RESULT_COUNT.anonymous,
+    restricted_features.MAX_RESULT_COUNT.authenticated,
+    restricted_features.MAX_RESULT_COUNT.privileged,
+)
 DEFAULT_BOOST = 10000
 DEFAULT_SEARCH_FIELDS = ["title", "description", "tags.name"]
 DEFAULT_SQS_FLAGS = "AND|NOT|PHRASE|WHITESPACE"
+# Negated terms cannot appear in the fields of the results, so they are read
+# as plain terms by the named queries, which would otherwise match them
+FIELDS_MATCHED_SQS_FLAGS = "AND|PHRASE|WHITESPACE"
 UNUSED_SQS_FLAGS = [
     ("PRECEDENCE", r"\(.*\)"),
     ("ESCAPE", r"\\"),
@@ -64,8 +106,98 @@ def _quote_escape(query_string):
         return query_string
 
 
+def _get_total_hits(search_results: Response) -> int:
+    """
+    Get the number of hits of the query that the result slices can reach.
+
+    ES stops counting hits at ``TRACK_TOTAL_HITS``, in which case the count is
+    only a lower bound, with the "gte" relation, and the hits are assumed to
+    extend to the end of the result window.
+
+    :param search_results: The Elasticsearch response object for the query.
+    :return: The number of hits.
+    """
+
+    total = search_results.hits.total
+    if getattr(total, "relation", "eq") == "gte":
+        return max(total.value, ELASTICSEARCH_MAX_RESULT_WINDOW)
+    return total.value
+
+
+def _get_backfill_end(start: int, end: int, search_results: Response) -> int | None:
+    """
+    Get the new end of the result slice to backfill a page with dead links.
+
+    The variables in this function get updated in an interesting way.
+    Here is an example of that for a typical query. Note that ``end``
+    increases but start stays the same. This has the effect of slowly
+    increasing the size of the query we send to Elasticsearch with the
+    goal of backfilling the results until we have enough valid (live)
+    results to fulfill the requested page size.
+
+    ```
+    page_size: 20
+    page: 1
+
+    start: 0
+    end: 40 (DEAD_LINK_RATIO applied)
+
+    end gets updated to end + end/2 = 60
+
+    end = 90
+    end = 90 + 45
+    ```
+
+    :param start: The start of the result slice.
+    :param end: The end of the result slice.
+    :param search_results: The Elasticsearch response object for the slice.
+    :return: The new end, or ``None`` if the query cannot be backfilled further.
+    """
+
+    total_hits = _get_total_hits(search_results)
+    if end >= total_hits:
+        # Total available hits already exhausted in previous iteration
+        return None
+
+    end += int(end / 2)
+    query_size = start + end
+    if query_size > ELASTICSEARCH_MAX_RESULT_WINDOW:
+        return None
+
+    # subtract start to account for the records skipped
+    # and which should not count towards the total
+    # available hits for the query
+    total_available_hits = total_hits - start
+    if query_size > total_available_hits:
+        # Clamp the query size to last available hit. On the next
+        # iteration, if results are still insufficient, the check
+        # to compare previous_query_size and total_available_hits
+        # will prevent further query attempts
+        end = total_hits
+
+    return end
+
+
+def _log_nesting_threshold(nesting, start, end, page_size):
+    if nesting > NESTING_THRESHOLD:
+        logger.info(
+            "Nesting threshold breached",
+            nesting=nesting,
+            start=start,
+            end=end,
+            page_size=page_size,
+        )
+
+
 def _post_process_results(
-    s, start, end, page_size, search_results, filter_dead, nesting=0
+    s,
+    start,
+    end,
+    page_size,
+    search_results,
+    filter_dead,
+    nesting=0,
+    query_hash: str | None = None,
 ) -> list[Hit] | None:
     """
     Perform some steps on results fetched from the backend.
@@ -83,120 +215,331 @@ def _post_process_results(
     results.
     :param filter_dead: Whether images should be validated.
     :param nesting: the level of nesting at which this function is being called
+    :param query_hash: The hash of the query, computed from ``s`` if not given.
+    Pass it down to avoid hashing the same query at every level of nesting.
     :return: List of results.
     """
 
-    if nesting > NESTING_THRESHOLD:
-        logger.info(
-            "Nesting threshold breached",
-            nesting=nesting,
-            start=start,
-            end=end,
-            page_size=page_size,
-        )
+    _log_nesting_threshold(nesting, start, end, page_size)
 
     results = list(search_results)
 
     if filter_dead:
-        query_hash = get_query_hash(s)
-        check_dead_links(query_hash, start, results)
+        query_hash = query_hash or get_query_hash(s)
+        check_dead_links(query_hash, start, results, page_size)
 
         if len(results) == 0:
             # first page is all dead links
             return None
 
         if len(results) < page_size:
-            """
-            The variables in this function get updated in an interesting way.
-            Here is an example of that for a typical query. Note that ``end``
-            increases but start stays the same. This has the effect of slowly
-            increasing the size of the query we send to Elasticsearch with the
-            goal of backfilling the results until we have enough valid (live)
-            results to fulfill the requested page size.
-
-            ```
-            page_size: 20
-            page: 1
-
-            start: 0
-            end: 40 (DEAD_LINK_RATIO applied)
-
-            end gets updated to end + end/2 = 60
-
-            end = 90
-            end = 90 + 45
-            ```
-            """
-            if end >= search_results.hits.total.value:
-                # Total available hits already exhausted in previous iteration
-                return results
-
-            end += int(end / 2)
-            query_size = start + end
-            if query_size > ELASTICSEARCH_MAX_RESULT_WINDOW:
+            end = _get_backfill_end(start, end, search_results)
+            if end is None:
                 return results
 
-            # subtract start to account for the records skipped
-            # and which should not count towards the total
-            # available hits for the query
-            total_available_hits = search_results.hits.total.value - start
-            if query_size > total_available_hits:
-                # Clamp the query size to last available hit. On the next
-                # iteration, if results are still insufficient, the check
-                # to compare previous_query_size and total_available_hits
-                # will prevent further query attempts
-                end = search_results.hits.total.value
-
             s = s[start:end]
             search_response = get_es_response(s, es_query="postprocess_search")
 
             return _post_process_results(
-                s, start, end, page_size, search_response, filter_dead, nesting + 1
+                s,
+                start,
+                end,
+                page_size,
+                search_response,
+                filter_dead,
+                nesting + 1,
+                query_hash,
             )
 
     return results[:page_size]
 
 
-def get_excluded_sources_query() -> Q | None:
+async def _apost_process_results(
+    s,
+    start,
+    end,
+    page_size,
+    search_results,
+    filter_dead,
+    nesting=0,
+    query_hash: str | None = None,
+    prefetched_results: Response | None = None,
+) -> list[Hit] | None:
+    """
+    Async counterpart to ``_post_process_results``.
+
+    Dead link validation and backfill queries are awaited rather than run
+    through ``async_to_sync``, so the calling worker is free to serve other
+    requests while waiting on Elasticsearch and the HEAD requests.
+
+    :param prefetched_results: The speculatively fetched results following
+    ``end``, if any. The first backfill uses these instead of querying
+    Elasticsearch again when they cover the new end of the slice.
+    """
+
+    _log_nesting_threshold(nesting, start, end, page_size)
+
+    results = list(search_results)
+
+    if filter_dead:
+        query_hash = query_hash or get_query_hash(s)
+        await acheck_dead_links(query_hash, start, results, page_size)
+
+        if len(results) == 0:
+            # first page is all dead links
+            return None
+
+        if len(results) < page_size:
+            if settings.ENABLE_SEARCH_AFTER_BACKFILL:
+                return await _abackfill_with_search_after(
+                    s,
+                    query_hash,
+                    end,
+                    page_size,
+                    results,
+                    search_results,
+                    prefetched_results,
+                )
+
+            previous_end = end
+            end = _get_backfill_end(start, end, search_results)
+            if end is None:
+                return results
+
+            s = s[start:end]
+            if _covers_backfill(previous_end, end, prefetched_results):
+                search_response = _join_responses(
+                    s, search_results, prefetched_results, size=end - start
+                )
+            else:
+                search_response = await aget_es_response(
+                    s, es_query="postprocess_search"
+                )
+
+            return await _apost_process_results(
+                s,
+                start,
+                end,
+                page_size,
+                search_response,
+                filter_dead,
+                nesting + 1,
+                query_hash,
+            )
+
+    return results[:page_size]
+
+
+def _with_tiebreaker_sort(s: Search) -> Search:
+    """
+    Add a unique tiebreaker to the sort of the search.
+
+    ``search_after`` requires a sort that totally orders the hits, otherwise
+    hits with equal sort values could be skipped or repeated between windows.
+    Relevance ordering is made explicit, as the sort values of each hit are
+    only returned when the query has a sort.
     """
-    Hide data sources from the catalog dynamically.
-    To exclude a source, set ``filter_content`` to ``True`` in the
+
+    sort = s.to_dict().get("sort") or [{"_score": {"order": "desc"}}]
+    return s.sort(*sort, {"identifier": {"order": "asc"}})
+
+
+async def _abackfill_with_search_after(
+    s: Search,
+    query_hash: str,
+    end: int,
+    page_size: int,
+    results: list[Hit],
+    search_results: Response,
+    prefetched_results: Response | None = None,
+) -> list[Hit]:
+    """
+    Fill the page by streaming the hits following the result slice.
+
+    Rather than re-running the query for an ever larger slice, only the window
+    of hits following the last one seen is fetched, using ``search_after``.
+    The links of each window are validated as it arrives and no further
+    windows are fetched once the page is full.
+
+    :param s: The sliced search, sorted with ``_with_tiebreaker_sort``.
+    :param query_hash: The hash of the search, for the dead link mask.
+    :param end: The end of the result slice, i.e. the position of the next hit.
+    :param page_size: The number of live results needed.
+    :param results: The live results from the result slice.
+    :param search_results: The Elasticsearch response for the result slice.
+    :param prefetched_results: The speculatively fetched hits following ``end``,
+    used as the first window if available.
+    :return: List of results.
+    """
+
+    total_hits = _get_total_hits(search_results)
+    last_hit = search_results.hits[-1] if search_results.hits else None
+    window_response = prefetched_results
+    nesting = 0
+
+    while len(results) < page_size and last_hit is not None:
+        nesting += 1
+        if window_response is None:
+            if end >= total_hits or end >= ELASTICSEARCH_MAX_RESULT_WINDOW:
+                break
+
+            _log_nesting_threshold(nesting, end, end, page_size)
+            window_size = ceil((page_size - len(results)) / (1 - DEAD_LINK_RATIO))
+            window = s.extra(search_after=list(last_hit.meta.sort))[:window_size]
+            window_response = await aget_es_response(
+                window, es_query="postprocess_search_after"
+            )
+
+        window_hits = list(window_response)
+        if not window_hits:
+            break
+
+        last_hit = window_response.hits[-1]
+        window_response = None
+
+        # The mask is positional, so the window's offset is the number of
+        # hits that precede it, regardless of how it was queried.
+        window_start = end
+        end += len(window_hits)
+        await acheck_dead_links(
+            query_hash, window_start, window_hits, page_size - len(results)
+        )
+        results.extend(window_hits)
+
+    return results[:page_size]
+
+
+def _get_speculative_backfill_end(start: int, end: int) -> int | None:
+    """
+    Get the end of the slice to fetch ahead of time for the first backfill.
+
+    This mirrors ``_get_backfill_end`` before the total number of hits is
+    known, so that the speculative slice always covers the first backfill.
+
+    :return: The end of the speculative slice, or ``None`` if the result
+    window does not allow for any backfill.
+    """
+
+    speculative_end = end + int(end / 2)
+    if start + speculative_end > ELASTICSEARCH_MAX_RESULT_WINDOW:
+        return None
+    return speculative_end
+
+
+def _covers_backfill(
+    previous_end: int, end: int, prefetched_results: Response | None
+) -> bool:
+    """Whether the prefetched results contain every hit up to ``end``."""
+
+    if prefetched_results is None:
+        return False
+
+    prefetched_hits = len(prefetched_results.hits)
+    prefetched_end = previous_end + prefetched_hits
+    # A short slice means the hits for the query were exhausted
+    return end <= prefetched_end or prefetched_end >= _get_total_hits(
+        prefetched_results
+    )
+
+
+def _join_responses(
+    s: Search, first: Response, second: Response, size: int
+) -> Response:
+    """
+    Join the hits of two responses for consecutive slices of the same query.
+
+    :param s: The ``Search`` for the joined slice.
+    :param first: The response for the first slice.
+    :param second: The response for the slice directly following the first.
+    :param size: The number of hits to keep in the joined response.
+    :return: A response as if the joined slice had been queried directly.
+    """
+
+    body = first.to_dict()
+    hits = body["hits"]["hits"] + second.to_dict()["hits"]["hits"]
+    return s._response_class(s, {**body, "hits": {**body["hits"], "hits": hits[:size]}})
+
+
+def get_filtered_sources() -> list[str]:
+    """
+    Get the ``source_identifier``s of the sources hidden from the catalog.
+
+    To hide a source, set ``filter_content`` to ``True`` in the
     ``ContentSource`` model in Django admin.
     The list of ``source_identifier``s is cached in Redis with
-    `:FILTERED_SOURCES_CACHE_VERSION:FILTERED_SOURCES_CACHE_KEY` key.
+    `:<version>:FILTERED_SOURCES_CACHE_KEY` key, where the version is stored in
+    Redis at ``FILTERED_SOURCES_VERSION_KEY`` and defaults to
+    ``FILTERED_SOURCES_CACHE_VERSION``. It is also cached in the memory of the
+    worker for ``FILTER_LOCAL_CACHE_TIMEOUT`` seconds, so that most requests
+    read neither Redis nor the DB.
     """
 
+    if (filtered_sources := _filtered_sources_local_cache.get("sources")) is not None:
+        return list(filtered_sources)
+
+    version = FILTERED_SOURCES_CACHE_VERSION
     try:
-        filtered_sources = cache.get(
-            key=FILTERED_SOURCES_CACHE_KEY, version=FILTERED_SOURCES_CACHE_VERSION
-        )
-        logger.info(f"Filtered sources from cache: {filtered_sources}")
+        version = cache.get(FILTERED_SOURCES_VERSION_KEY, version)
+        filtered_sources = cache.get(key=FILTERED_SOURCES_CACHE_KEY, version=version)
     except ConnectionError:
         logger.warning("Redis connect failed, cannot get cached filtered sources.")
         filtered_sources = None
 
-    if not filtered_sources:
+    if filtered_sources is None:
         filtered_sources = list(
             models.ContentSource.objects.filter(filter_content=True).values_list(
                 "source_identifier", flat=True
             )
         )
+        logger.info(f"Filtered sources from the DB: {filtered_sources}")
 
         try:
             cache.set(
                 key=FILTERED_SOURCES_CACHE_KEY,
-                version=FILTERED_SOURCES_CACHE_VERSION,
+                version=version,
                 timeout=FILTER_CACHE_TIMEOUT,
                 value=filtered_sources,
             )
         except ConnectionError:
             logger.warning("Redis connect failed, cannot cache filtered sources.")
 
-    if filtered_sources:
+    _filtered_sources_local_cache.set("sources", filtered_sources)
+    return list(filtered_sources)
+
+
+def get_excluded_sources_query() -> Q | None:
+    """Hide data sources from the catalog dynamically, see ``get_filtered_sources``."""
+
+    if filtered_sources := get_filtered_sources():
         return Q("terms", source=filtered_sources)
     return None
 
 
+@receiver([post_save, post_delete], sender=models.ContentSource)
+def invalidate_filtered_sources(sender, instance: models.ContentSource, **kwargs):
+    """
+    Stop excluding sources that are no longer filtered, and vice versa, at once.
+
+    The version of the cached filtered sources is bumped, rather than the
+    cached list deleted, so that a list read from the DB before the change
+    cannot be cached after it. Other workers see the change once their copy in
+    memory expires, within ``FILTER_LOCAL_CACHE_TIMEOUT`` seconds.
+
+    Cached search responses of the source's media type are invalidated too, as
+    they depend on the excluded sources.
+    """
+
+    _filtered_sources_local_cache.clear()
+    try:
+        cache.add(
+            FILTERED_SOURCES_VERSION_KEY, FILTERED_SOURCES_CACHE_VERSION, timeout=None
+        )
+        cache.incr(FILTERED_SOURCES_VERSION_KEY)
+    except ConnectionError:
+        logger.warning("Redis connect failed, cannot invalidate filtered sources.")
+    invalidate_search_response_cache(instance.media_type)
+
+
 def get_index(
     exact_index: bool,
     origin_index: OriginIndex,
@@ -265,6 +608,37 @@ def create_ranking_queries(
     return queries
 
 
+def create_fields_matched_queries(query_kwargs: dict) -> list[Q]:
+    """
+    Create the named queries that tag the hits with the fields matching the query.
+
+    ES lists the names of the queries that matched each hit in its
+    ``matched_queries``, which is much cheaper than highlighting the hits, as
+    highlighting analyzes the text of the fields again for every hit. Like
+    highlighting, a field matches if it contains any term of the query, so the
+    queries use the ``OR`` operator. They do not contribute to the score.
+
+    :param query_kwargs: The arguments of the ``simple_query_string`` query of
+    the search.
+    :return: One query per field, named after the field.
+    """
+
+    return [
+        Q(
+            "simple_query_string",
+            **query_kwargs
+            | {
+                "fields": [field],
+                "flags": FIELDS_MATCHED_SQS_FLAGS,
+                "default_operator": "OR",
+                "boost": 0,
+                "_name": field,
+            },
+        )
+        for field in DEFAULT_SEARCH_FIELDS
+    ]
+
+
 def build_search_query(
     search_params: MediaSearchRequestSerializer,
 ) -> Q:
@@ -311,6 +685,10 @@ def build_search_query(
             boost=10000,
         )
         search_queries["should"].append(exact_match_boost)
+        if settings.ENABLE_FIELDS_MATCHED_NAMED_QUERIES:
+            search_queries["should"].extend(
+                create_fields_matched_queries(base_query_kwargs)
+            )
     else:
         for field, field_name in [
             ("creator", "creator"),
@@ -319,13 +697,19 @@ def build_search_query(
         ]:
             if field_value := search_params.data.get(field):
                 log_query_features(field_value, query_name="field")
+                field_query_kwargs = {
+                    "flags": DEFAULT_SQS_FLAGS,
+                    "query": _quote_escape(field_value),
+                    "fields": [field_name],
+                }
+                # The query is required, so the field matches every result
+                if (
+                    settings.ENABLE_FIELDS_MATCHED_NAMED_QUERIES
+                    and field_name in DEFAULT_SEARCH_FIELDS
+                ):
+                    field_query_kwargs["_name"] = field_name
                 search_queries["must"].append(
-                    Q(
-                        "simple_query_string",
-                        flags=DEFAULT_SQS_FLAGS,
-                        query=_quote_escape(field_value),
-                        fields=[field_name],
-                    )
+                    Q("simple_query_string", **field_query_kwargs)
                 )
 
     if settings.USE_RANK_FEATURES:
@@ -403,6 +787,66 @@ query_builders = {
 }
 
 
+def _build_search(
+    search_params: MediaSearchRequestSerializer,
+    origin_index: OriginIndex,
+    exact_index: bool,
+    ip: int,
+    source_fields: list[str] | None = None,
+) -> tuple[Search, SearchIndex, SearchStrategy]:
+    """
+    Build the ``Search`` object for the search or collection query.
+
+    :param source_fields: The fields of the documents to return in the hits,
+    all of them if ``None``.
+    :return: Tuple with the unsliced ``Search``, the index it targets and the
+    search strategy used to build it.
+    """
+    index = get_index(exact_index, origin_index, search_params)
+
+    strategy: SearchStrategy = (
+        "collection" if search_params.validated_data.get("collection") else "search"
+    )
+
+    query = query_builders[strategy](search_params)
+
+    s = Search(index=index).query(query).extra(track_total_hits=TRACK_TOTAL_HITS)
+    if source_fields is not None:
+        s = s.source(includes=source_fields)
+
+    if strategy == "search" and not settings.ENABLE_FIELDS_MATCHED_NAMED_QUERIES:
+        # Use highlighting to determine which fields contribute to the selection of
+        # top results.
+        s = s.highlight(*DEFAULT_SEARCH_FIELDS)
+        s = s.highlight_options(order="score")
+        s.extra(track_scores=True)
+
+    # Route users to the same Elasticsearch worker node to reduce
+    # pagination inconsistencies and increase cache hits.
+    # TODO: Re-add 7s request_timeout when ES stability is restored
+    s = s.params(preference=str(ip))
+
+    # Sort by `created_on` if the parameter is set or if `strategy` is `collection`.
+    sort_by = search_params.validated_data.get("sort_by")
+    if strategy == "collection" or sort_by == INDEXED_ON:
+        sort_dir = search_params.validated_data.get("sort_dir", "desc")
+        s = s.sort({"created_on": {"order": sort_dir}})
+
+    return s, index, strategy
+
+
+def _get_filtered_index_search_context(result_ids: list[str]) -> SearchContext:
+    """
+    Build the search context for results queried from the filtered index.
+
+    Every result was retrieved from the filtered index, so none of them can
+    have sensitive text and the membership lookup in ``SearchContext.build``
+    can be skipped, saving an Elasticsearch round trip.
+    """
+
+    return SearchContext(result_ids, set())
+
+
 def query_media(
     search_params: MediaSearchRequestSerializer,
     origin_index: OriginIndex,
@@ -411,6 +855,7 @@ def query_media(
     ip: int,
     filter_dead: bool,
     page: int = 1,
+    source_fields: list[str] | None = None,
 ) -> tuple[list[Hit], int, int, dict]:
     """
     Build the search or collection query, execute it and return
@@ -430,54 +875,245 @@ def query_media(
     Elasticsearch shards.
     :param filter_dead: Whether dead links should be removed.
     :param page: The results page number.
+    :param source_fields: The fields of the documents to return in the hits,
+    all of them if ``None``.
     :return: Tuple with a list of Hits from elasticsearch, the total count of
     pages, the number of results, and the ``SearchContext`` as a dict.
     """
-    index = get_index(exact_index, origin_index, search_params)
+    s, index, strategy = _build_search(
+        search_params, origin_index, exact_index, ip, source_fields
+    )
 
-    strategy: SearchStrategy = (
-        "collection" if search_params.validated_data.get("collection") else "search"
+    # Execute paginated search and tally results
+    page_count, result_count, results = execute_search(
+        s, page, page_size, filter_dead, index, es_query=strategy
     )
 
-    query = query_builders[strategy](search_params)
+    result_ids = [result.identifier for result in results]
+    if index != origin_index:
+        search_context = _get_filtered_index_search_context(result_ids)
+    else:
+        search_context = SearchContext.build(result_ids, origin_index)
 
-    s = Search(index=index).query(query)
+    return results, page_count, result_count, search_context.asdict()
 
-    if strategy == "search":
-        # Use highlighting to determine which fields contribute to the selection of
-        # top results.
-        s = s.highlight(*DEFAULT_SEARCH_FIELDS)
-        s = s.highlight_options(order="score")
-        s.extra(track_scores=True)
 
-    # Route users to the same Elasticsearch worker node to reduce
-    # pagination inconsistencies and increase cache hits.
-    # TODO: Re-add 7s request_timeout when ES stability is restored
-    s = s.params(preference=str(ip))
+async def aquery_media(
+    search_params: MediaSearchRequestSerializer,
+    origin_index: OriginIndex,
+    exact_index: bool,
+    page_size: int,
+    ip: int,
+    filter_dead: bool,
+    page: int = 1,
+    source_fields: list[str] | None = None,
+    tally: bool = True,
+) -> tuple[list[Hit], int, int, dict]:
+    """
+    Async counterpart to ``query_media``, accepting the same arguments.
 
-    # Sort by `created_on` if the parameter is set or if `strategy` is `collection`.
-    sort_by = search_params.validated_data.get("sort_by")
-    if strategy == "collection" or sort_by == INDEXED_ON:
-        sort_dir = search_params.validated_data.get("sort_dir", "desc")
-        s = s.sort({"created_on": {"order": sort_dir}})
+    All Elasticsearch queries and link validation requests are awaited on the
+    event loop. Redis and database access, which is needed to build the query,
+    to paginate with the dead link mask and to tally results, still happens
+    synchronously in a thread via ``sync_to_async``.
+
+    :param tally: Whether to tally the results and the occurrence of the query,
+    which is skipped when they are tallied with ``tally_response`` instead.
+    """
+    s, index, strategy = await sync_to_async(_build_search)(
+        search_params, origin_index, exact_index, ip, source_fields
+    )
 
     # Execute paginated search and tally results
-    page_count, result_count, results = execute_search(
-        s, page, page_size, filter_dead, index, es_query=strategy
+    page_count, result_count, results = await aexecute_search(
+        s,
+        page,
+        page_size,
+        filter_dead,
+        index,
+        es_query=strategy,
+        tally=tally,
     )
 
     result_ids = [result.identifier for result in results]
-    search_context = SearchContext.build(result_ids, origin_index)
+    if index != origin_index:
+        search_context = _get_filtered_index_search_context(result_ids)
+    else:
+        search_context = await SearchContext.abuild(result_ids, origin_index)
 
     return results, page_count, result_count, search_context.asdict()
 
 
+async def aquery_media_with_cursor(
+    search_params: MediaSearchRequestSerializer,
+    origin_index: OriginIndex,
+    exact_index: bool,
+    page_size: int,
+    ip: int,
+    filter_dead: bool,
+    cursor: SearchCursor,
+    source_fields: list[str] | None = None,
+) -> tuple[list[Hit], SearchCursor | None, int, dict]:
+    """
+    Build the search or collection query and return the page following the cursor.
+
+    This accepts the same arguments as ``aquery_media``, except that the page
+    is given by the cursor, see ``api.utils.search_cursor``.
+
+    :param cursor: The cursor returned with the previous page, or a new cursor.
+    :return: Tuple with a list of Hits from elasticsearch, the cursor of the
+    next page, ``None`` if there are no more results, the number of results,
+    and the ``SearchContext`` as a dict.
+    """
+    s, index, strategy = await sync_to_async(_build_search)(
+        search_params, origin_index, exact_index, ip, source_fields
+    )
+
+    result_count, results, next_cursor = await aexecute_cursor_search(
+        s, cursor, page_size, filter_dead, index, es_query=f"{strategy}_cursor"
+    )
+
+    result_ids = [result.identifier for result in results]
+    if index != origin_index:
+        search_context = _get_filtered_index_search_context(result_ids)
+    else:
+        search_context = await SearchContext.abuild(result_ids, origin_index)
+
+    return results, next_cursor, result_count, search_context.asdict()
+
+
+async def aexecute_cursor_search(
+    s: Search,
+    cursor: SearchCursor,
+    page_size: int,
+    filter_dead: bool,
+    index: SearchIndex,
+    es_query: str,
+) -> tuple[int, list[Hit], SearchCursor | None]:
+    """
+    Execute the search for the page following the cursor.
+
+    The hits are read from the point in time (PIT) of the cursor, opening one
+    for a new cursor, in windows following the last hit of the previous page,
+    with ``search_after``. Further windows are only fetched when dead links
+    leave the page short. The result window of ES does not apply, and the
+    cost of a page does not depend on its depth.
+
+    Results are not tallied, as deep results are not relevant to the tallies.
+
+    :return: Tuple with the number of results, the results and the cursor of
+    the next page, ``None`` if there are no more results.
+    :raise: ``CursorMismatch``, if the cursor was returned for another query
+    """
+    s = _with_tiebreaker_sort(s)
+
+    # Hash the query once for the dead link mask and the cursor, rather than
+    # at every step
+    query_hash = get_query_hash(s)
+    # The PIT and the sort values of the cursor only apply to the same query
+    # on the same index
+    cursor_query_hash = f"{index}:{query_hash}"
+    if not cursor.is_start and cursor.query_hash != cursor_query_hash:
+        raise CursorMismatch()
+    if not filter_dead:
+        query_hash = None
+
+    keep_alive = settings.CURSOR_PAGINATION_KEEP_ALIVE
+    pit_id = cursor.pit_id
+    if pit_id is None:
+        pit = await aopen_point_in_time(
+            index,
+            keep_alive,
+            s._params.get("preference"),
+            es_query="open_point_in_time",
+        )
+        pit_id = pit["id"]
+    # The index and preference are those of the PIT
+    s = s.index().params(preference=None)
+
+    results: list[Hit] = []
+    search_after = cursor.search_after
+    offset = cursor.offset
+    result_count = 0
+    exhausted = False
+    nesting = 0
+
+    while len(results) < page_size and not exhausted:
+        nesting += 1
+        _log_nesting_threshold(nesting, offset, offset, page_size)
+
+        live_needed = page_size - len(results)
+        window_size = (
+            ceil(live_needed / (1 - DEAD_LINK_RATIO)) if filter_dead else live_needed
+        )
+        window = s.extra(pit={"id": pit_id, "keep_alive": keep_alive})
+        if search_after:
+            window = window.extra(search_after=search_after)
+        try:
+            response = await aget_es_response(window[:window_size], es_query=es_query)
+        except ValueError as e:
+            if cursor.pit_id is not None and isinstance(e.args[0], NotFoundError):
+                raise CursorExpired()
+            raise
+
+        # The ID of the PIT can change between searches
+        pit_id = response.to_dict().get("pit_id", pit_id)
+        if not result_count:
+            result_count = response.hits.total.value
+
+        window_hits = list(response)
+        exhausted = len(window_hits) < window_size
+
+        live_hits = list(window_hits)
+        if filter_dead:
+            await acheck_dead_links(query_hash, offset, live_hits, live_needed)
+        live_hits = live_hits[:live_needed]
+        results.extend(live_hits)
+
+        # Only the hits up to the last result are consumed, the next page
+        # starts with the hits after it.
+        if len(results) == page_size:
+            consumed = next(
+                idx + 1 for idx, hit in enumerate(window_hits) if hit is live_hits[-1]
+            )
+            exhausted = exhausted and consumed == len(window_hits)
+        else:
+            consumed = len(window_hits)
+        if consumed:
+            search_after = list(window_hits[consumed - 1].meta.sort)
+            offset += consumed
+
+    if exhausted:
+        await aclose_point_in_time(pit_id)
+        next_cursor = None
+    else:
+        next_cursor = SearchCursor(
+            pit_id=pit_id,
+            search_after=search_after,
+            offset=offset,
+            depth=cursor.depth + len(results),
+            query_hash=cursor_query_hash,
+        )
+
+    return result_count, results, next_cursor
+
+
+@timed_stage("tallies")
 def tally_results(
-    index: SearchIndex, results: list[Hit] | None, page: int, page_size: int
+    index: SearchIndex,
+    results: list[Hit] | None,
+    page: int,
+    page_size: int,
+    s: Search | None = None,
+    query_hash: str | None = None,
 ) -> None:
     """
     Tally the number of the results from each provider in the results
     for the search query.
+
+    If the query is given with its dead link mask hash, also tally the
+    occurrence of the query, once for its first page, so that the links of
+    popular queries can be validated ahead of time.
     """
     results_to_tally = results or []
     max_result_depth = page * page_size
@@ -496,18 +1132,60 @@ def tally_results(
     else:
         should_tally = False
 
-    if results and should_tally:
-        # We ignore tallies for deep results because they're not likely to
-        # be as important for search relevancy for most users at this point
-        # 80 is chosen because it represents the first four pages of the
-        # default page count of 20 (20 * 4) which is how our own frontend
-        # makes requests and displays results. Because that is the only
-        # place we can actually conceivably measure relevancy down the
-        # line, it is the only sensible, controlled space we can use to
-        # check things like provider density for a set of queries.
+    # We ignore tallies for deep results because they're not likely to
+    # be as important for search relevancy for most users at this point
+    # 80 is chosen because it represents the first four pages of the
+    # default page count of 20 (20 * 4) which is how our own frontend
+    # makes requests and displays results. Because that is the only
+    # place we can actually conceivably measure relevancy down the
+    # line, it is the only sensible, controlled space we can use to
+    # check things like provider density for a set of queries.
+    if not should_tally:
+        results_to_tally = []
+
+    if s is not None and query_hash is not None and page == 1:
+        tallies.count_occurrences(index, results_to_tally, query_hash, s.to_dict())
+    elif results_to_tally:
         tallies.count_provider_occurrences(results_to_tally, index)
 
 
+@timed_stage("tallies")
+def tally_response(
+    search_params: MediaSearchRequestSerializer,
+    origin_index: OriginIndex,
+    exact_index: bool,
+    results: list[dict],
+    page: int,
+    page_size: int,
+    filter_dead: bool,
+    source_fields: list[str] | None = None,
+) -> None:
+    """
+    Tally the serialized results of a search response and, for the first page
+    with filtered dead links, the occurrence of its query.
+
+    This is used instead of the tally of ``aexecute_search`` when the response
+    may be served from the response cache, so that cached responses are
+    counted like computed ones. The query is built and hashed like in
+    ``aexecute_search``, so that it has the hash of its dead link mask.
+
+    See ``query_media`` for the other arguments.
+
+    :param results: The serialized results of the response.
+    """
+    s = query_hash = None
+    if page == 1 and filter_dead:
+        s, index, _ = _build_search(
+            search_params, origin_index, exact_index, 0, source_fields
+        )
+        if settings.ENABLE_SEARCH_AFTER_BACKFILL:
+            s = _with_tiebreaker_sort(s)
+        query_hash = get_query_hash(s)
+    else:
+        index = get_index(exact_index, origin_index, search_params)
+    tally_results(index, results, page, page_size, s, query_hash)
+
+
 def execute_search(
     s: Search,
     page: int,
@@ -520,19 +1198,88 @@ def execute_search(
     Execute search for the given query slice, post-processes the results,
     and returns the results and result and page counts.
     """
-    start, end = get_query_slice(s, page_size, page, filter_dead)
+    # Hash the query once for the dead link mask, rather than at every step
+    query_hash = get_query_hash(s) if filter_dead else None
+
+    start, end = get_query_slice(s, page_size, page, filter_dead, query_hash)
     s = s[start:end]
 
     search_response = get_es_response(s, es_query=es_query)
 
     results: list[Hit] = (
-        _post_process_results(s, start, end, page_size, search_response, filter_dead)
+        _post_process_results(
+            s,
+            start,
+            end,
+            page_size,
+            search_response,
+            filter_dead,
+            query_hash=query_hash,
+        )
+        or []
+    )
+    result_count, page_count = _get_result_and_page_count(
+        search_response, results, page_size, page
+    )
+    tally_results(index, results, page, page_size, s, query_hash)
+    return page_count, result_count, results
+
+
+async def aexecute_search(
+    s: Search,
+    page: int,
+    page_size: int,
+    filter_dead: bool,
+    index: SearchIndex,
+    es_query: str,
+    tally: bool = True,
+) -> tuple[int, int, list[Hit]]:
+    """
+    Async counterpart to ``execute_search``, accepting the same arguments.
+
+    :param tally: Whether to tally the results and the occurrence of the query.
+    """
+    if filter_dead and settings.ENABLE_SEARCH_AFTER_BACKFILL:
+        s = _with_tiebreaker_sort(s)
+
+    # Hash the query once for the dead link mask, rather than at every step
+    query_hash = get_query_hash(s) if filter_dead else None
+
+    start, end = await sync_to_async(get_query_slice)(
+        s, page_size, page, filter_dead, query_hash
+    )
+    s = s[start:end]
+
+    prefetched_response = None
+    if filter_dead and (speculative_end := _get_speculative_backfill_end(start, end)):
+        # Fetch the slice needed by the first backfill in the same round trip
+        # as the main query, in case dead links leave the page short.
+        search_response, prefetched_response = await aget_es_multi_response(
+            [s, s[end:speculative_end]], es_query=es_query
+        )
+    else:
+        search_response = await aget_es_response(s, es_query=es_query)
+
+    results: list[Hit] = (
+        await _apost_process_results(
+            s,
+            start,
+            end,
+            page_size,
+            search_response,
+            filter_dead,
+            query_hash=query_hash,
+            prefetched_results=prefetched_response,
+        )
         or []
     )
     result_count, page_count = _get_result_and_page_count(
         search_response, results, page_size, page
     )
-    tally_results(index, results, page, page_size)
+    if tally:
+        await sync_to_async(tally_results)(
+            index, results, page, page_size, s, query_hash
+        )
     return page_count, result_count, results
 
 
@@ -540,67 +1287,157 @@ def get_sources(index):
     """
     Given an index, find all available data sources and return their counts.
 
+    The sources are read from the memory of the worker if they were read in
+    the last ``SOURCE_LOCAL_CACHE_TIMEOUT`` seconds, and otherwise from Redis,
+    and only queried from ES if Redis does not have them either.
+
     :param index: An Elasticsearch index, such as `'image'`.
     :return: A dictionary mapping sources to the count of their images.`
     """
+
+    if (sources := _sources_local_cache.get(index)) is None:
+        sources = _get_sources(index)
+        _sources_local_cache.set(index, sources)
+    # Callers may modify the dictionary
+    return dict(sources)
+
+
+def _get_sources(index):
+    """
+    Get the sources of the index from Redis, refreshing them if stale.
+
+    Sources are fresh for ``SOURCE_CACHE_TIMEOUT`` seconds, after which they
+    are still served for up to ``SOURCE_CACHE_STALE_TIMEOUT`` seconds, while
+    they are refreshed in the background. Only one refresh of an index runs at
+    a time across all workers. The sources are only queried from ES while
+    serving the request if they are not in Redis at all.
+    """
+
     source_cache_name = "sources-" + index
     cache_fetch_failed = False
     try:
-        sources = cache.get(key=source_cache_name)
+        entry = cache.get(key=source_cache_name)
     except ValueError:
         cache_fetch_failed = True
-        sources = None
+        entry = None
         logger.warning("Source cache fetch failed due to corruption")
     except ConnectionError:
         cache_fetch_failed = True
-        sources = None
+        entry = None
         logger.warning("Redis connect failed, cannot get cached sources.")
 
-    if isinstance(sources, list) or cache_fetch_failed:
-        sources = None
+    is_entry = isinstance(entry, dict) and "fresh_until" in entry
+    if (entry is not None and not is_entry) or cache_fetch_failed:
+        entry = None
         try:
-            # Invalidate old source format.
+            # Invalidate old source formats.
             cache.delete(key=source_cache_name)
         except ConnectionError:
             logger.warning("Redis connect failed, cannot invalidate cached sources.")
 
-    if not sources:
-        # Don't increase `size` without reading this issue first:
-        # https://github.com/elastic/elasticsearch/issues/18838
-        size = 100
-        body = {
-            "size": 0,
-            "aggs": {
-                "unique_sources": {
-                    "terms": {
-                        "field": "source",
-                        "size": size,
-                        "order": {"_key": "desc"},
-                    }
+    if not entry or not entry["sources"]:
+        sources = _query_sources(index)
+        _cache_sources(index, sources)
+    else:
+        sources = entry["sources"]
+        if entry["fresh_until"] <= time.time():
+            _refresh_sources_in_background(index)
+
+    sources = {source: int(doc_count) for source, doc_count in sources.items()}
+    return sources
+
+
+def _query_sources(index) -> dict[str, int]:
+    # Don't increase `size` without reading this issue first:
+    # https://github.com/elastic/elasticsearch/issues/18838
+    size = 100
+    body = {
+        "size": 0,
+        "aggs": {
+            "unique_sources": {
+                "terms": {
+                    "field": "source",
+                    "size": size,
+                    "order": {"_key": "desc"},
                 }
+            }
+        },
+    }
+    try:
+        results = get_raw_es_response(
+            index=index,
+            body=body,
+            request_cache=True,
+            es_query="sources",
+        )
+        buckets = results["aggregations"]["unique_sources"]["buckets"]
+    except NotFoundError:
+        buckets = [{"key": "none_found", "doc_count": 0}]
+    return {result["key"]: result["doc_count"] for result in buckets}
+
+
+def _cache_sources(index, sources: dict[str, int]) -> None:
+    try:
+        cache.set(
+            key="sources-" + index,
+            timeout=SOURCE_CACHE_TIMEOUT + SOURCE_CACHE_STALE_TIMEOUT,
+            value={
+                "fresh_until": time.time() + SOURCE_CACHE_TIMEOUT,
+                "sources": sources,
             },
-        }
-        try:
-            results = get_raw_es_response(
-                index=index,
-                body=body,
-                request_cache=True,
-                es_query="sources",
-            )
-            buckets = results["aggregations"]["unique_sources"]["buckets"]
-        except NotFoundError:
-            buckets = [{"key": "none_found", "doc_count": 0}]
-        sources = {result["key"]: result["doc_count"] for result in buckets}
+        )
+    except ConnectionError:
+        logger.warning("Redis connect failed, cannot cache sources.")
+
 
+def _refresh_sources(index) -> None:
+    lock_key = f"sources-{index}:refresh_lock"
+    try:
+        _cache_sources(index, _query_sources(index))
+    except Exception as exc:
+        logger.warning("Could not refresh sources", index=index, error=str(exc))
+    finally:
         try:
-            cache.set(
-                key=source_cache_name, timeout=SOURCE_CACHE_TIMEOUT, value=sources
-            )
+            cache.delete(lock_key)
         except ConnectionError:
-            logger.warning("Redis connect failed, cannot cache sources.")
+            logger.warning("Redis connect failed, cannot release sources refresh lock.")
+
+
+def _refresh_sources_in_background(index) -> Future | None:
+    """
+    Refresh the sources of the index in a background thread, unless another
+    worker is already refreshing them.
+
+    :return: The future of the refresh, ``None`` if it was not started.
+    """
+
+    try:
+        # The lock expires in case the worker dies while refreshing
+        is_locked = not cache.add(
+            f"sources-{index}:refresh_lock", 1, timeout=SOURCE_REFRESH_LOCK_TIMEOUT
+        )
+    except ConnectionError:
+        logger.warning("Redis connect failed, cannot refresh sources.")
+        return None
+    if is_locked:
+        return None
+    return _sources_refresh_executor.submit(_refresh_sources, index)
 
-    sources = {source: int(doc_count) for source, doc_count in sources.items()}
-    return sources
+
+@receiver(asgi_startup)
+async def warm_up_sources(sender, **kwargs):
+    """
+    Cache the sources of each media type when the worker starts, so that the
+    first requests after a deployment do not have to query them from ES.
+    """
+
+    for media_type in MEDIA_TYPES:
+        try:
+            await sync_to_async(get_sources)(media_type)
+        except Exception as exc:
+            logger.warning(
+                "Could not warm up sources", index=media_type, error=str(exc)
+            )
 
 
 def _get_result_and_page_count(
@@ -609,6 +1446,11 @@ def _get_result_and_page_count(
     """
     Adjust page count because ES disallows deep pagination of ranked queries.
 
+    If ES stopped counting the hits at ``TRACK_TOTAL_HITS``, the counts are
+    lower bounds. They are still at least the deepest pagination allowed, to
+    which they are then clamped, so responses are the same as if the hits had
+    all been counted.
+
     :param response_obj: The original Elasticsearch response object.
     :param results: The list of filtered result Hits.
     :return: Result and page count.
@@ -616,9 +1458,15 @@ def _get_result_and_page_count(
     if not results:
         return 0, 0
 
-    result_count = response_obj.hits.total.value
+    total = response_obj.hits.total
+    result_count = total.value
     page_count = ceil(result_count / page_size)
 
+    if getattr(total, "relation", "eq") == "gte":
+        # The page can only be short because the result window was reached,
+        # rather than because the hits were exhausted
+        return result_count, page_count
+
     if len(results) < page_size:
         if page_count == 1:
             result_count = len(results)
@@ -277,6 +277,7 @@ NON_FILTER_FIELDS = [
     COLLECTION,
     "page",
     "page_size",
+    "cursor",
     "unstable__sort_by",
     "unstable__sort_dir",
     "unstable__authority",
@@ -0,0 +1,102 @@
+import time
+
+import django_redis
+from django_tqdm import BaseCommand
+from elasticsearch_dsl import Search
+
+from api.controllers.elasticsearch.helpers import get_es_response
+from api.utils import tallies
+from api.utils.check_dead_links import check_dead_links, revalidate_links
+from api.utils.check_dead_links.status_cache import get_expiring_urls
+from api.utils.dead_link_mask import get_query_mask
+
+
+class Command(BaseCommand):
+    """
+    Validate the links of popular queries before users request them.
+
+    The link statuses of the top results of the most popular queries are
+    revalidated if they are not cached or about to expire, at a limited rate to
+    spare the providers. The dead link mask of each query is then rebuilt from
+    the refreshed statuses, so that users of popular queries neither wait for
+    link validation nor get results that have since died.
+
+    This command is meant to run periodically, more often than the
+    ``--expiring_within`` window.
+    """
+
+    help = "Validates the links of popular queries before users request them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queries",
+            help="The number of most popular queries to prevalidate.",
+            type=int,
+            default=100,
+        )
+        parser.add_argument(
+            "--depth",
+            help="The number of top results of each query to prevalidate.",
+            type=int,
+            default=80,
+        )
+        parser.add_argument(
+            "--expiring_within",
+            help="Revalidate the links whose statuses expire within this many seconds.",
+            type=int,
+            default=60 * 60 * 24,
+        )
+        parser.add_argument(
+            "--rate",
+            help="The maximum number of links to revalidate per second.",
+            type=float,
+            default=20,
+        )
+
+    def _revalidate(self, results, rate) -> None:
+        """Revalidate the links of the results, at most ``rate`` per second."""
+
+        batch_size = max(1, int(rate))
+        for start in range(0, len(results), batch_size):
+            batch = results[start : start + batch_size]
+            start_time = time.monotonic()
+            revalidate_links(batch)
+            if start + batch_size < len(results):
+                elapsed = time.monotonic() - start_time
+                time.sleep(max(0.0, len(batch) / rate - elapsed))
+
+    def handle(self, *args, **options):
+        redis = django_redis.get_redis_connection("default")
+        queries = tallies.get_popular_queries(options["queries"])
+        self.info(self.style.NOTICE(f"Prevalidating {len(queries)} popular queries"))
+
+        revalidated_count = 0
+        with self.tqdm(total=len(queries)) as progress:
+            for query_hash, index, query in queries:
+                s = Search(index=index).update_from_dict(query)
+                # Refresh the whole existing mask, not only its first results
+                depth = max(options["depth"], len(get_query_mask(query_hash)))
+                response = get_es_response(s[0:depth], es_query="prevalidation")
+                results = list(response)
+
+                expiring = set(
+                    get_expiring_urls(
+                        redis,
+                        [result.url for result in results],
+                        options["expiring_within"],
+                    )
+                )
+                to_revalidate = [result for result in results if result.url in expiring]
+                self._revalidate(to_revalidate, options["rate"])
+                revalidated_count += len(to_revalidate)
+
+                # All statuses are cached now, so the mask is rebuilt without
+                # any further requests to the providers.
+                check_dead_links(query_hash, 0, results)
+                progress.update(1)
+
+        self.info(
+            self.style.SUCCESS(
+                f"Revalidated {revalidated_count} links of {len(queries)} queries"
+            )
+        )
@@ -1,8 +1,23 @@
+from django.utils.decorators import sync_and_async_middleware
 from rest_framework.request import Request
 
+from asgiref.sync import iscoroutinefunction
+
 from api.models.oauth import ThrottledApplication
 
 
+def _add_headers(request: Request, response):
+    if not (hasattr(request, "auth") and hasattr(request.auth, "application")):
+        return response
+
+    application: ThrottledApplication = request.auth.application
+    response["x-ov-client-application-name"] = application.name
+    response["x-ov-client-application-verified"] = application.verified
+
+    return response
+
+
+@sync_and_async_middleware
 def response_headers_middleware(get_response):
     """
     Add standard response headers used by Nginx logging.
@@ -13,16 +28,14 @@ def response_headers_middleware(get_response):
     to identify malicious requesters or request patterns.
     """
 
-    def middleware(request: Request):
-        response = get_response(request)
+    if iscoroutinefunction(get_response):
 
-        if not (hasattr(request, "auth") and hasattr(request.auth, "application")):
-            return response
+        async def middleware(request: Request):
+            return _add_headers(request, await get_response(request))
 
-        application: ThrottledApplication = request.auth.application
-        response["x-ov-client-application-name"] = application.name
-        response["x-ov-client-application-verified"] = application.verified
+    else:
 
-        return response
+        def middleware(request: Request):
+            return _add_headers(request, get_response(request))
 
     return middleware
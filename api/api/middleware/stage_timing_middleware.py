@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework.request import Request
+
+from asgiref.sync import iscoroutinefunction
+
+from api.utils.stage_timing import (
+    StageTimings,
+    observe_stage_timings,
+    record_stage_timings,
+    time_stage,
+)
+
+
+def _report_stage_timings(request: Request, response, timings: StageTimings):
+    # Only the requests with timed stages, like searches, are observed
+    if len(timings.durations) > 1 and (match := request.resolver_match):
+        actions = getattr(match.func, "actions", {})
+        media_type = getattr(getattr(match.func, "cls", None), "media_type", None)
+        observe_stage_timings(
+            actions.get(request.method.lower(), match.url_name or "unknown"),
+            media_type or "",
+            timings,
+        )
+
+    if settings.ENABLE_SERVER_TIMING_HEADER or settings.DEBUG:
+        response["Server-Timing"] = timings.server_timing()
+    return response
+
+
+@sync_and_async_middleware
+def stage_timing_middleware(get_response):
+    """
+    Time the stages of the request, if ``ENABLE_STAGE_TIMING`` is set.
+
+    The durations are added to the histograms of the worker by the endpoint
+    and media type of the view. They are also returned in the ``Server-Timing``
+    header, with the total duration of the request, if
+    ``ENABLE_SERVER_TIMING_HEADER`` is set or in debug mode. See
+    ``api.utils.stage_timing``.
+
+    The middleware is async when the rest of the chain is, so that async views
+    are not run through ``async_to_sync``.
+    """
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request: Request):
+            if not settings.ENABLE_STAGE_TIMING:
+                return await get_response(request)
+
+            with record_stage_timings() as timings:
+                with time_stage("total"):
+                    response = await get_response(request)
+            return _report_stage_timings(request, response, timings)
+
+    else:
+
+        def middleware(request: Request):
+            if not settings.ENABLE_STAGE_TIMING:
+                return get_response(request)
+
+            with record_stage_timings() as timings:
+                with time_stage("total"):
+                    response = get_response(request)
+            return _report_stage_timings(request, response, timings)
+
+    return middleware
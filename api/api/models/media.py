@@ -14,6 +14,7 @@ from openverse_attribution.license import License
 from api.constants.moderation import DecisionAction
 from api.models.base import OpenLedgerModel
 from api.models.mixins import ForeignIdentifierMixin, IdentifierMixin, MediaMixin
+from api.utils.search_response_cache import invalidate_search_response_cache
 
 
 MATURE = "mature"
@@ -374,7 +375,8 @@ class PerformIndexUpdateMixin:
         Call ``method`` on the Elasticsearch client.
 
         Automatically handles ``DoesNotExist`` warnings, forces a refresh,
-        and calls the method for origin and filtered indexes.
+        and calls the method for origin and filtered indexes. Cached search
+        responses no longer reflect the indexes, so they are invalidated.
         """
         es: Elasticsearch = settings.ES
 
@@ -404,6 +406,18 @@ class PerformIndexUpdateMixin:
                 )
                 continue
 
+        invalidate_search_response_cache(self.media_class._meta.model_name)
+
+    def _invalidate_media_detail(self, identifier=None):
+        """Drop the cached media item, once the change is saved to the DB."""
+
+        # Imported here as the cache depends on the media models
+        from api.utils.media_detail_cache import invalidate_media
+
+        invalidate_media(
+            self.media_class._meta.model_name, identifier or self.media_obj_id
+        )
+
 
 class AbstractDeletedMedia(PerformIndexUpdateMixin, OpenLedgerModel):
     """
@@ -447,6 +461,7 @@ class AbstractDeletedMedia(PerformIndexUpdateMixin, OpenLedgerModel):
         self._update_es(True)
         super().save(*args, **kwargs)
         self.media_obj.delete()  # remove the actual model instance
+        self._invalidate_media_detail()
 
 
 class AbstractSensitiveMedia(PerformIndexUpdateMixin, models.Model):
@@ -497,10 +512,14 @@ class AbstractSensitiveMedia(PerformIndexUpdateMixin, models.Model):
     def save(self, *args, **kwargs):
         self._update_es(True, True)
         super().save(*args, **kwargs)
+        self._invalidate_media_detail()
 
     def delete(self, *args, **kwargs):
         self._update_es(False, False)
+        # Deleting the row unsets the primary key, ``media_obj``
+        identifier = self.media_obj_id
         super().delete(*args, **kwargs)
+        self._invalidate_media_detail(identifier)
 
 
 class AbstractMediaList(OpenLedgerModel):
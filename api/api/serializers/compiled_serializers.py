@@ -0,0 +1,231 @@
+"""
+Fast path for serializing lists of media, producing the same output as DRF.
+
+``MediaSerializer`` and its subclasses are compiled, once per request, into a
+list of functions, one per field. Most fields keep using the DRF field to
+produce their representation, but the fields that are the most expensive to
+serialize are replaced by plain Python equivalents:
+
+- hyperlinks are built from a URL template, rather than with ``reverse``
+- ``License`` objects are built once per license and version
+- tags are built as plain dictionaries
+- ``add_protocol`` is skipped for URLs that already have an HTTP(S) scheme
+
+``test.unit.serializers.test_compiled_serializers`` ensures that the output
+matches that of DRF.
+"""
+
+import functools
+from collections.abc import Callable
+from types import SimpleNamespace
+
+from rest_framework.fields import SkipField
+from rest_framework.relations import HyperlinkedIdentityField
+
+import structlog
+from openverse_attribution.license import License
+
+from api.constants import sensitivity
+from api.models.media import AbstractMedia
+from api.serializers.media_serializers import MediaSerializer
+from api.utils.url import add_protocol
+
+
+logger = structlog.get_logger(__name__)
+
+
+# An identifier matching the ``lookup_value_regex`` of the media views, that is
+# replaced by the identifier of each media item in the URL templates
+_PLACEHOLDER_IDENTIFIER = "00000000-0000-4000-8000-000000000000"
+
+_URL_FIELDS = ["url", "creator_url", "foreign_landing_url"]
+
+_SKIP = object()
+
+
+@functools.lru_cache(maxsize=1024)
+def get_license(license_: str, license_version: str | None) -> License | None:
+    """Get the license, ``None`` if it is not valid."""
+
+    try:
+        return License(license_, license_version)
+    except ValueError:
+        return None
+
+
+def _add_protocol(url: str | None) -> str | None:
+    if url is None or url.startswith(("https://", "http://")):
+        return url
+    return add_protocol(url)
+
+
+def _get_license_url(obj: AbstractMedia) -> str | None:
+    """Get ``AbstractMedia.license_url`` with a memoized license."""
+
+    if obj.meta_data and (url := obj.meta_data.get("license_url")):
+        return url
+
+    logger.warning(
+        "Media item missing `license_url` in `meta_data`",
+        media_class=obj.__class__.__name__,
+        identifier=obj.identifier,
+    )
+    if lic := get_license(obj.license.lower(), obj.license_version):
+        return lic.url
+    return None
+
+
+def _get_attribution(obj: AbstractMedia) -> str | None:
+    """Get ``AbstractMedia.attribution`` with a memoized license."""
+
+    if lic := get_license(obj.license.lower(), obj.license_version):
+        return lic.get_attribution_text(obj.title, obj.creator, _get_license_url(obj))
+    return None
+
+
+def _get_tags(obj: AbstractMedia) -> list[dict] | None:
+    """Serialize the tags as ``TagSerializer`` does."""
+
+    if obj.tags is None:
+        return None
+    return [
+        {
+            "name": str(tag["name"]),
+            "accuracy": (
+                None if (accuracy := tag.get("accuracy")) is None else float(accuracy)
+            ),
+            "unstable__provider": (
+                None if (provider := tag.get("provider")) is None else str(provider)
+            ),
+        }
+        for tag in obj.tags
+    ]
+
+
+class CompiledMediaSerializer:
+    """Serializes media like the DRF serializer it is compiled from, but faster."""
+
+    def __init__(self, serializer: MediaSerializer):
+        """
+        :param serializer: The DRF serializer of a single media item, with the
+        context of the request.
+        """
+
+        self.serializer = serializer
+        self.context = serializer.context
+        # ``AudioSerializer`` drops the hyperlink of missing thumbnails
+        self.nullable_thumbnail = "thumbnail" in serializer.fields and (
+            serializer.fields["thumbnail"].allow_null
+        )
+        self.fields = [
+            (name, self._compile_field(name, field))
+            for name, field in serializer.fields.items()
+            if not field.write_only
+        ]
+
+    def _compile_field(self, name, field) -> Callable[[AbstractMedia], object]:
+        if name == "tags":
+            return _get_tags
+        if name == "license_url":
+            return _get_license_url
+        if name == "attribution":
+            return _get_attribution
+        if name == "unstable__sensitivity":
+            return self._compile_sensitivity()
+        if isinstance(field, HyperlinkedIdentityField):
+            if hyperlink := self._compile_hyperlink(field):
+                return hyperlink
+        return self._compile_generic(field)
+
+    def _compile_sensitivity(self) -> Callable[[AbstractMedia], list[str]]:
+        sensitive_text = self.context.get("sensitive_text_result_identifiers", set())
+
+        def get_sensitivity(obj):
+            result = []
+            if str(obj.identifier) in sensitive_text:
+                result.append(sensitivity.TEXT)
+            if obj.sensitive:
+                result.append(sensitivity.USER_REPORTED)
+            return result
+
+        return get_sensitivity
+
+    def _compile_hyperlink(self, field) -> Callable[[AbstractMedia], str] | None:
+        """
+        Build the URL template of the hyperlink, from the URL of a placeholder.
+
+        :return: the function building the hyperlink from the template, or
+        ``None`` if the hyperlink cannot be templated.
+        """
+
+        format_ = self.context.get("format")
+        if format_ and field.format and field.format != format_:
+            format_ = field.format
+        placeholder = SimpleNamespace(
+            pk=_PLACEHOLDER_IDENTIFIER,
+            **{field.lookup_field: _PLACEHOLDER_IDENTIFIER},
+        )
+        url = field.get_url(
+            placeholder, field.view_name, self.context["request"], format_
+        )
+        if url is None or url.count(_PLACEHOLDER_IDENTIFIER) != 1:
+            return None
+
+        prefix, suffix = url.split(_PLACEHOLDER_IDENTIFIER)
+        lookup_field = field.lookup_field
+
+        def get_hyperlink(obj):
+            # Unsaved objects do not have a valid URL, see ``HyperlinkedRelatedField``
+            if obj.pk in (None, ""):
+                return None
+            return f"{prefix}{getattr(obj, lookup_field)}{suffix}"
+
+        return get_hyperlink
+
+    @staticmethod
+    def _compile_generic(field) -> Callable[[AbstractMedia], object]:
+        """Serialize the field as ``Serializer.to_representation`` does."""
+
+        def get_value(obj):
+            try:
+                attribute = field.get_attribute(obj)
+            except SkipField:
+                return _SKIP
+            if attribute is None:
+                return None
+            return field.to_representation(attribute)
+
+        return get_value
+
+    def to_representation(self, obj: AbstractMedia) -> dict:
+        output = {}
+        for name, get_value in self.fields:
+            if (value := get_value(obj)) is not _SKIP:
+                output[name] = value
+
+        # The post-processing of ``MediaSerializer.to_representation``
+        for list_field in ["tags", "fields_matched"]:
+            if output[list_field] is None:
+                output[list_field] = []
+        output["license"] = output["license"].lower()
+        for url_field in _URL_FIELDS:
+            output[url_field] = _add_protocol(output[url_field])
+
+        if self.nullable_thumbnail and not obj.thumbnail:
+            output["thumbnail"] = None
+        return output
+
+    def serialize(self, results: list) -> list[dict]:
+        """
+        Serialize the media items.
+
+        Items other than model instances, such as ES hits, are serialized by
+        the DRF serializer.
+        """
+
+        return [
+            self.to_representation(obj)
+            if isinstance(obj, AbstractMedia)
+            else self.serializer.to_representation(obj)
+            for obj in results
+        ]
@@ -4,6 +4,7 @@ from django.conf import settings
 from rest_framework import serializers
 
 from api.utils.help_text import make_comma_separated_help_text
+from api.utils.search_cursor import SearchCursor
 
 
 class SchemableHyperlinkedIdentityField(serializers.HyperlinkedIdentityField):
@@ -62,3 +63,21 @@ class EnumCharField(serializers.CharField):
         data = super().to_internal_value(data)
         self._validate_enum(data)
         return data
+
+
+class CursorField(serializers.CharField):
+    """This field parses the opaque search cursor into a ``SearchCursor``."""
+
+    default_error_messages = serializers.CharField.default_error_messages | {
+        "invalid_cursor": "Invalid cursor. Use the `next_cursor` of the previous page."
+    }
+
+    def to_internal_value(self, data) -> SearchCursor:
+        data = super().to_internal_value(data)
+        try:
+            return SearchCursor.decode(data)
+        except ValueError:
+            self.fail("invalid_cursor")
+
+    def to_representation(self, value: SearchCursor) -> str:
+        return value.encode()
@@ -31,8 +31,9 @@ from api.serializers.docs import (
     TAG_HELP_TEXT,
     UNSTABLE_WARNING,
 )
-from api.serializers.fields import SchemableHyperlinkedIdentityField
+from api.serializers.fields import CursorField, SchemableHyperlinkedIdentityField
 from api.utils.help_text import make_comma_separated_help_text
+from api.utils.search_cursor import SearchCursor
 from api.utils.url import add_protocol
 
 
@@ -53,6 +54,7 @@ class PaginatedRequestSerializer(serializers.Serializer):
     field_names = [
         "page_size",
         "page",
+        "cursor",
     ]
     page_size = serializers.IntegerField(
         label="page_size",
@@ -68,6 +70,18 @@ class PaginatedRequestSerializer(serializers.Serializer):
         default=1,
         min_value=1,
     )
+    cursor = CursorField(
+        label="cursor",
+        help_text=(
+            "Traverse the results with cursors instead of page numbers. Pass "
+            "`*` to get the first page, then the `next_cursor` of each page to "
+            "get the next one, until it is `null`. Deep pages take no longer "
+            "than the first, so prefer cursors to walk through many results. "
+            "Cannot be combined with `page`. "
+            f"{_SUBJECT_TO_PAGINATION_LIMITS}"
+        ),
+        required=False,
+    )
 
     def validate_page_size(self, value):
         level, max_value = restricted_features.MAX_PAGE_SIZE.request_level(
@@ -117,6 +131,18 @@ class PaginatedRequestSerializer(serializers.Serializer):
 
         return real_page_count
 
+    def clamp_next_cursor(self, next_cursor: SearchCursor | None):
+        """Drop the cursor of the next page if it is beyond the pagination depth."""
+
+        _, max_depth = restricted_features.MAX_RESULT_COUNT.request_level(
+            self.context.get("request")
+        )
+
+        if next_cursor is not None and next_cursor.depth >= max_depth:
+            return None
+
+        return next_cursor
+
     def validate(self, data):
         data = super().validate(data)
 
@@ -126,7 +152,14 @@ class PaginatedRequestSerializer(serializers.Serializer):
             self.context.get("request")
         )
 
-        requested_result_depth = data["page"] * data["page_size"]
+        if (cursor := data.get("cursor")) is not None:
+            if data["page"] != 1:
+                raise ValidationError(
+                    {"cursor": "The `cursor` and `page` parameters are exclusive."}
+                )
+            requested_result_depth = cursor.depth + data["page_size"]
+        else:
+            requested_result_depth = data["page"] * data["page_size"]
 
         result_depth_validator = MaxValueValidator(
             max_depth,
@@ -0,0 +1,58 @@
+import asyncio
+import weakref
+
+from django.conf import settings
+
+import sentry_sdk
+import structlog
+from django_asgi_lifespan.signals import asgi_shutdown
+from elasticsearch import AsyncElasticsearch
+
+
+logger = structlog.get_logger(__name__)
+
+
+_CLIENTS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncElasticsearch] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+@asgi_shutdown.connect
+async def _close_clients(sender, **kwargs):
+    logger.debug("Closing async Elasticsearch clients on application shutdown")
+
+    closed_clients = 0
+
+    while _CLIENTS:
+        loop, client = _CLIENTS.popitem()
+        try:
+            await client.close()
+            closed_clients += 1
+        except BaseException as exc:
+            logger.error(exc)
+            sentry_sdk.capture_exception(exc)
+
+    logger.debug("Successfully closed %s client(s)", closed_clients)
+
+
+async def get_async_es_client() -> AsyncElasticsearch:
+    """
+    Retrieve the shared async Elasticsearch client for the current event loop.
+
+    The async client holds an aiohttp session under the hood, which is bound
+    to the loop in which it was first used. For the same reasons as outlined
+    in ``get_aiohttp_session``, each loop gets its own client. The client is
+    configured identically to the sync client at ``settings.ES``.
+    """
+
+    loop = asyncio.get_running_loop()
+
+    # Creating the client does not yield to the loop, so there is no need
+    # for a lock here, unlike with ``get_aiohttp_session``.
+    if loop not in _CLIENTS:
+        logger.info("No async Elasticsearch client for loop. Creating new client.")
+        _CLIENTS[loop] = AsyncElasticsearch(
+            settings.ES_ENDPOINT, **settings.ES_CLIENT_OPTIONS
+        )
+
+    return _CLIENTS[loop]
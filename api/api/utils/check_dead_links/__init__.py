@@ -6,35 +6,80 @@ from django.conf import settings
 import aiohttp
 import django_redis
 import structlog
-from asgiref.sync import async_to_sync
+from asgiref.sync import async_to_sync, sync_to_async
 from decouple import config
 from elasticsearch_dsl.response import Hit
 from redis.exceptions import ConnectionError
 
 from api.utils.aiohttp import get_aiohttp_session
+from api.utils.check_dead_links.host_limits import (
+    CIRCUIT_OPEN_STATUS,
+    get_host,
+    get_host_semaphore,
+    get_open_hosts,
+    record_host_failures,
+)
 from api.utils.check_dead_links.provider_status_mappings import provider_status_mappings
-from api.utils.dead_link_mask import get_query_mask, save_query_mask
+from api.utils.check_dead_links.status_cache import (
+    cache_statuses,
+    get_cached_statuses,
+)
+from api.utils.dead_link_mask import update_query_mask
+from api.utils.local_cache import LocalTTLCache
+from api.utils.request_counters import increment_request_counter
+from api.utils.stage_timing import timed_stage
 
 
 logger = structlog.get_logger(__name__)
 
 
-CACHE_PREFIX = "valid:"
 HEADERS = {
     "User-Agent": settings.OUTBOUND_USER_AGENT_TEMPLATE.format(purpose="LinkValidation")
 }
 
 
+# Statuses recently read from or written to Redis by this worker, so that the
+# same URLs do not have to be read from Redis again for every search.
+_local_cache = LocalTTLCache(maxsize=settings.LINK_VALIDATION_LOCAL_CACHE_SIZE)
+
+
+def _get_local_expiry(status: int) -> int:
+    return min(
+        settings.LINK_VALIDATION_CACHE_EXPIRY_CONFIGURATION[status],
+        settings.LINK_VALIDATION_LOCAL_CACHE_MAX_TTL_SECONDS,
+    )
+
+
+def _get_locally_cached_statuses(urls: list[str]) -> list[int | None]:
+    """
+    Get the statuses of the URLs from the in-memory cache, ``None`` where missing.
+
+    The hits and misses are counted for the current request as
+    ``link_status_local_hits`` and ``link_status_local_misses``.
+    """
+
+    statuses = [_local_cache.get(url) for url in urls]
+    hits = sum(status is not None for status in statuses)
+    increment_request_counter("link_status_local_hits", hits)
+    increment_request_counter("link_status_local_misses", len(urls) - hits)
+    return statuses
+
+
 def _get_cached_statuses(redis, urls):
+    if not urls:
+        return []
+
     try:
-        cached_statuses = redis.mget([CACHE_PREFIX + url for url in urls])
-        return [
-            int(b.decode("utf-8")) if b is not None else None for b in cached_statuses
-        ]
+        statuses = get_cached_statuses(redis, urls)
     except ConnectionError:
         logger.warning("Redis connect failed, validating all URLs without cache.")
         return [None] * len(urls)
 
+    for url, status in zip(urls, statuses):
+        if status is not None:
+            _local_cache.set(url, status, ttl=_get_local_expiry(status))
+    return statuses
+
 
 def _get_expiry(status, default):
     return config(f"LINK_VALIDATION_CACHE_EXPIRY__{status}", default=default, cast=int)
@@ -51,9 +96,10 @@ async def _head(
     start_time = time.perf_counter()
 
     try:
-        response = await session.head(
-            url, allow_redirects=False, headers=HEADERS, timeout=_timeout
-        )
+        async with get_host_semaphore(get_host(url)):
+            response = await session.head(
+                url, allow_redirects=False, headers=HEADERS, timeout=_timeout
+            )
         status = response.status
     except (aiohttp.ClientError, asyncio.TimeoutError) as exception:
         if not isinstance(exception, asyncio.TimeoutError):
@@ -74,8 +120,6 @@ async def _head(
     return url, status
 
 
-# https://stackoverflow.com/q/55259755
-@async_to_sync
 async def _make_head_requests(
     urls: dict[str, int], results: list[Hit]
 ) -> list[tuple[str, int]]:
@@ -97,7 +141,125 @@ async def _make_head_requests(
     return responses.result()
 
 
-def check_dead_links(query_hash: str, start_slice: int, results: list[Hit]) -> None:
+def _is_kept(status: int, provider: str) -> bool:
+    """Whether a result with the given status stays in the results."""
+
+    status_mapping = provider_status_mappings[provider]
+    return status in status_mapping.live or status in status_mapping.unknown
+
+
+# Strong references to the tasks caching the statuses of requests that were
+# still in flight when enough live results were found, so that they are not
+# garbage collected before they are done.
+# https://docs.python.org/3/library/asyncio-task.html#asyncio.create_task
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _cache_in_background(redis, pending: list[asyncio.Future]) -> None:
+    """
+    Let the in-flight HEAD requests finish, only to cache their statuses.
+
+    If the event loop is closed first, as is the case for ``check_dead_links``,
+    the requests are cancelled along with the other remaining tasks.
+    """
+
+    async def cache_statuses():
+        verified = await asyncio.gather(*pending)
+        await sync_to_async(_save_statuses)(redis, verified)
+
+    task = asyncio.ensure_future(cache_statuses())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _stream_head_requests(
+    redis,
+    urls: dict[str, int],
+    results: list[Hit],
+    statuses: list[int | None],
+    live_needed: int,
+) -> tuple[list[tuple[str, int]], int]:
+    """
+    Concurrently HEAD request the urls, but validate the results in rank order.
+
+    As soon as ``live_needed`` results are known to be kept, the results after
+    them no longer matter, so the validation stops without waiting for their
+    requests. Those finish in the background to cache their statuses.
+
+    :param redis: The Redis connection to cache background statuses with.
+    :param urls: A dictionary with keys of the URLs to request, mapped to the index of that url in ``results``
+    :param results: The ordered list of results, including ones not being validated.
+    :param statuses: The status of each result, ``None`` where not yet known.
+    Updated in place with the statuses of the validated results.
+    :param live_needed: The number of kept results after which to stop.
+    :return: The verified statuses and the number of results validated.
+    """
+    session = await get_aiohttp_session()
+    tasks = {
+        url: asyncio.ensure_future(_head(url, session, results[idx].provider))
+        for url, idx in urls.items()
+    }
+
+    validated_count = len(results)
+    kept_count = 0
+    for idx, result in enumerate(results):
+        if statuses[idx] is None:
+            _, statuses[idx] = await tasks[result.url]
+        if _is_kept(statuses[idx], result.provider):
+            kept_count += 1
+            if kept_count == live_needed:
+                validated_count = idx + 1
+                break
+
+    verified = [task.result() for task in tasks.values() if task.done()]
+    if pending := [task for task in tasks.values() if not task.done()]:
+        logger.debug(f"validating len(pending)={len(pending)} in background")
+        _cache_in_background(redis, pending)
+
+    return verified, validated_count
+
+
+def _cache_statuses(redis, verified: list[tuple[str, int]]) -> None:
+    """Cache newly verified image statuses, both in memory and in Redis."""
+
+    for url, status in verified:
+        _local_cache.set(url, status, ttl=_get_local_expiry(status))
+
+    for url, status in verified:
+        if status == 200:
+            logger.debug(f"healthy link url={url}")
+        elif status == _TIMEOUT_STATUS or status == _ERROR_STATUS:
+            logger.debug(f"no response from provider url={url}")
+        else:
+            logger.debug(f"broken link url={url}")
+
+    try:
+        cache_statuses(redis, verified)
+    except ConnectionError:
+        logger.warning("Redis connect failed, cannot cache link liveness.")
+
+
+def _save_statuses(redis, verified: list[tuple[str, int]]) -> None:
+    """Cache newly verified statuses and record the failures of their hosts."""
+
+    _cache_statuses(redis, verified)
+    record_host_failures(
+        redis,
+        [
+            url
+            for url, status in verified
+            if status == _TIMEOUT_STATUS or status == _ERROR_STATUS
+        ],
+    )
+
+
+@timed_stage("dead_links")
+async def acheck_dead_links(
+    query_hash: str,
+    start_slice: int,
+    results: list[Hit],
+    live_needed: int | None = None,
+) -> None:
     """
     Make sure images exist before we display them.
 
@@ -105,7 +267,13 @@ def check_dead_links(query_hash: str, start_slice: int, results: list[Hit]) -> N
     generic "not found" placeholder.
 
     Results are cached in redis and shared amongst all API servers in the
-    cluster.
+    cluster. Each worker also keeps the statuses it recently saw in memory,
+    and only reads the ones it does not have from redis.
+
+    If ``live_needed`` is given, validation stops as soon as that many results,
+    in rank order, are known to be kept. Results after them are removed without
+    being validated and are not recorded in the dead link mask, so a slow
+    provider further down the slice does not hold up the response.
     """
     if not results:
         logger.info("link_validation_empty_results")
@@ -116,9 +284,17 @@ def check_dead_links(query_hash: str, start_slice: int, results: list[Hit]) -> N
     logger.debug("starting validation")
     start_time = time.time()
 
-    # Pull matching images from the cache.
+    # Pull matching images from the cache, from redis only those not in memory.
     redis = django_redis.get_redis_connection("default")
-    cached_statuses = _get_cached_statuses(redis, urls)
+    cached_statuses = _get_locally_cached_statuses(urls)
+    uncached_idxs = [
+        idx for idx, status in enumerate(cached_statuses) if status is None
+    ]
+    redis_statuses = await sync_to_async(_get_cached_statuses)(
+        redis, [urls[idx] for idx in uncached_idxs]
+    )
+    for idx, status in zip(uncached_idxs, redis_statuses):
+        cached_statuses[idx] = status
     logger.debug(f"len(cached_statuses)={len(cached_statuses)}")
 
     # Anything that isn't in the cache needs to be validated via HEAD request.
@@ -128,36 +304,32 @@ def check_dead_links(query_hash: str, start_slice: int, results: list[Hit]) -> N
             to_verify[url] = idx
     logger.debug(f"len(to_verify)={len(to_verify)}")
 
-    verified = _make_head_requests(to_verify, results)
-
-    # Cache newly verified image statuses.
-    to_cache = {CACHE_PREFIX + url: status for url, status in verified}
-
-    pipe = redis.pipeline()
-    if len(to_cache) > 0:
-        pipe.mset(to_cache)
-
-    for key, status in to_cache.items():
-        if status == 200:
-            logger.debug(f"healthy link key={key}")
-        elif status == _TIMEOUT_STATUS or status == _ERROR_STATUS:
-            logger.debug(f"no response from provider key={key}")
-        else:
-            logger.debug(f"broken link key={key}")
-
-        expiry = settings.LINK_VALIDATION_CACHE_EXPIRY_CONFIGURATION[status]
-        logger.debug(f"caching status={status} expiry={expiry}")
-        pipe.expire(key, expiry)
-
-    try:
-        pipe.execute()
-    except ConnectionError:
-        logger.warning("Redis connect failed, cannot cache link liveness.")
+    # Skip hosts that keep failing, their results' status is unknown.
+    open_hosts = await sync_to_async(get_open_hosts)(
+        redis, {get_host(url) for url in to_verify}
+    )
+    for url, idx in list(to_verify.items()):
+        if get_host(url) in open_hosts:
+            cached_statuses[idx] = CIRCUIT_OPEN_STATUS
+            del to_verify[url]
+
+    if live_needed is None:
+        verified = await _make_head_requests(to_verify, results)
+
+        # Merge newly verified results with cached statuses
+        for idx, url in enumerate(to_verify):
+            cache_idx = to_verify[url]
+            cached_statuses[cache_idx] = verified[idx][1]
+    else:
+        # Newly verified statuses are merged as the results are validated
+        verified, validated_count = await _stream_head_requests(
+            redis, to_verify, results, cached_statuses, live_needed
+        )
+        # Drop the results that were not needed, and so not validated
+        del results[validated_count:]
+        del cached_statuses[validated_count:]
 
-    # Merge newly verified results with cached statuses
-    for idx, url in enumerate(to_verify):
-        cache_idx = to_verify[url]
-        cached_statuses[cache_idx] = verified[idx][1]
+    await sync_to_async(_save_statuses)(redis, verified)
 
     # Create a new dead link mask
     new_mask = [1] * len(results)
@@ -189,14 +361,7 @@ def check_dead_links(query_hash: str, start_slice: int, results: list[Hit]) -> N
             # update the result's position in the mask to indicate it is dead
             new_mask[del_idx] = 0
 
-    # Merge and cache the new mask
-    mask = get_query_mask(query_hash)
-    if mask:
-        # skip the leading part of the mask that represents results that come before
-        # the results we've verified this time around. Overwrite everything after
-        # with our new results validation mask.
-        new_mask = mask[:start_slice] + new_mask
-    save_query_mask(query_hash, new_mask)
+    await sync_to_async(update_query_mask)(query_hash, start_slice, new_mask)
 
     end_time = time.time()
     logger.debug(
@@ -205,3 +370,30 @@ def check_dead_links(query_hash: str, start_slice: int, results: list[Hit]) -> N
         f"start_time={start_time} "
         f"delta={end_time - start_time} "
     )
+
+
+async def arevalidate_links(results: list[Hit]) -> None:
+    """
+    Validate the links of the results and cache their statuses, whether or not
+    they are already cached.
+
+    Links to hosts whose circuit breaker is open are not validated.
+    """
+    redis = django_redis.get_redis_connection("default")
+    urls = {result.url: idx for idx, result in enumerate(results)}
+
+    open_hosts = await sync_to_async(get_open_hosts)(
+        redis, {get_host(url) for url in urls}
+    )
+    to_verify = {
+        url: idx for url, idx in urls.items() if get_host(url) not in open_hosts
+    }
+
+    verified = await _make_head_requests(to_verify, results)
+    await sync_to_async(_save_statuses)(redis, verified)
+
+
+# Sync entrypoints for callers that are not yet async, like ``related_media``.
+# https://stackoverflow.com/q/55259755
+check_dead_links = async_to_sync(acheck_dead_links)
+revalidate_links = async_to_sync(arevalidate_links)
@@ -0,0 +1,122 @@
+"""
+Per-host limits for link validation requests.
+
+Each host gets a cap on the number of concurrent HEAD requests, and a circuit
+breaker that opens when too many requests to the host time out or fail. The
+breaker state is kept in Redis so that it is shared by all API workers.
+"""
+
+import asyncio
+import weakref
+from collections import Counter, defaultdict
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+import structlog
+from redis.exceptions import ConnectionError
+
+
+logger = structlog.get_logger(__name__)
+
+
+# The status given to URLs whose host's circuit breaker is open. It is one of
+# the ``unknown`` statuses of every provider, so the results are kept.
+CIRCUIT_OPEN_STATUS = -3
+
+FAILURES_KEY_PREFIX = "link_validation_circuit_failures:"
+OPEN_KEY_PREFIX = "link_validation_circuit_open:"
+
+
+_SEMAPHORES: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, defaultdict[str, asyncio.Semaphore]
+] = weakref.WeakKeyDictionary()
+
+
+def get_host(url: str) -> str:
+    return urlparse(url).hostname or ""
+
+
+def get_host_semaphore(host: str) -> asyncio.Semaphore:
+    """
+    Get the semaphore limiting concurrent requests to the host.
+
+    Semaphores are bound to the event loop in which they are first used, so,
+    like aiohttp sessions, each loop gets its own.
+    """
+
+    loop = asyncio.get_running_loop()
+    if loop not in _SEMAPHORES:
+        _SEMAPHORES[loop] = defaultdict(
+            lambda: asyncio.Semaphore(
+                settings.LINK_VALIDATION_MAX_CONCURRENT_REQUESTS_PER_HOST
+            )
+        )
+    return _SEMAPHORES[loop][host]
+
+
+def get_open_hosts(redis, hosts: set[str]) -> set[str]:
+    """
+    Get the hosts whose circuit breaker is open.
+
+    :param redis: The Redis connection.
+    :param hosts: The hosts to check.
+    :return: The subset of ``hosts`` not to send requests to.
+    """
+
+    if not hosts:
+        return set()
+
+    hosts = list(hosts)
+    try:
+        is_open = redis.mget([OPEN_KEY_PREFIX + host for host in hosts])
+    except ConnectionError:
+        logger.warning("Redis connect failed, cannot get open circuit breakers.")
+        return set()
+
+    return {host for host, state in zip(hosts, is_open) if state is not None}
+
+
+def record_host_failures(redis, failed_urls: list[str]) -> None:
+    """
+    Count the failed requests per host and open the breakers of failing hosts.
+
+    Failures are counted over a fixed window. Once a host reaches the failure
+    threshold within the window, its breaker opens for a while, after which
+    requests are sent to it again.
+
+    :param redis: The Redis connection.
+    :param failed_urls: The URLs whose requests timed out or errored.
+    """
+
+    if not failed_urls:
+        return
+
+    failures = Counter(get_host(url) for url in failed_urls)
+    window = settings.LINK_VALIDATION_CIRCUIT_BREAKER_WINDOW_SECONDS
+
+    try:
+        pipe = redis.pipeline()
+        for host, count in failures.items():
+            pipe.incrby(FAILURES_KEY_PREFIX + host, count)
+            pipe.expire(FAILURES_KEY_PREFIX + host, window, nx=True)
+        counts = pipe.execute()[::2]
+
+        pipe = redis.pipeline()
+        for host, count in zip(failures, counts):
+            if count < settings.LINK_VALIDATION_CIRCUIT_BREAKER_FAILURE_THRESHOLD:
+                continue
+
+            logger.warning(
+                "Opening link validation circuit breaker", host=host, failures=count
+            )
+            pipe.set(
+                OPEN_KEY_PREFIX + host,
+                count,
+                ex=settings.LINK_VALIDATION_CIRCUIT_BREAKER_OPEN_SECONDS,
+                nx=True,
+            )
+            pipe.delete(FAILURES_KEY_PREFIX + host)
+        pipe.execute()
+    except ConnectionError:
+        logger.warning("Redis connect failed, cannot record host failures.")
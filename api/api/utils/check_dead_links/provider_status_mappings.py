@@ -3,10 +3,12 @@
 from collections import defaultdict
 from dataclasses import dataclass
 
+from api.utils.check_dead_links.host_limits import CIRCUIT_OPEN_STATUS
+
 
 @dataclass
 class StatusMapping:
-    unknown: tuple[int] = (429, 403)
+    unknown: tuple[int] = (429, 403, CIRCUIT_OPEN_STATUS)
     live: tuple[int] = (200,)
 
 
@@ -14,14 +16,14 @@ provider_status_mappings = defaultdict(
     StatusMapping,
     thingiverse=StatusMapping(
         # https://github.com/WordPress/openverse/issues/900
-        unknown=(429,),
+        unknown=(429, CIRCUIT_OPEN_STATUS),
     ),
     flickr=StatusMapping(
         # https://github.com/WordPress/openverse/issues/1200
-        unknown=(429,),
+        unknown=(429, CIRCUIT_OPEN_STATUS),
     ),
     europeana=StatusMapping(
         # https://github.com/WordPress/openverse/issues/2417
-        unknown=(429,),
+        unknown=(429, CIRCUIT_OPEN_STATUS),
     ),
 )
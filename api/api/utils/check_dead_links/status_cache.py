@@ -0,0 +1,228 @@
+"""
+Compact Redis storage for the statuses of validated links.
+
+Statuses are stored as fields of Redis hashes rather than as a key per URL,
+which avoids the considerable per-key overhead of Redis and of their
+individual expiries. The field is a fixed-size digest of the URL rather than
+the URL itself, and the value is the status encoded as a single byte followed
+by the timestamp at which it was written.
+
+Redis can only expire whole hashes, so the hashes are grouped by expiry
+class, the expiry of the statuses they hold, and by generation, a slice of
+time of ``EXPIRIES_PER_GENERATION`` times the expiry. Statuses are written to
+the hash of the current generation of their expiry class, which Redis expires
+``expiry`` seconds after the end of the generation, and are ignored once
+``expiry`` seconds have passed since they were written. The previous
+generation can therefore only hold live statuses during the first ``expiry``
+seconds of the current one, while the generations rotate, and it is not read
+otherwise. Finally, each generation is split into a fixed number of shards,
+so that no single hash grows too large.
+"""
+
+import time
+from hashlib import blake2b
+from http import HTTPStatus
+
+from django.conf import settings
+
+
+CACHE_PREFIX = "link_status:"
+LEGACY_CACHE_PREFIX = "valid:"
+
+# The longer the generations, the less often the previous one must be read,
+# but the longer the expired statuses of a hash are kept around
+EXPIRIES_PER_GENERATION = 2
+DIGEST_SIZE = 12
+TIMESTAMP_SIZE = 4
+
+# The statuses that can be stored as a single byte, their index in this tuple.
+# These are the statuses used for requests that failed without a response and
+# the standard HTTP statuses.
+_STATUSES = (-2, -1, *sorted(HTTPStatus))
+_ENCODED_STATUSES = {status: bytes([idx]) for idx, status in enumerate(_STATUSES)}
+
+
+def encode_status(status: int) -> bytes:
+    """
+    Encode the status as a single byte.
+
+    Non-standard HTTP statuses are stored as the generic status of their
+    class, for example 499 is stored as 400.
+    """
+
+    if status in _ENCODED_STATUSES:
+        return _ENCODED_STATUSES[status]
+    return _ENCODED_STATUSES.get(status // 100 * 100, _ENCODED_STATUSES[500])
+
+
+def decode_status(value: bytes) -> int:
+    return _STATUSES[value[0]]
+
+
+def _encode_value(status: int, written_at: int) -> bytes:
+    return encode_status(status) + written_at.to_bytes(TIMESTAMP_SIZE, "big")
+
+
+def _decode_value(value: bytes) -> tuple[int, int]:
+    """Decode the value of a field into its status and write timestamp."""
+
+    return decode_status(value), int.from_bytes(value[1:], "big")
+
+
+def get_url_digest(url: str) -> bytes:
+    return blake2b(url.encode(), digest_size=DIGEST_SIZE).digest()
+
+
+def _get_expiry_classes() -> set[int]:
+    expiry_configuration = settings.LINK_VALIDATION_CACHE_EXPIRY_CONFIGURATION
+    return {expiry_configuration.default_factory(), *expiry_configuration.values()}
+
+
+def _get_generation_length(expiry: int) -> int:
+    return max(1, expiry * EXPIRIES_PER_GENERATION)
+
+
+def _get_shard(digest: bytes) -> int:
+    return digest[0] % settings.LINK_VALIDATION_CACHE_SHARDS
+
+
+def _get_key(expiry: int, generation: int, shard: int) -> str:
+    return f"{CACHE_PREFIX}{expiry}:{generation}:{shard}"
+
+
+def _read_cached_statuses(
+    redis, urls: list[str]
+) -> tuple[list[int | None], list[int | None]]:
+    """
+    Read the cached statuses of the URLs and the time at which they expire.
+
+    :return: The status of each URL, ``None`` for those not cached, and the
+    timestamp at which it expires, ``None`` for those not cached or only
+    cached under their legacy key.
+    """
+
+    if not urls:
+        return [], []
+
+    now = int(time.time())
+    digests = [get_url_digest(url) for url in urls]
+    # The indices of the URLs in ``urls`` by the shard they are in
+    shards: dict[int, list[int]] = {}
+    for idx, digest in enumerate(digests):
+        shards.setdefault(_get_shard(digest), []).append(idx)
+
+    pipe = redis.pipeline(transaction=False)
+    # The expiry and URL indices of each read, in pipeline order
+    reads: list[tuple[int, list[int]]] = []
+    for expiry in _get_expiry_classes():
+        length = _get_generation_length(expiry)
+        current = now // length
+        generations = [current]
+        # Statuses written at the end of the previous generation are live for
+        # up to ``expiry`` seconds into the current one
+        if now - current * length < expiry:
+            generations.append(current - 1)
+        for generation in generations:
+            for shard, idxs in shards.items():
+                pipe.hmget(
+                    _get_key(expiry, generation, shard), [digests[i] for i in idxs]
+                )
+                reads.append((expiry, idxs))
+
+    legacy_fallback = settings.LINK_VALIDATION_CACHE_LEGACY_FALLBACK
+    if legacy_fallback:
+        pipe.mget([LEGACY_CACHE_PREFIX + url for url in urls])
+
+    responses = pipe.execute()
+
+    statuses: list[int | None] = [None] * len(urls)
+    expires_at: list[int | None] = [None] * len(urls)
+    # The status of a URL can be cached in more than one expiry class or
+    # generation if it changed, in which case the most recently written one is
+    # used.
+    cached_at = [-1] * len(urls)
+    for (expiry, idxs), values in zip(reads, responses):
+        for idx, value in zip(idxs, values):
+            if value is None:
+                continue
+            status, written_at = _decode_value(value)
+            if written_at + expiry > now and written_at > cached_at[idx]:
+                statuses[idx] = status
+                expires_at[idx] = written_at + expiry
+                cached_at[idx] = written_at
+
+    if legacy_fallback:
+        for idx, value in enumerate(responses[-1]):
+            if statuses[idx] is None and value is not None:
+                statuses[idx] = int(value.decode("utf-8"))
+
+    return statuses, expires_at
+
+
+def get_cached_statuses(redis, urls: list[str]) -> list[int | None]:
+    """
+    Get the cached statuses of the URLs, ``None`` for those not cached.
+
+    The hashes of the shards of the URLs, in the live generations of each
+    expiry class, are read in a single round trip. If
+    ``LINK_VALIDATION_CACHE_LEGACY_FALLBACK`` is enabled, the legacy keys of
+    the URLs are read in the same round trip, and used for the URLs missing
+    from the hashes.
+
+    :raises redis.exceptions.ConnectionError: if Redis cannot be reached
+    """
+
+    statuses, _ = _read_cached_statuses(redis, urls)
+    return statuses
+
+
+def get_expiring_urls(redis, urls: list[str], within: int) -> list[str]:
+    """
+    Get the URLs whose status is not cached or expires within ``within`` seconds.
+
+    Statuses only cached under their legacy key are considered expiring, so
+    that revalidating them migrates them to the compact layout.
+
+    :raises redis.exceptions.ConnectionError: if Redis cannot be reached
+    """
+
+    _, expires_at = _read_cached_statuses(redis, urls)
+    deadline = int(time.time()) + within
+    return [
+        url
+        for url, expiry in zip(urls, expires_at)
+        if expiry is None or expiry <= deadline
+    ]
+
+
+def cache_statuses(redis, verified: list[tuple[str, int]]) -> None:
+    """
+    Cache the statuses of the URLs, each for the expiry configured for it.
+
+    All statuses are written in a single round trip, with one ``HSET`` and one
+    ``EXPIREAT`` per hash written to.
+
+    :raises redis.exceptions.ConnectionError: if Redis cannot be reached
+    """
+
+    if not verified:
+        return
+
+    now = int(time.time())
+    expiry_configuration = settings.LINK_VALIDATION_CACHE_EXPIRY_CONFIGURATION
+    # The fields and expiry timestamp of each hash to write to
+    writes: dict[str, tuple[dict[bytes, bytes], int]] = {}
+    for url, status in verified:
+        expiry = expiry_configuration[status]
+        length = _get_generation_length(expiry)
+        generation = now // length
+        digest = get_url_digest(url)
+        key = _get_key(expiry, generation, _get_shard(digest))
+        fields, _ = writes.setdefault(key, ({}, (generation + 1) * length + expiry))
+        fields[digest] = _encode_value(status, now)
+
+    pipe = redis.pipeline(transaction=False)
+    for key, (fields, expires_at) in writes.items():
+        pipe.hset(key, mapping=fields)
+        pipe.expireat(key, expires_at)
+    pipe.execute()
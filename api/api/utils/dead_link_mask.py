@@ -1,9 +1,14 @@
+import hashlib
+import json
+
 import django_redis
 import structlog
 from deepdiff import DeepHash
 from elasticsearch_dsl import Search
 from redis.exceptions import ConnectionError
 
+from api.utils.stage_timing import timed_stage
+
 
 logger = structlog.get_logger(__name__)
 
@@ -16,9 +21,33 @@ def get_query_hash(s: Search) -> str:
     """
     Hash the search query using a deterministic algorithm.
 
-    Generates a deterministic Murmur3 or SHA256 hash from the serialized Search
-    object using DeepHash so that two Search objects with the same content will
-    produce the same hash.
+    Serializes the Search object to canonical JSON, with sorted keys and
+    without the ``from`` and ``size`` pagination parameters, and hashes it with
+    BLAKE2b, so that two Search objects with the same content will produce the
+    same hash regardless of the requested page. The ``_source`` filtering and
+    ``track_total_hits`` are left out too, as they do not change which hits
+    are returned.
+
+    :param s: Search object to be serialized and hashed.
+    :return: Serialized Search object hash.
+    """
+    serialized_search_obj = s.to_dict()
+    serialized_search_obj.pop("from", None)
+    serialized_search_obj.pop("size", None)
+    serialized_search_obj.pop("_source", None)
+    serialized_search_obj.pop("track_total_hits", None)
+    canonical_search_obj = json.dumps(
+        serialized_search_obj, sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.blake2b(canonical_search_obj.encode(), digest_size=16).hexdigest()
+
+
+def get_legacy_query_hash(s: Search) -> str:
+    """
+    Hash the search query using DeepHash, as masks were keyed before.
+
+    Only used to find masks saved before the switch to ``get_query_hash``,
+    see ``migrate_legacy_query_mask``.
 
     :param s: Search object to be serialized and hashed.
     :return: Serialized Search object hash.
@@ -26,26 +55,137 @@ def get_query_hash(s: Search) -> str:
     serialized_search_obj = s.to_dict()
     serialized_search_obj.pop("from", None)
     serialized_search_obj.pop("size", None)
+    serialized_search_obj.pop("_source", None)
+    serialized_search_obj.pop("track_total_hits", None)
     deep_hash = DeepHash(serialized_search_obj)[serialized_search_obj]
     return deep_hash
 
 
-def get_query_mask(query_hash: str) -> list[int]:
+# The widest unsigned integer type supported by ``BITFIELD``
+_BITFIELD_CHUNK_SIZE = 63
+
+
+def _get_mask_keys(query_hash: str) -> tuple[str, str]:
+    """Get the keys of the mask bitmap and of its size for the given query hash."""
+
+    return f"{query_hash}:dead_link_bitmask", f"{query_hash}:dead_link_bitmask_size"
+
+
+def _set_bits(redis_pipe, key: str, offset: int, bits: list[int]):
+    """
+    Queue a ``BITFIELD`` command to write the bits starting from the given offset.
+
+    Bits are packed into the widest integers ``BITFIELD`` supports, so that
+    writing a slice of the mask takes a single command with a handful of
+    operations, regardless of the offset or the size of the whole mask.
+    """
+
+    if not bits:
+        return
+
+    bitfield = redis_pipe.bitfield(key)
+    for chunk_start in range(0, len(bits), _BITFIELD_CHUNK_SIZE):
+        chunk = bits[chunk_start : chunk_start + _BITFIELD_CHUNK_SIZE]
+        value = int("".join(str(bit) for bit in chunk), 2)
+        bitfield.set(f"u{len(chunk)}", offset + chunk_start, value)
+    bitfield.execute()
+
+
+class QueryMask:
+    """
+    The liveness of the results of a query, in order, backed by a Redis bitmap.
+
+    A set bit indicates that the result at that position is live. The size of
+    the mask and the number of live results are counted by Redis, so only
+    ``live_result_position`` ever needs to load the bitmap itself.
+    """
+
+    def __init__(self, query_hash: str, size: int = 0, live_count: int = 0):
+        self.query_hash = query_hash
+        self.size = size
+        self.live_count = live_count
+        self._bits: bytes | None = None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self):
+        bits = self._get_bits()
+        for position in range(self.size):
+            yield bits[position // 8] >> (7 - position % 8) & 1
+
+    @timed_stage("dead_link_mask")
+    def _get_bits(self) -> bytes:
+        if self._bits is None:
+            key, _ = _get_mask_keys(self.query_hash)
+            redis = django_redis.get_redis_connection("default")
+            try:
+                self._bits = redis.getrange(key, 0, (self.size - 1) // 8) or b""
+            except ConnectionError:
+                logger.warning("Redis connect failed, cannot get cached query mask.")
+                self._bits = b""
+            # Pad in case the bitmap expired since the counts were read
+            self._bits = self._bits.ljust((self.size + 7) // 8, b"\x00")
+        return self._bits
+
+    def live_result_position(self, live_result: int) -> int:
+        """
+        Find the position of the nth live result in the mask.
+
+        Redis has no command to select a set bit by its rank, so the bitmap is
+        scanned here one byte at a time. It is at most an eighth of the size of
+        the maximum result window.
+
+        :param live_result: The 1-based rank of the live result to find.
+        :return: The 0-based position of the live result.
+        :raises ValueError: If the mask has fewer live results than requested.
+        """
+
+        seen = 0
+        for byte_index, byte in enumerate(self._get_bits()):
+            byte_live_count = byte.bit_count()
+            if seen + byte_live_count < live_result:
+                seen += byte_live_count
+                continue
+
+            for bit_index in range(8):
+                seen += byte >> (7 - bit_index) & 1
+                if seen == live_result:
+                    position = byte_index * 8 + bit_index
+                    if position < self.size:
+                        return position
+                    break
+            break
+
+        raise ValueError(f"Mask has fewer than {live_result} live results.")
+
+
+@timed_stage("dead_link_mask")
+def get_query_mask(query_hash: str) -> QueryMask:
     """
     Fetch an existing query mask for a given query hash or returns an empty one.
 
     :param query_hash: Unique value for a particular query.
-    :return: Boolean mask as a list of integers (0 or 1).
+    :return: The query mask, empty if there is none.
     """
     redis = django_redis.get_redis_connection("default")
-    key = f"{query_hash}:dead_link_mask"
+    key, size_key = _get_mask_keys(query_hash)
+
+    redis_pipe = redis.pipeline()
+    redis_pipe.get(size_key)
+    redis_pipe.bitcount(key)
     try:
-        return list(map(int, redis.lrange(key, 0, -1)))
+        size, live_count = redis_pipe.execute()
     except ConnectionError:
         logger.warning("Redis connect failed, cannot get cached query mask.")
-        return []
+        return QueryMask(query_hash)
+
+    if size is None:
+        return QueryMask(query_hash)
+    return QueryMask(query_hash, int(size), live_count)
 
 
+@timed_stage("dead_link_mask")
 def save_query_mask(query_hash: str, mask: list):
     """
     Save a query mask to redis.
@@ -54,13 +194,91 @@ def save_query_mask(query_hash: str, mask: list):
     :param query_hash: Unique value to be used as key.
     """
     redis_pipe = django_redis.get_redis_connection("default").pipeline()
-    key = f"{query_hash}:dead_link_mask"
+    key, size_key = _get_mask_keys(query_hash)
 
     redis_pipe.delete(key)
-    redis_pipe.rpush(key, *mask)
+    _set_bits(redis_pipe, key, 0, mask)
+    redis_pipe.set(size_key, len(mask))
+    redis_pipe.expire(key, DEAD_LINK_MASK_TTL)
+    redis_pipe.expire(size_key, DEAD_LINK_MASK_TTL)
+
+    try:
+        redis_pipe.execute()
+    except ConnectionError:
+        logger.warning("Redis connect failed, cannot cache query mask.")
+
+
+@timed_stage("dead_link_mask")
+def update_query_mask(query_hash: str, start_slice: int, new_mask: list[int]):
+    """
+    Merge the new mask into the query mask from the given position.
+
+    Only the bits of the new mask are written. The bits after the new mask are
+    kept, so that a validation which stopped early, see ``acheck_dead_links``,
+    does not discard the statuses of deeper results validated before.
+
+    :param query_hash: Unique value for a particular query.
+    :param start_slice: The position of the first result in the new mask.
+    :param new_mask: Boolean mask as a list of integers (0 or 1).
+    """
+    redis = django_redis.get_redis_connection("default")
+    key, size_key = _get_mask_keys(query_hash)
+
+    try:
+        size = int(redis.get(size_key) or 0)
+    except ConnectionError:
+        logger.warning("Redis connect failed, cannot cache query mask.")
+        return
+
+    # The new mask can only extend the existing mask, there must not be gaps
+    offset = min(start_slice, size)
+    new_size = max(size, offset + len(new_mask))
+
+    redis_pipe = redis.pipeline()
+    _set_bits(redis_pipe, key, offset, new_mask)
+    redis_pipe.set(size_key, new_size)
     redis_pipe.expire(key, DEAD_LINK_MASK_TTL)
+    redis_pipe.expire(size_key, DEAD_LINK_MASK_TTL)
 
     try:
         redis_pipe.execute()
     except ConnectionError:
         logger.warning("Redis connect failed, cannot cache query mask.")
+
+
+def _get_legacy_query_mask(legacy_query_hash: str) -> list[int]:
+    """
+    Fetch the mask saved as a Redis list under the legacy hash of the query.
+
+    :param legacy_query_hash: The hash of the query, see ``get_legacy_query_hash``.
+    :return: Boolean mask as a list of integers (0 or 1), empty if there is none.
+    """
+    redis = django_redis.get_redis_connection("default")
+    try:
+        return list(
+            map(int, redis.lrange(f"{legacy_query_hash}:dead_link_mask", 0, -1))
+        )
+    except ConnectionError:
+        logger.warning("Redis connect failed, cannot get cached query mask.")
+        return []
+
+
+@timed_stage("dead_link_mask")
+def migrate_legacy_query_mask(s: Search, query_hash: str) -> QueryMask:
+    """
+    Copy the mask saved in the legacy format to the bitmap of the current hash.
+
+    Masks used to be saved as Redis lists, under the DeepHash of the query.
+    This keeps them usable until they expire, when
+    ``DEAD_LINK_MASK_LEGACY_HASH_FALLBACK`` is enabled.
+
+    :param s: The Search object of the query.
+    :param query_hash: The current hash of the query.
+    :return: The migrated query mask, empty if there is none.
+    """
+    legacy_query_mask = _get_legacy_query_mask(get_legacy_query_hash(s))
+    if not legacy_query_mask:
+        return QueryMask(query_hash)
+
+    save_query_mask(query_hash, legacy_query_mask)
+    return QueryMask(query_hash, len(legacy_query_mask), sum(legacy_query_mask))
@@ -1,4 +1,17 @@
-from rest_framework.renderers import BrowsableAPIRenderer
+from collections.abc import AsyncIterator, Iterator
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.http.response import HttpResponseBase
+from rest_framework import status
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.response import Response
+
+import orjson
+
+
+# Datetimes are serialized by DRF's encoder, which writes UTC offsets as ``Z``
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
 
 
 class BrowsableAPIRendererWithoutForms(BrowsableAPIRenderer):
@@ -25,3 +38,108 @@ class BrowsableAPIRendererWithoutForms(BrowsableAPIRenderer):
         rendered HTML, so let's simply return an empty string.
         """
         return ""
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renders JSON with orjson, like DRF's ``JSONRenderer``.
+
+    Types orjson does not support natively, such as ``Decimal``, datetimes and
+    lazy strings, are serialized by DRF's encoder. Data that orjson cannot
+    serialize at all, such as integers wider than 64 bits, and indented output
+    requested with the ``indent`` media type parameter, are rendered by DRF.
+
+    The output is not always the same bytes as DRF's. Floats are rendered to
+    the same values, but in exponent notation they may be formatted
+    differently, e.g. ``1e20`` rather than ``1e+20``. ``NaN`` and infinities,
+    which are not valid JSON and on which DRF raises, are rendered as ``null``.
+    """
+
+    def _dumps(self, data) -> bytes:
+        content = orjson.dumps(
+            data, default=self.encoder_class().default, option=ORJSON_OPTIONS
+        )
+        # Escape the line and paragraph separators, as ``JSONRenderer`` does
+        if b"\xe2\x80\xa8" in content or b"\xe2\x80\xa9" in content:
+            content = content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return content
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            return self._dumps(data)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+    def render_chunks(self, data: dict, chunk_size: int) -> Iterator[bytes]:
+        """
+        Render the paginated response in chunks, of up to ``chunk_size``
+        results each, which put together are the output of ``render``.
+        """
+
+        for index, (key, value) in enumerate(data.items()):
+            prefix = b"{" if index == 0 else b","
+            rendered_key = self.render(key)
+            if key != "results" or not value:
+                yield prefix + rendered_key + b":" + self.render(value)
+                continue
+
+            yield prefix + rendered_key + b":["
+            for start in range(0, len(value), chunk_size):
+                chunk = self.render(value[start : start + chunk_size])[1:-1]
+                yield chunk if start == 0 else b"," + chunk
+            yield b"]"
+        yield b"}" if data else b"{}"
+
+
+async def _aiter(chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+def stream_large_response(response: HttpResponseBase) -> HttpResponseBase:
+    """
+    Stream the paginated response in chunks, if it has at least
+    ``JSON_CHUNKED_RESPONSE_MIN_RESULTS`` results.
+
+    The response must have been finalized by the view, so that its renderer
+    was negotiated. Responses rendered other than by ``ORJSONRenderer`` are
+    returned unchanged.
+    """
+
+    min_results = settings.JSON_CHUNKED_RESPONSE_MIN_RESULTS
+    if (
+        not min_results
+        or not isinstance(response, Response)
+        or response.status_code != status.HTTP_200_OK
+        or not isinstance(getattr(response, "accepted_renderer", None), ORJSONRenderer)
+        or not isinstance(response.data, dict)
+        or len(response.data.get("results") or []) < min_results
+    ):
+        return response
+
+    renderer = response.accepted_renderer
+    content_type = response.accepted_media_type
+    if renderer.charset:
+        content_type = f"{content_type}; charset={renderer.charset}"
+    streaming_response = StreamingHttpResponse(
+        _aiter(
+            renderer.render_chunks(
+                response.data, settings.JSON_CHUNKED_RESPONSE_CHUNK_SIZE
+            )
+        ),
+        status=response.status_code,
+        content_type=content_type,
+    )
+    for header, value in response.items():
+        if header.lower() != "content-type":
+            streaming_response[header] = value
+    return streaming_response
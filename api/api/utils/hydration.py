@@ -0,0 +1,179 @@
+from django.db.models import QuerySet
+from django.db.models.fields.json import KT
+from django.utils.dateparse import parse_datetime
+
+from elasticsearch_dsl.response import Hit
+
+from api.models.media import AbstractMedia
+
+
+# Columns of the media tables that are not needed to serialize search results.
+# ``meta_data`` can be large, and only its ``license_url`` key is needed, which
+# is selected on its own instead, see ``load_pruned``.
+DEFERRED_FIELDS = [
+    "meta_data",
+    "watermarked",
+    "last_synced_with_source",
+    "removed_from_source",
+    "view_count",
+    "updated_on",
+]
+
+# The fields of the documents that are read from the hits themselves, to
+# validate their links, tally their providers and hydrate them from the DB.
+# Long fields, like ``description`` and ``tags``, are not fetched from ES.
+HIT_SOURCE_FIELDS = ["identifier", "mature", "provider", "url"]
+
+# The order of the fields in the highlights returned by ES, in which the fields
+# matched by named queries are listed too, so that ``fields_matched`` is the
+# same either way
+FIELDS_MATCHED_ORDER = ["description", "title", "tags.name"]
+
+
+def get_fields_matched(hit: Hit) -> list[str] | None:
+    """
+    Get the fields of the document of the hit that matched the query.
+
+    The fields are read from the named queries that matched the hit, if any,
+    and otherwise from the highlights of the hit.
+
+    :param hit: The ES hit.
+    :return: The fields that matched, ``None`` if there is no information.
+    """
+
+    if matched_queries := getattr(hit.meta, "matched_queries", None):
+        return [field for field in FIELDS_MATCHED_ORDER if field in matched_queries]
+    return getattr(hit.meta, "highlight", None)
+
+
+def get_es_hydration_source_fields(model_class: type[AbstractMedia]) -> list[str]:
+    """
+    Get the fields of the documents needed to build model instances from hits.
+
+    These are the fields read by ``build_from_hits``, which includes the
+    ``HIT_SOURCE_FIELDS``, but not the columns in ``DEFERRED_FIELDS``.
+
+    :param model_class: The model of the hits.
+    :return: The fields to fetch from the ``_source`` of the hits.
+    """
+
+    fields = {
+        field.attname
+        for field in model_class._meta.concrete_fields
+        if field.name not in DEFERRED_FIELDS
+    }
+    return sorted(fields | set(HIT_SOURCE_FIELDS) | {"license_url"})
+
+
+def _get_loaded_fields(queryset: QuerySet) -> list[str]:
+    """
+    Get the fields to load, all but ``DEFERRED_FIELDS``.
+
+    ``QuerySet.only`` is used rather than ``QuerySet.defer``, because the latter
+    cannot be combined with ``select_related`` of virtual relations, such as
+    ``Audio.audioset``. The relations selected by the queryset are therefore
+    loaded explicitly.
+    """
+
+    fields = [
+        field.name
+        for field in queryset.model._meta.concrete_fields
+        if field.name not in DEFERRED_FIELDS
+    ]
+    if isinstance(queryset.query.select_related, dict):
+        fields += queryset.query.select_related.keys()
+    return fields
+
+
+def load_pruned(queryset: QuerySet) -> list[AbstractMedia]:
+    """
+    Load the rows of the queryset, with only the columns needed to serialize them.
+
+    ``meta_data`` is replaced by a dictionary holding only its ``license_url``
+    key, so that reading it does not load the deferred column.
+
+    :param queryset: The queryset of media rows to load.
+    :return: The model instances.
+    """
+
+    rows = list(
+        queryset.only(*_get_loaded_fields(queryset)).annotate(
+            meta_data_license_url=KT("meta_data__license_url")
+        )
+    )
+    for row in rows:
+        row.meta_data = (
+            {"license_url": row.meta_data_license_url}
+            if row.meta_data_license_url
+            else None
+        )
+    return rows
+
+
+def hydrate_hits(queryset: QuerySet, hits: list[Hit]) -> list[AbstractMedia]:
+    """
+    Map ES hits to ORM model instances, in the order of the hits.
+
+    Only the columns needed to serialize the results are selected, see
+    ``load_pruned``. Hits without a matching row in ``queryset`` are left out.
+
+    :param queryset: The queryset of the model of the hits, filtered to the
+    rows that may be returned.
+    :param hits: The ES hits to map.
+    :return: The model instances, with ``fields_matched`` set from the hits.
+    """
+
+    identifiers = [hit.identifier for hit in hits]
+    rows = load_pruned(queryset.filter(identifier__in=identifiers))
+    results_by_identifier = {str(row.identifier): row for row in rows}
+
+    results = []
+    for hit in hits:
+        if (result := results_by_identifier.get(str(hit.identifier))) is not None:
+            result.fields_matched = get_fields_matched(hit)
+            results.append(result)
+    return results
+
+
+def build_from_hits(
+    model_class: type[AbstractMedia], hits: list[Hit]
+) -> list[AbstractMedia]:
+    """
+    Build unsaved model instances from the ``_source`` of ES hits.
+
+    This requires the documents to hold all the fields that the serializers
+    of search results read. The instances are never saved, and only serve to
+    serialize the hits the same way as the rows of the DB, including the
+    properties of the model.
+
+    :param model_class: The model of the hits.
+    :param hits: The ES hits to build the model instances from.
+    :return: The model instances, with ``fields_matched`` set from the hits.
+    """
+
+    field_names = {field.attname for field in model_class._meta.concrete_fields}
+    # The reverse relation that marks media as sensitive, see ``sensitive``
+    sensitive_relation = model_class._meta.get_field(
+        f"sensitive_{model_class._meta.model_name}"
+    )
+
+    results = []
+    for hit in hits:
+        source = hit.to_dict()
+        result = model_class(
+            **{name: value for name, value in source.items() if name in field_names}
+        )
+        if isinstance(result.created_on, str):
+            result.created_on = parse_datetime(result.created_on)
+        license_url = source.get("license_url")
+        result.meta_data = {"license_url": license_url} if license_url else None
+        # The documents of confirmed sensitive media are marked as mature
+        sensitive_relation.set_cached_value(
+            result,
+            sensitive_relation.related_model(media_obj=result)
+            if source.get("mature")
+            else None,
+        )
+        result.fields_matched = get_fields_matched(hit)
+        results.append(result)
+    return results
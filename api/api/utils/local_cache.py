@@ -0,0 +1,100 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+
+_MISSING = object()
+
+_INSTANCES: weakref.WeakSet["LocalTTLCache"] = weakref.WeakSet()
+
+
+class LocalTTLCache:
+    """
+    Bounded, in-process LRU cache whose entries expire after a TTL.
+
+    The cache is local to the worker process, so it is only suitable in front
+    of a shared cache like Redis, for values that may be slightly stale. It is
+    safe to use from multiple threads, which is necessary because ``sync_to_async``
+    runs the sync parts of requests in a thread pool.
+
+    The cumulative numbers of hits and misses are kept in ``hits`` and
+    ``misses``, so that the effectiveness of the cache can be measured.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        """
+        :param maxsize: The number of entries after which the least recently
+        used entry is evicted. A size of zero disables the cache.
+        :param ttl: The default number of seconds after which entries expire,
+        ``None`` for entries that only expire by eviction.
+        """
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[Any, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+        _INSTANCES.add(self)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get the value for ``key``, or ``default`` if it is missing or expired."""
+
+        with self._lock:
+            value, expires_at = self._data.get(key, (_MISSING, None))
+            if value is not _MISSING and (
+                expires_at is None or expires_at > time.monotonic()
+            ):
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+
+            if value is not _MISSING:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """
+        Set the value for ``key``, evicting the least recently used entry if
+        the cache is full.
+
+        :param ttl: The number of seconds after which the entry expires, the
+        default TTL of the cache if ``None``.
+        """
+
+        if self.maxsize <= 0:
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries and reset the hit and miss counters."""
+
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def clear_local_caches() -> None:
+    """Clear every in-process cache, for example between tests."""
+
+    for cache in list(_INSTANCES):
+        cache.clear()
@@ -0,0 +1,121 @@
+"""
+Read-through cache of single media items, for the endpoints of a media item.
+
+The detail, thumbnail, watermark, oEmbed and waveform endpoints all load a
+single media item by its identifier, and the thumbnail endpoint in particular
+receives far more traffic than search. The media items are cached in the
+memory of each worker, in front of Redis, which is shared by all workers.
+
+Items are cached with only the columns needed to serialize them, see
+``api.utils.hydration.load_pruned``, along with the relations selected by the
+view. They are pickled so that each request gets its own copy.
+
+Marking a media item as sensitive, or deleting it, invalidates its entry in
+Redis and in the memory of the worker that made the change. Other workers may
+keep serving the previous version for up to ``MEDIA_DETAIL_LOCAL_CACHE_TTL``
+seconds, so that setting must be kept short. Rows changed in the DB without
+going through the API, for example by a data refresh, are not invalidated and
+are served stale for up to ``MEDIA_DETAIL_CACHE_TTL`` seconds, which is why the
+cache is disabled unless that setting is configured.
+"""
+
+import pickle
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import QuerySet
+
+import django_redis
+import structlog
+from redis.exceptions import ConnectionError
+
+from api.models.media import AbstractMedia
+from api.utils.hydration import load_pruned
+from api.utils.local_cache import LocalTTLCache
+from api.utils.request_counters import increment_request_counter
+
+
+logger = structlog.get_logger(__name__)
+
+
+CACHE_PREFIX = "media_detail:"
+
+_local_cache = LocalTTLCache(
+    maxsize=settings.MEDIA_DETAIL_LOCAL_CACHE_SIZE,
+    ttl=settings.MEDIA_DETAIL_LOCAL_CACHE_TTL,
+)
+
+
+def get_cache_key(media_type: str, identifier) -> str:
+    return f"{CACHE_PREFIX}{media_type}:{identifier}"
+
+
+def _load(queryset: QuerySet, identifier) -> AbstractMedia | None:
+    try:
+        rows = load_pruned(queryset.filter(identifier=identifier))
+    except (TypeError, ValueError, ValidationError):
+        # Not a valid UUID
+        return None
+    return rows[0] if rows else None
+
+
+def get_media(queryset: QuerySet, identifier) -> AbstractMedia | None:
+    """
+    Get the media item with the identifier, reading through the cache.
+
+    The outcome is counted for the current request as one of
+    ``media_detail_local_hits``, ``media_detail_hits`` for Redis, or
+    ``media_detail_misses``. If Redis cannot be reached, the media item is read
+    from the DB.
+
+    :param queryset: The queryset of the model of the media item, with the
+    relations to cache along with it selected. It must not be otherwise
+    filtered, as the cached items are shared by all callers.
+    :param identifier: The identifier of the media item.
+    :return: The media item, ``None`` if it does not exist.
+    """
+
+    if not settings.MEDIA_DETAIL_CACHE_TTL:
+        return _load(queryset, identifier)
+
+    key = get_cache_key(queryset.model._meta.model_name, identifier)
+    if (value := _local_cache.get(key)) is not None:
+        increment_request_counter("media_detail_local_hits")
+        return pickle.loads(value)
+
+    redis = django_redis.get_redis_connection("default")
+    try:
+        value = redis.get(key)
+    except ConnectionError:
+        logger.warning("Redis connect failed, cannot get cached media detail.")
+        redis = None
+
+    if value is not None:
+        increment_request_counter("media_detail_hits")
+        _local_cache.set(key, value)
+        return pickle.loads(value)
+
+    increment_request_counter("media_detail_misses")
+    if (media := _load(queryset, identifier)) is None:
+        return None
+
+    value = pickle.dumps(media)
+    _local_cache.set(key, value)
+    if redis is not None:
+        try:
+            redis.set(key, value, ex=settings.MEDIA_DETAIL_CACHE_TTL)
+        except ConnectionError:
+            logger.warning("Redis connect failed, cannot cache media detail.")
+    return media
+
+
+def invalidate_media(media_type: str, identifier) -> None:
+    """Drop the cached media item, so that it is read from the DB again."""
+
+    key = get_cache_key(media_type, identifier)
+    _local_cache.delete(key)
+    redis = django_redis.get_redis_connection("default")
+    try:
+        redis.delete(key)
+    except ConnectionError:
+        logger.warning("Redis connect failed, cannot invalidate media detail.")
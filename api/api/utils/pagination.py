@@ -9,6 +9,8 @@ class StandardPagination(PageNumberPagination):
     result_count: int | None
     page_count: int | None
     page: int
+    next_cursor: str | None
+    cursor_mode: bool
     warnings: list[dict]
 
     def __init__(self, *args, **kwargs):
@@ -16,6 +18,8 @@ class StandardPagination(PageNumberPagination):
         self.result_count = None  # populated later
         self.page_count = None  # populated later
         self.page = 1  # default, gets updated when necessary
+        self.next_cursor = None  # populated later for cursor pagination
+        self.cursor_mode = False  # whether the results are paginated by cursor
         self.warnings = []  # populated later as needed
 
     def get_paginated_response(self, data):
@@ -24,8 +28,10 @@ class StandardPagination(PageNumberPagination):
             "page_count": self.page_count,
             "page_size": self.page_size,
             "page": self.page,
-            "results": data,
         }
+        if self.cursor_mode:
+            response["next_cursor"] = self.next_cursor
+        response["results"] = data
         return Response(
             (
                 {
@@ -53,6 +59,11 @@ class StandardPagination(PageNumberPagination):
             "page_size": ("The number of items per page.", 20),
             "page": ("The current page number returned in the response.", 1),
         }
+        next_cursor_description = (
+            "The `cursor` of the next page, or `null` if there are no more "
+            "results. This property is only present on responses to requests "
+            "with a `cursor`."
+        )
 
         properties = {
             field: {
@@ -62,6 +73,11 @@ class StandardPagination(PageNumberPagination):
             }
             for field, (description, example) in field_descriptions.items()
         } | {
+            "next_cursor": {
+                "type": "string",
+                "nullable": True,
+                "description": next_cursor_description,
+            },
             "results": schema,
             "warnings": {
                 "type": "array",
@@ -93,5 +109,5 @@ class StandardPagination(PageNumberPagination):
         return {
             "type": "object",
             "properties": properties,
-            "required": list(set(properties.keys()) - {"warnings"}),
+            "required": list(set(properties.keys()) - {"warnings", "next_cursor"}),
         }
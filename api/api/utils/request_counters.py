@@ -0,0 +1,75 @@
+import functools
+
+import structlog
+from redis.client import Pipeline, Redis
+
+
+def increment_request_counter(name: str, amount: int = 1) -> int:
+    """
+    Increment a counter scoped to the current request.
+
+    The count is bound to the structlog context, which django-structlog resets
+    at the start of every request, so that it is included in all subsequent
+    log lines for the request, most importantly the ``request_finished`` log.
+
+    Context variables set in a ``sync_to_async`` thread or in an
+    ``async_to_sync`` loop are propagated back to the caller, so counters can
+    be incremented from either side.
+
+    :param name: The name of the counter, as it appears in the logs.
+    :param amount: The amount by which to increment the counter.
+    :return: The value of the counter, including this increment.
+    """
+
+    count = structlog.contextvars.get_contextvars().get(name, 0) + amount
+    structlog.contextvars.bind_contextvars(**{name: count})
+    return count
+
+
+def _count_redis_command(execute_command):
+    @functools.wraps(execute_command)
+    def wrapper(self, *args, **options):
+        increment_request_counter("redis_round_trips")
+        return execute_command(self, *args, **options)
+
+    wrapper.counts_redis_round_trips = True
+    return wrapper
+
+
+def _count_redis_pipeline(execute):
+    @functools.wraps(execute)
+    def wrapper(self, *args, **kwargs):
+        # Empty pipelines are not sent to Redis
+        if self.command_stack:
+            increment_request_counter("redis_round_trips")
+        return execute(self, *args, **kwargs)
+
+    wrapper.counts_redis_round_trips = True
+    return wrapper
+
+
+def instrument_redis() -> None:
+    """
+    Count the round trips to Redis of each request as ``redis_round_trips``.
+
+    Every command sent by a Redis client, whether through Django's cache or
+    ``django_redis.get_redis_connection``, is counted, and every pipeline is
+    counted once. Instrumenting Redis more than once has no effect.
+
+    This patches the Redis client globally, so it is only done on startup when
+    ``ENABLE_REDIS_ROUND_TRIP_COUNTING`` is set.
+    """
+
+    if not getattr(Redis.execute_command, "counts_redis_round_trips", False):
+        Redis.execute_command = _count_redis_command(Redis.execute_command)
+    if not getattr(Pipeline.execute, "counts_redis_round_trips", False):
+        Pipeline.execute = _count_redis_pipeline(Pipeline.execute)
+
+
+def uninstrument_redis() -> None:
+    """Stop counting the round trips to Redis, undoing ``instrument_redis``."""
+
+    if getattr(Redis.execute_command, "counts_redis_round_trips", False):
+        Redis.execute_command = Redis.execute_command.__wrapped__
+    if getattr(Pipeline.execute, "counts_redis_round_trips", False):
+        Pipeline.execute = Pipeline.execute.__wrapped__
@@ -6,7 +6,8 @@ from django.conf import settings
 from elasticsearch_dsl import Q, Search
 
 from api.constants.media_types import OriginIndex
-from api.controllers.elasticsearch.helpers import get_es_response
+from api.controllers.elasticsearch.helpers import aget_es_response, get_es_response
+from api.utils.stage_timing import timed_stage
 
 
 @dataclass
@@ -22,6 +23,7 @@ class SearchContext:
     """Subset of result identifiers for results with sensitive textual content."""
 
     @classmethod
+    @timed_stage("search_context")
     def build(
         cls, all_result_identifiers: list[str], origin_index: OriginIndex
     ) -> Self:
@@ -31,6 +33,39 @@ class SearchContext:
         if not settings.ENABLE_FILTERED_INDEX_QUERIES:
             return cls(all_result_identifiers, set())
 
+        results_in_filtered_index = get_es_response(
+            cls._get_filtered_index_search(all_result_identifiers, origin_index),
+            es_query="filtered_index_context",
+        )
+        return cls._from_filtered_index_results(
+            all_result_identifiers, results_in_filtered_index
+        )
+
+    @classmethod
+    @timed_stage("search_context")
+    async def abuild(
+        cls, all_result_identifiers: list[str], origin_index: OriginIndex
+    ) -> Self:
+        """Async counterpart to ``build``, using the async Elasticsearch client."""
+
+        if not all_result_identifiers:
+            return cls(list(), set())
+
+        if not settings.ENABLE_FILTERED_INDEX_QUERIES:
+            return cls(all_result_identifiers, set())
+
+        results_in_filtered_index = await aget_es_response(
+            cls._get_filtered_index_search(all_result_identifiers, origin_index),
+            es_query="filtered_index_context",
+        )
+        return cls._from_filtered_index_results(
+            all_result_identifiers, results_in_filtered_index
+        )
+
+    @staticmethod
+    def _get_filtered_index_search(
+        all_result_identifiers: list[str], origin_index: OriginIndex
+    ) -> Search:
         filtered_index_search = Search(index=f"{origin_index}-filtered")
         filtered_index_search = filtered_index_search.query(
             # Use `identifier` rather than the document `id` due to
@@ -42,10 +77,12 @@ class SearchContext:
         # The default query size is 10, so we need to slice the query
         # to change the size to be big enough to encompass all the
         # results.
-        filtered_index_slice = filtered_index_search[: len(all_result_identifiers)]
-        results_in_filtered_index = get_es_response(
-            filtered_index_slice, es_query="filtered_index_context"
-        )
+        return filtered_index_search[: len(all_result_identifiers)]
+
+    @classmethod
+    def _from_filtered_index_results(
+        cls, all_result_identifiers: list[str], results_in_filtered_index
+    ) -> Self:
         filtered_index_identifiers = {
             result.identifier for result in results_in_filtered_index
         }
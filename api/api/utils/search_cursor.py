@@ -0,0 +1,115 @@
+"""
+Opaque cursors for traversing search results with an Elasticsearch point in time.
+
+A cursor records where the previous page of a traversal ended: the point in
+time (PIT) the traversal reads from, the sort values of the last result
+returned, to continue with ``search_after``, and how deep the traversal is.
+It also records the hash of the query of the traversal, so that it is not
+used with another query, whose sort values would not match those of the
+cursor.
+Unlike ``from``, which makes ES collect and skip every preceding hit, each
+page only fetches the hits following the cursor, so the cost of a page does
+not grow with its depth.
+
+Cursors are encoded as URL safe base64 JSON, signed with the secret key so
+that clients cannot forge positions, and so that clients treat them as opaque
+tokens rather than depend on their contents.
+"""
+
+from dataclasses import asdict, dataclass, field
+
+from django.core import signing
+from rest_framework.exceptions import APIException
+
+
+# The cursor value with which clients start a new traversal
+CURSOR_START = "*"
+
+# The salt of the signatures of cursors, so that they are not valid signatures
+# of any other value signed with the secret key
+CURSOR_SALT = "api.utils.search_cursor"
+
+
+class CursorExpired(APIException):
+    status_code = 400
+    default_detail = (
+        "The cursor has expired. Start a new traversal with `cursor=*` and "
+        "request the next pages sooner."
+    )
+    default_code = "cursor_expired"
+
+
+class CursorMismatch(APIException):
+    status_code = 400
+    default_detail = (
+        "The cursor belongs to a different query. Pass the `next_cursor` of "
+        "the previous page along with the same query parameters."
+    )
+    default_code = "cursor_mismatch"
+
+
+@dataclass
+class SearchCursor:
+    """The position of a traversal of search results."""
+
+    pit_id: str | None = None
+    """The ID of the point in time, ``None`` for a new traversal."""
+    search_after: list = field(default_factory=list)
+    """The sort values of the last hit returned."""
+    offset: int = 0
+    """The number of hits read so far, including those of dead links."""
+    depth: int = 0
+    """The number of results returned so far."""
+    query_hash: str | None = None
+    """The hash of the query and index traversed, ``None`` for a new traversal."""
+
+    @property
+    def is_start(self) -> bool:
+        return self.pit_id is None
+
+    def encode(self) -> str:
+        if self.is_start:
+            return CURSOR_START
+
+        return signing.Signer(salt=CURSOR_SALT).sign_object(asdict(self))
+
+    @classmethod
+    def decode(cls, token: str) -> "SearchCursor":
+        """
+        Parse a cursor given by a client.
+
+        :param token: the cursor, as returned by ``encode``
+        :return: the decoded cursor
+        :raise: ``ValueError``, if the token is not a valid cursor, including
+        if its signature does not match because it was tampered with
+        """
+
+        if token == CURSOR_START:
+            return cls()
+
+        # Signed values always hold the separator of their signature
+        if ":" not in token:
+            raise ValueError("Invalid cursor.")
+
+        try:
+            payload = signing.Signer(salt=CURSOR_SALT).unsign_object(token)
+        except signing.BadSignature as e:
+            raise ValueError("Invalid cursor.") from e
+
+        try:
+            cursor = cls(**payload)
+        except TypeError as e:
+            raise ValueError("Invalid cursor.") from e
+
+        if (
+            not isinstance(cursor.pit_id, str)
+            or not isinstance(cursor.search_after, list)
+            or not isinstance(cursor.offset, int)
+            or not isinstance(cursor.depth, int)
+            or not isinstance(cursor.query_hash, str)
+            or cursor.offset < cursor.depth
+            or cursor.depth < 0
+        ):
+            raise ValueError("Invalid cursor.")
+
+        return cursor
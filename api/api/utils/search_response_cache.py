@@ -0,0 +1,202 @@
+"""
+Cache of complete search responses, shared by all API servers via Redis.
+
+Entries are fresh for ``SEARCH_RESPONSE_CACHE_TTL`` seconds, after which they
+are still served for ``SEARCH_RESPONSE_CACHE_STALE_TTL`` seconds while a single
+request refreshes them in the background. When an entry is missing, only one
+request computes it, while the others wait for it to be cached.
+
+Each entry records the generation of the cache of its media type at the time
+it was computed. Invalidating the cache of a media type increments its
+generation, so that all of its existing entries are ignored from then on.
+"""
+
+import asyncio
+import contextlib
+import json
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from hashlib import blake2b
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+import django_redis
+import sentry_sdk
+import structlog
+from asgiref.sync import sync_to_async
+from redis.exceptions import ConnectionError
+
+from api.utils.request_counters import increment_request_counter
+
+
+logger = structlog.get_logger(__name__)
+
+
+CACHE_PREFIX = "search_response:"
+GENERATION_KEY_PREFIX = "search_response_generation:"
+LOCK_SUFFIX = ":lock"
+
+# How often to check for the entry being computed by another request
+_LOCK_POLL_SECONDS = 0.05
+
+
+def get_cache_key(media_type: str, key_data: dict) -> str:
+    """
+    Get the cache key of the response to a search request.
+
+    :param media_type: The media type of the search.
+    :param key_data: Everything the response depends on, such as the validated
+    search parameters. Must be serializable with ``DjangoJSONEncoder``.
+    """
+
+    canonical = json.dumps(
+        key_data, sort_keys=True, separators=(",", ":"), cls=DjangoJSONEncoder
+    )
+    digest = blake2b(canonical.encode(), digest_size=16).hexdigest()
+    return f"{CACHE_PREFIX}{media_type}:{digest}"
+
+
+def invalidate_search_response_cache(media_type: str) -> None:
+    """Ignore all search responses of the media type cached so far."""
+
+    redis = django_redis.get_redis_connection("default")
+    try:
+        redis.incr(f"{GENERATION_KEY_PREFIX}{media_type}")
+    except ConnectionError:
+        logger.warning("Redis connect failed, cannot invalidate search responses.")
+
+
+def _read(redis, media_type: str, key: str) -> tuple[int, dict | None]:
+    """
+    Read the current generation of the media type and the entry at ``key``.
+
+    :return: The generation, and the entry if it is of the current generation.
+    """
+
+    pipe = redis.pipeline(transaction=False)
+    pipe.get(f"{GENERATION_KEY_PREFIX}{media_type}")
+    pipe.get(key)
+    generation, value = pipe.execute()
+
+    generation = int(generation or 0)
+    entry = json.loads(value) if value is not None else None
+    if entry is not None and entry["generation"] != generation:
+        entry = None
+    return generation, entry
+
+
+def _write(redis, key: str, generation: int, data: dict) -> None:
+    entry = {
+        "generation": generation,
+        "fresh_until": time.time() + settings.SEARCH_RESPONSE_CACHE_TTL,
+        "data": data,
+    }
+    ttl = settings.SEARCH_RESPONSE_CACHE_TTL + settings.SEARCH_RESPONSE_CACHE_STALE_TTL
+    redis.set(key, json.dumps(entry, cls=DjangoJSONEncoder), ex=ttl)
+
+
+def _acquire_lock(redis, key: str) -> str | None:
+    """:return: The token to release the lock with, ``None`` if already locked."""
+
+    token = uuid.uuid4().hex
+    if redis.set(
+        key + LOCK_SUFFIX,
+        token,
+        nx=True,
+        ex=settings.SEARCH_RESPONSE_CACHE_LOCK_TIMEOUT,
+    ):
+        return token
+    return None
+
+
+def _release_lock(redis, key: str, token: str) -> None:
+    # The lock may have timed out and been acquired by another request
+    if redis.get(key + LOCK_SUFFIX) == token.encode():
+        redis.delete(key + LOCK_SUFFIX)
+
+
+async def _compute_and_write(
+    redis, key: str, generation: int, token: str, compute: Callable[[], Awaitable]
+) -> dict:
+    try:
+        data = await compute()
+        try:
+            await sync_to_async(_write)(redis, key, generation, data)
+        except ConnectionError:
+            logger.warning("Redis connect failed, cannot cache search response.")
+        return data
+    finally:
+        with contextlib.suppress(ConnectionError):
+            await sync_to_async(_release_lock)(redis, key, token)
+
+
+# Strong references to the tasks refreshing stale entries, so that they are
+# not garbage collected before they are done.
+# https://docs.python.org/3/library/asyncio-task.html#asyncio.create_task
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _refresh_in_background(redis, key, generation, token, compute) -> None:
+    async def refresh():
+        try:
+            await _compute_and_write(redis, key, generation, token, compute)
+        except Exception as exc:
+            logger.error("search_response_cache_refresh_failed", e=exc)
+            sentry_sdk.capture_exception(exc)
+
+    task = asyncio.ensure_future(refresh())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def aget_or_compute(
+    media_type: str, key: str, compute: Callable[[], Awaitable[dict]]
+) -> dict:
+    """
+    Get the cached search response at ``key``, computing it if needed.
+
+    The outcome is counted for the current request as one of
+    ``search_response_cache_hits``, ``search_response_cache_stale_hits`` or
+    ``search_response_cache_misses``. If Redis cannot be reached, the response
+    is computed without caching it.
+
+    :param media_type: The media type of the search.
+    :param key: The key from ``get_cache_key``.
+    :param compute: Computes the response data. Exceptions it raises, for
+    example for invalid requests, are propagated and nothing is cached.
+    """
+
+    redis = django_redis.get_redis_connection("default")
+    token = None
+    try:
+        generation, entry = await sync_to_async(_read)(redis, media_type, key)
+
+        if entry is not None:
+            if entry["fresh_until"] > time.time():
+                increment_request_counter("search_response_cache_hits")
+            else:
+                increment_request_counter("search_response_cache_stale_hits")
+                if token := await sync_to_async(_acquire_lock)(redis, key):
+                    _refresh_in_background(redis, key, generation, token, compute)
+            return entry["data"]
+
+        increment_request_counter("search_response_cache_misses")
+        deadline = time.monotonic() + settings.SEARCH_RESPONSE_CACHE_LOCK_TIMEOUT
+        while not (token := await sync_to_async(_acquire_lock)(redis, key)):
+            if time.monotonic() >= deadline:
+                logger.warning("Timed out waiting for search response to be cached.")
+                break
+
+            # Another request is computing the entry, wait for it
+            await asyncio.sleep(_LOCK_POLL_SECONDS)
+            _, entry = await sync_to_async(_read)(redis, media_type, key)
+            if entry is not None:
+                return entry["data"]
+    except ConnectionError:
+        logger.warning("Redis connect failed, cannot use cached search responses.")
+
+    if token:
+        return await _compute_and_write(redis, key, generation, token, compute)
+    return await compute()
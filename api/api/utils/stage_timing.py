@@ -0,0 +1,187 @@
+"""
+Timing of the stages of requests, like Elasticsearch queries or hydration.
+
+The durations of the stages of a request are recorded in a context variable,
+which ``api.middleware.stage_timing_middleware`` sets for every request when
+``ENABLE_STAGE_TIMING`` is set. The middleware adds them to the histograms of
+the worker, which ``api.views.metrics_views`` exposes in the Prometheus text
+format, and returns them in the ``Server-Timing`` header of the response if
+``ENABLE_SERVER_TIMING_HEADER`` is set.
+
+Outside of a request, or when timing is disabled, timing a stage only costs
+the lookup of the context variable.
+
+Stages may be nested, like the dead link mask I/O within the validation of
+dead links, in which case the outer stage includes the duration of the inner
+one. A stage nested within itself, like a recursive backfill, is only timed
+once.
+"""
+
+import functools
+import inspect
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+
+# The upper bounds of the histogram buckets, in seconds
+STAGE_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+STAGE_DURATION_METRIC = "openverse_api_stage_duration_seconds"
+
+
+class StageTimings:
+    """The durations of the stages of a request."""
+
+    __slots__ = ("durations", "_running")
+
+    def __init__(self):
+        self.durations: dict[str, float] = {}
+        """The cumulative duration of each stage, in seconds."""
+        self._running: set[str] = set()
+
+    def server_timing(self) -> str:
+        """Format the durations as the value of a ``Server-Timing`` header."""
+
+        return ", ".join(
+            f"{stage};dur={duration * 1000:.1f}"
+            for stage, duration in self.durations.items()
+        )
+
+
+_timings: ContextVar[StageTimings | None] = ContextVar("stage_timings", default=None)
+
+
+class _StageTimer:
+    __slots__ = ("timings", "stage", "start")
+
+    def __init__(self, timings: StageTimings, stage: str):
+        self.timings = timings
+        self.stage = stage
+
+    def __enter__(self):
+        self.timings._running.add(self.stage)
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter() - self.start
+        durations = self.timings.durations
+        durations[self.stage] = durations.get(self.stage, 0) + duration
+        self.timings._running.discard(self.stage)
+
+
+_NOT_TIMED = nullcontext()
+
+
+def time_stage(stage: str):
+    """
+    Time the block of the ``with`` statement as the given stage of the request.
+
+    :param stage: The name of the stage, as it appears in the ``Server-Timing``
+    header and in the labels of the histograms.
+    """
+
+    timings = _timings.get()
+    if timings is None or stage in timings._running:
+        return _NOT_TIMED
+    return _StageTimer(timings, stage)
+
+
+def timed_stage(stage: str):
+    """Time every call of the decorated function, sync or async, as the stage."""
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with time_stage(stage):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with time_stage(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def record_stage_timings() -> Iterator[StageTimings]:
+    """Record the durations of the stages timed within the block."""
+
+    timings = StageTimings()
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+class StageHistogram:
+    """A cumulative histogram of the durations of a stage, like in Prometheus."""
+
+    __slots__ = ("bucket_counts", "count", "sum")
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(STAGE_DURATION_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, duration: float) -> None:
+        for index, bound in enumerate(STAGE_DURATION_BUCKETS):
+            if duration <= bound:
+                self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += duration
+
+
+# The histograms of the worker, by endpoint, media type and stage
+_histograms: dict[tuple[str, str, str], StageHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def observe_stage_timings(
+    endpoint: str, media_type: str, timings: StageTimings
+) -> None:
+    """Add the durations of the stages of a request to the histograms."""
+
+    with _histograms_lock:
+        for stage, duration in timings.durations.items():
+            key = (endpoint, media_type, stage)
+            if (histogram := _histograms.get(key)) is None:
+                histogram = _histograms[key] = StageHistogram()
+            histogram.observe(duration)
+
+
+def clear_stage_histograms() -> None:
+    with _histograms_lock:
+        _histograms.clear()
+
+
+def render_stage_histograms() -> str:
+    """Render the histograms of the worker in the Prometheus text format."""
+
+    lines = [
+        f"# HELP {STAGE_DURATION_METRIC} The duration of the stages of requests.",
+        f"# TYPE {STAGE_DURATION_METRIC} histogram",
+    ]
+    with _histograms_lock:
+        for (endpoint, media_type, stage), histogram in sorted(_histograms.items()):
+            labels = f'endpoint="{endpoint}",media_type="{media_type}",stage="{stage}"'
+            for bound, count in zip(STAGE_DURATION_BUCKETS, histogram.bucket_counts):
+                lines.append(
+                    f'{STAGE_DURATION_METRIC}_bucket{{{labels},le="{bound}"}} {count}'
+                )
+            lines += [
+                f'{STAGE_DURATION_METRIC}_bucket{{{labels},le="+Inf"}} {histogram.count}',
+                f"{STAGE_DURATION_METRIC}_sum{{{labels}}} {histogram.sum}",
+                f"{STAGE_DURATION_METRIC}_count{{{labels}}} {histogram.count}",
+            ]
+    return "\n".join(lines) + "\n"
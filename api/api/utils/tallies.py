@@ -1,6 +1,9 @@
+import json
 from collections import defaultdict
 from datetime import datetime, timedelta
 
+from django.conf import settings
+
 import django_redis
 import structlog
 from django_redis.client.default import Redis
@@ -17,13 +20,52 @@ def get_weekly_timestamp() -> str:
     return monday.strftime("%Y-%m-%d")
 
 
+def get_previous_weekly_timestamp() -> str:
+    """Get a timestamp for the Monday of the week before any given week."""
+    now = datetime.now()
+    monday = now - timedelta(days=now.weekday() + 7)
+    return monday.strftime("%Y-%m-%d")
+
+
 def get_monthly_timestamp() -> str:
     """Get a timestamp for the month."""
     now = datetime.now()
     return now.strftime("%Y-%m")
 
 
-def count_provider_occurrences(results: list[dict], index: str) -> None:
+# Query tallies are only used to find the currently popular queries, so unlike
+# the provider tallies they are not kept forever.
+QUERY_TALLY_TTL = int(timedelta(weeks=2).total_seconds())
+
+
+def count_occurrences(
+    index: str,
+    results: list[dict],
+    query_hash: str | None = None,
+    query: dict | None = None,
+) -> None:
+    """
+    Count the occurrences of the providers in the results and, if given, the
+    occurrence of the query, in a single round trip to Redis.
+
+    Queries are counted in a weekly sorted set, which is trimmed to the
+    ``LINK_PREVALIDATION_MAX_TALLIED_QUERIES`` most frequent queries once it
+    holds twice as many, so that the many queries that are only made once
+    cannot grow it without bound. Trimming it only then, rather than on every
+    new query, gives a new query the time to occur again before it is evicted
+    with the other queries of the lowest score. The query itself is only
+    stored once it has occurred ``LINK_PREVALIDATION_MIN_QUERY_OCCURRENCES``
+    times in the week. Storing the query and trimming the set each take
+    another round trip, for the few occurrences that need them.
+
+    :param index: The index the query was made against.
+    :param results: The results whose providers to count.
+    :param query_hash: The hash of the query, as used for its dead link mask.
+    :param query: The query body, as returned by ``Search.to_dict``.
+    """
+    if not results and query_hash is None:
+        return
+
     # Use ``get_redis_connection`` rather than Django's caches
     # so that we can open a pipeline rather than sending off ``n``
     # writes and because the RedisPy client's ``incr`` method
@@ -38,11 +80,90 @@ def count_provider_occurrences(results: list[dict], index: str) -> None:
         provider_occurrences[result["provider"]] += 1
 
     week = get_weekly_timestamp()
-    with tallies.pipeline() as pipe:
-        for provider, occurrences in provider_occurrences.items():
-            pipe.incr(f"provider_occurrences:{index}:{week}:{provider}", occurrences)
-            pipe.incr(f"provider_appeared_in_searches:{index}:{week}:{provider}", 1)
-        try:
-            pipe.execute()
-        except ConnectionError:
-            logger.warning("Redis connect failed, cannot increment provider tallies.")
+    occurrences_key = f"query_occurrences:{week}"
+    try:
+        with tallies.pipeline() as pipe:
+            for provider, occurrences in provider_occurrences.items():
+                pipe.incr(
+                    f"provider_occurrences:{index}:{week}:{provider}", occurrences
+                )
+                pipe.incr(f"provider_appeared_in_searches:{index}:{week}:{provider}", 1)
+            if query_hash is not None:
+                pipe.zincrby(occurrences_key, 1, query_hash)
+                pipe.expire(occurrences_key, QUERY_TALLY_TTL)
+                pipe.zcard(occurrences_key)
+            replies = pipe.execute()
+
+        if query_hash is None:
+            return
+
+        query_occurrences, _, tallied_queries = replies[-3:]
+        if query_occurrences == settings.LINK_PREVALIDATION_MIN_QUERY_OCCURRENCES:
+            tallies.set(
+                f"query:{query_hash}",
+                json.dumps({"index": index, "query": query}),
+                ex=QUERY_TALLY_TTL,
+            )
+        max_tallied_queries = settings.LINK_PREVALIDATION_MAX_TALLIED_QUERIES
+        if tallied_queries > 2 * max_tallied_queries:
+            # Evict the least frequent queries beyond the cap
+            tallies.zremrangebyrank(occurrences_key, 0, -max_tallied_queries - 1)
+    except ConnectionError:
+        logger.warning("Redis connect failed, cannot increment tallies.")
+
+
+def count_provider_occurrences(results: list[dict], index: str) -> None:
+    """Count the occurrences of the providers in the results."""
+
+    count_occurrences(index, results)
+
+
+def count_query_occurrence(index: str, query_hash: str, query: dict) -> None:
+    """
+    Count an occurrence of the query, to find the most popular queries.
+
+    :param index: The index the query was made against.
+    :param query_hash: The hash of the query, as used for its dead link mask.
+    :param query: The query body, as returned by ``Search.to_dict``.
+    """
+
+    count_occurrences(index, [], query_hash, query)
+
+
+def get_popular_queries(count: int) -> list[tuple[str, str, dict]]:
+    """
+    Get the most popular queries of this week and the week before.
+
+    Only queries that have occurred often enough in either week to be stored
+    by ``count_query_occurrence`` are returned.
+
+    :param count: The maximum number of queries to return.
+    :return: The hash, index and body of each query, most popular first.
+    """
+    tallies: Redis = django_redis.get_redis_connection("tallies")
+
+    occurrences = defaultdict(float)
+    for week in (get_weekly_timestamp(), get_previous_weekly_timestamp()):
+        # Only the queries that occurred often enough to be stored
+        for query_hash, score in tallies.zrevrangebyscore(
+            f"query_occurrences:{week}",
+            "+inf",
+            settings.LINK_PREVALIDATION_MIN_QUERY_OCCURRENCES,
+            withscores=True,
+        ):
+            occurrences[query_hash.decode()] += score
+
+    query_hashes = sorted(occurrences, key=occurrences.get, reverse=True)[:count]
+    if not query_hashes:
+        return []
+
+    queries = []
+    stored_queries = tallies.mget(
+        [f"query:{query_hash}" for query_hash in query_hashes]
+    )
+    for query_hash, value in zip(query_hashes, stored_queries):
+        if value is not None:
+            stored = json.loads(value)
+            queries.append((query_hash, stored["index"], stored["query"]))
+
+    return queries
@@ -1,4 +1,5 @@
 from django.conf import settings
+from django.db.models import Q
 from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
@@ -15,7 +16,7 @@ from api.docs.audio_docs import (
     waveform,
 )
 from api.docs.audio_docs import thumbnail as thumbnail_docs
-from api.models import Audio
+from api.models import Audio, AudioSet
 from api.serializers.audio_serializers import (
     AudioReportRequestSerializer,
     AudioSearchRequestSerializer,
@@ -42,10 +43,49 @@ class AudioViewSet(MediaViewSet):
     query_serializer_class = AudioSearchRequestSerializer
     default_index = settings.MEDIA_INDEX_MAPPING[AUDIO_TYPE]
 
+    select_related_fields = ["sensitive_audio", "audioset"]
+
     serializer_class = AudioSerializer
 
-    def get_queryset(self):
-        return super().get_queryset().select_related("sensitive_audio", "audioset")
+    def get_es_results(self, results):
+        """
+        Build model instances from the ES hits, with their audio sets.
+
+        The documents do not hold the audio sets, so those are read from the DB
+        in a single query, only if any of the hits belongs to an audio set.
+        """
+
+        results = super().get_es_results(results)
+
+        set_keys = {
+            (result.provider, result.audio_set_foreign_identifier)
+            for result in results
+            if result.audio_set_foreign_identifier
+        }
+        audio_sets = {}
+        if set_keys:
+            query = Q()
+            for provider, foreign_identifier in set_keys:
+                query |= Q(provider=provider, foreign_identifier=foreign_identifier)
+            audio_sets = {
+                (audio_set.provider, audio_set.foreign_identifier): audio_set
+                for audio_set in AudioSet.objects.filter(query)
+            }
+
+        audioset_field = Audio._meta.get_field("audioset")
+        for result in results:
+            audioset_field.set_cached_value(
+                result,
+                audio_sets.get((result.provider, result.audio_set_foreign_identifier)),
+            )
+        return results
+
+    # Standard actions
+
+    async def list(self, *args, **kwargs):
+        # Redefined so that ``extend_schema_view`` does not wrap the inherited
+        # coroutine in a synchronous method, which adrf would not await.
+        return await super().list(*args, **kwargs)
 
     # Extra actions
 
@@ -6,6 +6,7 @@ from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 
+from asgiref.sync import sync_to_async
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from PIL import Image as PILImage
 
@@ -31,7 +32,6 @@ from api.serializers.image_serializers import (
 )
 from api.utils import image_proxy
 from api.utils.aiohttp import get_aiohttp_session
-from api.utils.asyncio import aget_object_or_404
 from api.utils.watermark import UpstreamWatermarkException, watermark
 from api.views.media_views import MediaViewSet
 
@@ -51,14 +51,20 @@ class ImageViewSet(MediaViewSet):
     query_serializer_class = ImageSearchRequestSerializer
     default_index = settings.MEDIA_INDEX_MAPPING[IMAGE_TYPE]
 
+    select_related_fields = ["sensitive_image"]
+
     serializer_class = ImageSerializer
 
     OEMBED_HEADERS = {
         "User-Agent": settings.OUTBOUND_USER_AGENT_TEMPLATE.format(purpose="OEmbed"),
     }
 
-    def get_queryset(self):
-        return super().get_queryset().select_related("sensitive_image")
+    # Standard actions
+
+    async def list(self, *args, **kwargs):
+        # Redefined so that ``extend_schema_view`` does not wrap the inherited
+        # coroutine in a synchronous method, which adrf would not await.
+        return await super().list(*args, **kwargs)
 
     # Extra actions
 
@@ -83,7 +89,9 @@ class ImageViewSet(MediaViewSet):
         identifier = params.validated_data["identifier"]
         context = self.get_serializer_context()
 
-        image = await aget_object_or_404(Image, identifier=identifier)
+        image = await sync_to_async(self.get_media)(identifier)
+        if image is None:
+            raise NotFound(f"No {Image._meta.object_name} matches the given query.")
 
         if not (image.height and image.width):
             session = await get_aiohttp_session()
@@ -1,5 +1,8 @@
+from math import ceil
 from typing import Union
 
+from django.conf import settings
+from django.http import Http404
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.exceptions import APIException, NotFound
@@ -11,16 +14,26 @@ from adrf.views import APIView as AsyncAPIView
 from adrf.viewsets import ViewSetMixin as AsyncViewSetMixin
 from asgiref.sync import sync_to_async
 
+from api.constants import restricted_features
 from api.constants.media_types import MediaType
 from api.controllers import search_controller
 from api.controllers.elasticsearch.related import related_media
 from api.models import ContentSource
 from api.models.media import AbstractMedia
 from api.serializers import media_serializers
+from api.serializers.compiled_serializers import CompiledMediaSerializer
 from api.serializers.source_serializers import SourceSerializer
-from api.utils import image_proxy
+from api.utils import image_proxy, media_detail_cache, search_response_cache
+from api.utils.drf_renderer import stream_large_response
+from api.utils.hydration import (
+    HIT_SOURCE_FIELDS,
+    build_from_hits,
+    get_es_hydration_source_fields,
+    hydrate_hits,
+)
 from api.utils.pagination import StandardPagination
 from api.utils.search_context import SearchContext
+from api.utils.stage_timing import time_stage
 from api.utils.throttle import (
     AnonThumbnailRateThrottle,
     OAuth2IdThumbnailRateThrottle,
@@ -58,6 +71,8 @@ class MediaViewSet(AsyncViewSetMixin, AsyncAPIView, ReadOnlyModelViewSet):
     media_type: MediaType | None = None
     query_serializer_class = None
     default_index = None
+    # Relations accessed when serializing the media
+    select_related_fields: list[str] = []
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -85,9 +100,39 @@ class MediaViewSet(AsyncViewSetMixin, AsyncAPIView, ReadOnlyModelViewSet):
             source__in=ContentSource.objects.filter(filter_content=True).values_list(
                 "source_identifier"
             )
+        ).select_related(*self.select_related_fields)
+
+    def get_media(self, identifier) -> AbstractMedia | None:
+        """
+        Get the media item with the identifier, through the detail cache.
+
+        Unlike ``get_object``, this does not exclude sources hidden from the
+        catalog.
+        """
+
+        return media_detail_cache.get_media(
+            self.model_class.objects.select_related(*self.select_related_fields),
+            identifier,
         )
 
-    aget_object = sync_to_async(ReadOnlyModelViewSet.get_object)
+    def get_object(self):
+        """
+        Get the media item of the request, through the detail cache.
+
+        The sources hidden from the catalog are excluded using their cached
+        list, rather than with the subquery of ``get_queryset``.
+        """
+
+        media = self.get_media(self.kwargs[self.lookup_field])
+        if media is None or media.source in search_controller.get_filtered_sources():
+            raise Http404(
+                f"No {self.model_class._meta.object_name} matches the given query."
+            )
+
+        self.check_object_permissions(self.request, media)
+        return media
+
+    aget_object = sync_to_async(get_object)
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -96,11 +141,23 @@ class MediaViewSet(AsyncViewSetMixin, AsyncAPIView, ReadOnlyModelViewSet):
         return context
 
     def _get_request_serializer(self, request):
-        req_serializer = self.query_serializer_class(
-            data=request.query_params,
-            context={"request": request, "media_type": self.media_type},
-        )
-        req_serializer.is_valid(raise_exception=True)
+        """
+        Validate the query parameters of the request.
+
+        The validated serializer is memoized on the request, as the parameters
+        are needed both by the action and by ``get_serializer_context``, and
+        validating them can query Redis and ES.
+        """
+
+        if (
+            req_serializer := getattr(request, "_validated_query_serializer", None)
+        ) is None:
+            req_serializer = self.query_serializer_class(
+                data=request.query_params,
+                context={"request": request, "media_type": self.media_type},
+            )
+            req_serializer.is_valid(raise_exception=True)
+            request._validated_query_serializer = req_serializer
         return req_serializer
 
     def get_db_results(self, results):
@@ -112,22 +169,70 @@ class MediaViewSet(AsyncViewSetMixin, AsyncAPIView, ReadOnlyModelViewSet):
         This function issues one query to the DB, using the ``identifier`` field
         which is both unique and indexed, so it's quite performant.
 
+        Unlike ``get_queryset``, the sources hidden from the catalog are
+        excluded using their cached list rather than a subquery.
+
         :param results: the list of ES hits
         :return: the corresponding list of ORM model instances
         """
 
-        identifiers = []
-        hits = []
-        for hit in results:
-            identifiers.append(hit.identifier)
-            hits.append(hit)
+        queryset = self.model_class.objects.exclude(
+            source__in=search_controller.get_filtered_sources()
+        ).select_related(*self.select_related_fields)
+        return hydrate_hits(queryset, results)
+
+    def get_es_results(self, results):
+        """
+        Build model instances from the ES hits, without querying the DB.
+
+        :param results: the list of ES hits
+        :return: the corresponding list of unsaved model instances
+        """
+
+        return build_from_hits(self.model_class, results)
+
+    def hydrate_results(self, results):
+        """
+        Map ES hits to model instances for serializing search results.
+
+        The instances are read from the DB, unless ``ENABLE_ES_ONLY_HYDRATION``
+        is set, in which case they are built from the hits themselves.
+        """
+
+        with time_stage("hydration"):
+            if settings.ENABLE_ES_ONLY_HYDRATION:
+                return self.get_es_results(results)
+            return self.get_db_results(results)
+
+    def get_source_fields(self) -> list[str]:
+        """
+        Get the fields of the documents that ``hydrate_results`` reads from the hits.
+
+        Only these fields are fetched from ES, rather than the whole documents.
+        """
+
+        if settings.ENABLE_ES_ONLY_HYDRATION:
+            return get_es_hydration_source_fields(self.model_class)
+        return HIT_SOURCE_FIELDS
+
+    def serialize_results(self, results, context: dict) -> list[dict]:
+        """
+        Serialize the list of media, with the compiled serializer if enabled.
+
+        :param results: the list of model instances
+        :param context: the context of the serializer
+        :return: the serialized media
+        """
 
-        results = list(self.get_queryset().filter(identifier__in=identifiers))
-        results.sort(key=lambda x: identifiers.index(str(x.identifier)))
-        for result, hit in zip(results, hits):
-            result.fields_matched = getattr(hit.meta, "highlight", None)
+        with time_stage("serialization"):
+            if settings.ENABLE_COMPILED_SERIALIZERS:
+                serializer = self.get_serializer(context=context)
+                return CompiledMediaSerializer(serializer).serialize(results)
+            return self.get_serializer(results, many=True, context=context).data
 
-        return results
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        return stream_large_response(response)
 
     # Standard actions
 
@@ -141,9 +246,9 @@ class MediaViewSet(AsyncViewSetMixin, AsyncAPIView, ReadOnlyModelViewSet):
 
         return Response(serializer.data)
 
-    def list(self, request, *_, **__):
-        params = self._get_request_serializer(request)
-        return self.get_media_results(request, params)
+    async def list(self, request, *_, **__):
+        params = await sync_to_async(self._get_request_serializer)(request)
+        return await self.get_media_results(request, params)
 
     def _validate_source(self, source):
         valid_sources = search_controller.get_sources(self.media_type)
@@ -153,10 +258,71 @@ class MediaViewSet(AsyncViewSetMixin, AsyncAPIView, ReadOnlyModelViewSet):
                 detail=f"Invalid source '{source}'. Valid sources are: {valid_string}.",
             )
 
-    def get_media_results(
+    def _get_search_response_cache_key(
+        self, request, params: MediaListRequestSerializer
+    ) -> str:
+        """Get the key of the cached response, from everything it depends on."""
+
+        access_level, _ = restricted_features.MAX_RESULT_COUNT.request_level(request)
+        return search_response_cache.get_cache_key(
+            self.media_type,
+            {
+                "params": params.validated_data,
+                "warnings": params.context["warnings"],
+                # Page and result counts are clamped by access level
+                "access_level": access_level,
+                # Results link to the API with absolute URLs
+                "base_url": request.build_absolute_uri("/"),
+            },
+        )
+
+    async def get_media_results(
         self,
         request,
         params: MediaListRequestSerializer,
+    ):
+        # Cursors point to a snapshot of the index, so their pages are not cached
+        if (
+            not settings.ENABLE_SEARCH_RESPONSE_CACHE
+            or params.validated_data.get("cursor") is not None
+        ):
+            return await self._get_media_results(request, params)
+
+        key = await sync_to_async(self._get_search_response_cache_key)(request, params)
+
+        async def compute():
+            return (await self._get_media_results(request, params, tally=False)).data
+
+        data = await search_response_cache.aget_or_compute(
+            self.media_type, key, compute
+        )
+        # Tally the response after the lookup rather than when computing it, so
+        # that it is counted even when it is served from the cache
+        await sync_to_async(search_controller.tally_response)(
+            params,
+            *self._get_search_index(params),
+            data["results"],
+            params.data["page"],
+            params.data["page_size"],
+            params.validated_data.get("filter_dead", True),
+            self.get_source_fields(),
+        )
+        return Response(data)
+
+    def _get_search_index(self, params: MediaListRequestSerializer) -> tuple[str, bool]:
+        """Get the index to search and whether to use it without modifications."""
+
+        if pref_index := params.validated_data.get("index"):
+            logger.info(f"Using preferred index {pref_index} for media.")
+            return pref_index, True
+        logger.info("Using default index for media.")
+        return self.default_index, False
+
+    async def _get_media_results(
+        self,
+        request,
+        params: MediaListRequestSerializer,
+        tally: bool = True,
     ):
         page_size = self.paginator.page_size = params.data["page_size"]
         page = self.paginator.page = params.data["page"]
@@ -165,41 +331,72 @@ class MediaViewSet(AsyncViewSetMixin, AsyncAPIView, ReadOnlyModelViewSet):
         hashed_ip = hash(self._get_user_ip(request))
         filter_dead = params.validated_data.get("filter_dead", True)
 
-        if pref_index := params.validated_data.get("index"):
-            logger.info(f"Using preferred index {pref_index} for media.")
-            search_index = pref_index
-            exact_index = True
-        else:
-            logger.info("Using default index for media.")
-            search_index = self.default_index
-            exact_index = False
+        search_index, exact_index = self._get_search_index(params)
 
+        cursor = params.validated_data.get("cursor")
         try:
-            (
-                results,
-                num_pages,
-                num_results,
-                search_context,
-            ) = search_controller.query_media(
-                params,
-                search_index,
-                exact_index,
-                page_size,
-                hashed_ip,
-                filter_dead,
-                page,
-            )
+            if cursor is None:
+                (
+                    results,
+                    num_pages,
+                    num_results,
+                    search_context,
+                ) = await search_controller.aquery_media(
+                    params,
+                    search_index,
+                    exact_index,
+                    page_size,
+                    hashed_ip,
+                    filter_dead,
+                    page,
+                    self.get_source_fields(),
+                    tally=tally,
+                )
+            else:
+                (
+                    results,
+                    next_cursor,
+                    num_results,
+                    search_context,
+                ) = await search_controller.aquery_media_with_cursor(
+                    params,
+                    search_index,
+                    exact_index,
+                    page_size,
+                    hashed_ip,
+                    filter_dead,
+                    cursor,
+                    self.get_source_fields(),
+                )
+                num_pages = ceil(num_results / page_size)
+                self.paginator.page = cursor.depth // page_size + 1
+                self.paginator.cursor_mode = True
+                if next_cursor := params.clamp_next_cursor(next_cursor):
+                    self.paginator.next_cursor = next_cursor.encode()
             self.paginator.page_count = params.clamp_page_count(num_pages)
             self.paginator.result_count = params.clamp_result_count(num_results)
         except ValueError as e:
             raise APIException(getattr(e, "message", str(e)))
 
+        return await sync_to_async(self._get_paginated_results_response)(
+            results, search_context
+        )
+
+    def _get_paginated_results_response(self, results, search_context: dict):
+        """
+        Hydrate and serialize the ES hits into the paginated response.
+
+        This is kept synchronous because it may query the DB, both for the
+        hydration and for any related fields accessed during serialization.
+        """
+
         serializer_context = search_context | self.get_serializer_context()
 
-        results = self.get_db_results(results)
+        results = self.hydrate_results(results)
 
-        serializer = self.get_serializer(results, many=True, context=serializer_context)
-        return self.get_paginated_response(serializer.data)
+        return self.get_paginated_response(
+            self.serialize_results(results, serializer_context)
+        )
 
     # Extra actions
 
@@ -237,10 +434,11 @@ class MediaViewSet(AsyncViewSetMixin, AsyncAPIView, ReadOnlyModelViewSet):
 
         serializer_context = self.get_serializer_context()
 
-        results = self.get_db_results(results)
+        results = self.hydrate_results(results)
 
-        serializer = self.get_serializer(results, many=True, context=serializer_context)
-        return self.get_paginated_response(serializer.data)
+        return self.get_paginated_response(
+            self.serialize_results(results, serializer_context)
+        )
 
     def report(self, request, identifier):
         serializer = self.get_serializer(data=request.data | {"identifier": identifier})
@@ -0,0 +1,42 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.request import Request
+from rest_framework.views import APIView
+
+from api.utils.stage_timing import render_stage_histograms
+from api.utils.throttle import ExemptOAuth2IdRateThrottle, HealthcheckAnonRateThrottle
+
+
+class StageTimingMetrics(APIView):
+    """
+    Return the histograms of the durations of the stages of requests.
+
+    The histograms are in the Prometheus text format and only cover the
+    requests served by the worker, so each worker must be scraped. This
+    endpoint only exists when ``ENABLE_STAGE_TIMING`` and
+    ``STAGE_TIMING_METRICS_TOKEN`` are set, and requires the token as the
+    bearer token of the ``Authorization`` header.
+    """
+
+    # The token is not an OAuth2 access token
+    authentication_classes = []
+    throttle_classes = [HealthcheckAnonRateThrottle, ExemptOAuth2IdRateThrottle]
+    schema = None  # Hide this view from the OpenAPI schema.
+
+    def get(self, request: Request):
+        token = settings.STAGE_TIMING_METRICS_TOKEN
+        if not settings.ENABLE_STAGE_TIMING or not token:
+            raise Http404()
+
+        expected = f"Bearer {token}".encode()
+        given = request.headers.get("Authorization", "").encode()
+        if not hmac.compare_digest(given, expected):
+            raise PermissionDenied()
+
+        return HttpResponse(
+            render_stage_histograms(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
@@ -24,6 +24,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "api.middleware.response_headers_middleware.response_headers_middleware",
+    "api.middleware.stage_timing_middleware.stage_timing_middleware",
 ]
 
 # Storage
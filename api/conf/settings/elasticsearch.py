@@ -7,6 +7,16 @@ from elasticsearch_dsl import connections
 from api.constants.media_types import MEDIA_TYPES
 
 
+#: options shared by the sync and async Elasticsearch clients
+ES_CLIENT_OPTIONS = {
+    # TODO: Return to default timeout of 10s and 1 retry once
+    # TODO: Elasticsearch response time has been stabilized
+    "request_timeout": 12,
+    "max_retries": 3,
+    "retry_on_timeout": True,
+}
+
+
 def _elasticsearch_connect() -> tuple[Elasticsearch, str]:
     """
     Connect to configured Elasticsearch domain.
@@ -20,14 +30,7 @@ def _elasticsearch_connect() -> tuple[Elasticsearch, str]:
 
     es_endpoint = f"{es_scheme}{es_url}:{es_port}"
 
-    _es = Elasticsearch(
-        es_endpoint,
-        # TODO: Return to default timeout of 10s and 1 retry once
-        # TODO: Elasticsearch response time has been stabilized
-        request_timeout=12,
-        max_retries=3,
-        retry_on_timeout=True,
-    )
+    _es = Elasticsearch(es_endpoint, **ES_CLIENT_OPTIONS)
     _es.info()
     _es.cluster.health(wait_for_status="yellow")
     return _es, es_endpoint
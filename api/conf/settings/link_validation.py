@@ -16,6 +16,70 @@ LINK_VALIDATION_TIMEOUT_SECONDS = config(
     "LINK_VALIDATION_TIMEOUT_SECONDS", default=0.8, cast=float
 )
 
+# The maximum number of concurrent validation requests to a single host, per
+# worker
+LINK_VALIDATION_MAX_CONCURRENT_REQUESTS_PER_HOST = config(
+    "LINK_VALIDATION_MAX_CONCURRENT_REQUESTS_PER_HOST", default=10, cast=int
+)
+
+# Stop sending validation requests to a host for ``OPEN_SECONDS`` once
+# ``FAILURE_THRESHOLD`` requests to it have timed out or errored within
+# ``WINDOW_SECONDS``. Results from the host are kept, as their status is unknown.
+LINK_VALIDATION_CIRCUIT_BREAKER_FAILURE_THRESHOLD = config(
+    "LINK_VALIDATION_CIRCUIT_BREAKER_FAILURE_THRESHOLD", default=20, cast=int
+)
+LINK_VALIDATION_CIRCUIT_BREAKER_WINDOW_SECONDS = config(
+    "LINK_VALIDATION_CIRCUIT_BREAKER_WINDOW_SECONDS", default=60, cast=int
+)
+LINK_VALIDATION_CIRCUIT_BREAKER_OPEN_SECONDS = config(
+    "LINK_VALIDATION_CIRCUIT_BREAKER_OPEN_SECONDS", default=300, cast=int
+)
+
+# The number of link statuses cached in memory by each worker, in front of the
+# statuses cached in Redis, and the maximum number of seconds for which they are
+# cached. Statuses otherwise expire from memory as they do from Redis. Set the
+# size to 0 to disable the in-memory cache.
+LINK_VALIDATION_LOCAL_CACHE_SIZE = config(
+    "LINK_VALIDATION_LOCAL_CACHE_SIZE", default=50_000, cast=int
+)
+LINK_VALIDATION_LOCAL_CACHE_MAX_TTL_SECONDS = config(
+    "LINK_VALIDATION_LOCAL_CACHE_MAX_TTL_SECONDS", default=3600, cast=int
+)
+
+# The number of Redis hashes each generation of link statuses is split into,
+# see ``api.utils.check_dead_links.status_cache``
+LINK_VALIDATION_CACHE_SHARDS = config(
+    "LINK_VALIDATION_CACHE_SHARDS", default=8, cast=int
+)
+
+# Whether to fall back to the link statuses cached under the legacy ``valid:``
+# keys for URLs whose status is not cached in the compact layout. Disable this
+# once the legacy keys have expired, at most the longest configured link
+# validation cache expiry after rolling out the compact layout.
+LINK_VALIDATION_CACHE_LEGACY_FALLBACK = config(
+    "LINK_VALIDATION_CACHE_LEGACY_FALLBACK", default=True, cast=bool
+)
+
+# The number of times a query must be made in a week for it to be considered
+# for link prevalidation by the ``prevalidatedeadlinks`` management command
+LINK_PREVALIDATION_MIN_QUERY_OCCURRENCES = config(
+    "LINK_PREVALIDATION_MIN_QUERY_OCCURRENCES", default=3, cast=int
+)
+
+# The number of the most frequent queries of a week that are kept in the weekly
+# query tallies, from which popular queries are chosen for link prevalidation.
+# The tallies are trimmed to this number once they hold twice as many queries.
+LINK_PREVALIDATION_MAX_TALLIED_QUERIES = config(
+    "LINK_PREVALIDATION_MAX_TALLIED_QUERIES", default=100_000, cast=int
+)
+
+# Whether to fall back to dead link masks saved under the legacy DeepHash query
+# hash when none exists for the current hash. Enable this while rolling out the
+# new hash, until the legacy masks have expired.
+DEAD_LINK_MASK_LEGACY_HASH_FALLBACK = config(
+    "DEAD_LINK_MASK_LEGACY_HASH_FALLBACK", default=False, cast=bool
+)
+
 
 class LinkValidationCacheExpiryConfiguration(defaultdict):
     """Link validation cache expiry configuration."""
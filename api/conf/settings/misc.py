@@ -13,6 +13,97 @@ ENABLE_FILTERED_INDEX_QUERIES = config(
     "ENABLE_FILTERED_INDEX_QUERIES", cast=bool, default=False
 )
 
+# Whether to backfill pages with dead links by streaming the hits following the
+# page using ``search_after``, rather than by re-running the query with a
+# larger result window
+ENABLE_SEARCH_AFTER_BACKFILL = config(
+    "ENABLE_SEARCH_AFTER_BACKFILL", cast=bool, default=False
+)
+
+# How long the point in time of a cursor traversal of search results is kept
+# open after each page, as an Elasticsearch time unit, see
+# ``api.utils.search_cursor``
+CURSOR_PAGINATION_KEEP_ALIVE = config("CURSOR_PAGINATION_KEEP_ALIVE", default="2m")
+
+# Whether to cache complete search responses, see ``api.utils.search_response_cache``
+ENABLE_SEARCH_RESPONSE_CACHE = config(
+    "ENABLE_SEARCH_RESPONSE_CACHE", cast=bool, default=False
+)
+# The number of seconds for which cached search responses are fresh, then stale
+# but served while they are refreshed, and the longest a request waits for
+# another request to compute the same response
+SEARCH_RESPONSE_CACHE_TTL = config("SEARCH_RESPONSE_CACHE_TTL", cast=int, default=60)
+SEARCH_RESPONSE_CACHE_STALE_TTL = config(
+    "SEARCH_RESPONSE_CACHE_STALE_TTL", cast=int, default=300
+)
+SEARCH_RESPONSE_CACHE_LOCK_TIMEOUT = config(
+    "SEARCH_RESPONSE_CACHE_LOCK_TIMEOUT", cast=int, default=10
+)
+
+# Whether to find the ``fields_matched`` of search results with named queries,
+# see ``api.controllers.search_controller.create_fields_matched_queries``,
+# rather than with highlighting
+ENABLE_FIELDS_MATCHED_NAMED_QUERIES = config(
+    "ENABLE_FIELDS_MATCHED_NAMED_QUERIES", cast=bool, default=False
+)
+
+# Whether to serialize search results from the ES documents instead of the DB,
+# which requires documents indexed with all the fields of the search results
+ENABLE_ES_ONLY_HYDRATION = config("ENABLE_ES_ONLY_HYDRATION", cast=bool, default=False)
+
+# Whether to serialize lists of media with the compiled serializers, see
+# ``api.serializers.compiled_serializers``, rather than with DRF
+ENABLE_COMPILED_SERIALIZERS = config(
+    "ENABLE_COMPILED_SERIALIZERS", cast=bool, default=False
+)
+
+# Whether to count the round trips to Redis of each request, logged as
+# ``redis_round_trips``, see ``api.utils.request_counters.instrument_redis``.
+# This patches the Redis client of every worker on startup.
+ENABLE_REDIS_ROUND_TRIP_COUNTING = config(
+    "ENABLE_REDIS_ROUND_TRIP_COUNTING", cast=bool, default=False
+)
+
+# Whether to time the stages of requests, aggregated in histograms and optionally
+# returned in the ``Server-Timing`` header, see ``api.utils.stage_timing``
+ENABLE_STAGE_TIMING = config("ENABLE_STAGE_TIMING", cast=bool, default=False)
+
+# Whether to return the durations of the stages of requests to clients, in the
+# ``Server-Timing`` header, which is always returned in debug mode
+ENABLE_SERVER_TIMING_HEADER = config(
+    "ENABLE_SERVER_TIMING_HEADER", cast=bool, default=False
+)
+
+# The bearer token with which the histograms of the stage durations are scraped
+# from ``/metrics/``. The endpoint does not exist when the token is not set.
+STAGE_TIMING_METRICS_TOKEN = config("STAGE_TIMING_METRICS_TOKEN", default="")
+
+# The number of results from which paginated responses are streamed in chunks
+# of ``JSON_CHUNKED_RESPONSE_CHUNK_SIZE`` results, rather than rendered whole.
+# Set to 0 to never stream responses.
+JSON_CHUNKED_RESPONSE_MIN_RESULTS = config(
+    "JSON_CHUNKED_RESPONSE_MIN_RESULTS", cast=int, default=0
+)
+JSON_CHUNKED_RESPONSE_CHUNK_SIZE = config(
+    "JSON_CHUNKED_RESPONSE_CHUNK_SIZE", cast=int, default=50
+)
+
+# The number of seconds for which single media items are cached in Redis, for the
+# endpoints of a media item, see ``api.utils.media_detail_cache``. The cache is
+# disabled by default, with 0. Only changes made through the API invalidate the
+# cached items, so rows changed in the DB by other means, for example by a data
+# refresh, are served stale for up to this many seconds. The items are also
+# cached in the memory of each worker, for a much shorter time as they are only
+# invalidated in the worker that changed them. Set the size to 0 to disable the
+# in-memory cache.
+MEDIA_DETAIL_CACHE_TTL = config("MEDIA_DETAIL_CACHE_TTL", cast=int, default=0)
+MEDIA_DETAIL_LOCAL_CACHE_SIZE = config(
+    "MEDIA_DETAIL_LOCAL_CACHE_SIZE", cast=int, default=10_000
+)
+MEDIA_DETAIL_LOCAL_CACHE_TTL = config(
+    "MEDIA_DETAIL_LOCAL_CACHE_TTL", cast=int, default=30
+)
+
 # Whether to enable the image watermark endpoint
 WATERMARK_ENABLED = config("WATERMARK_ENABLED", default=False, cast=bool)
 
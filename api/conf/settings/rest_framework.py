@@ -56,7 +56,7 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": ("conf.oauth2_extensions.OAuth2Authentication",),
     "DEFAULT_VERSIONING_CLASS": "rest_framework.versioning.URLPathVersioning",
     "DEFAULT_RENDERER_CLASSES": (
-        "rest_framework.renderers.JSONRenderer",
+        "api.utils.drf_renderer.ORJSONRenderer",
         "api.utils.drf_renderer.BrowsableAPIRendererWithoutForms",
     ),
     "DEFAULT_THROTTLE_CLASSES": DEFAULT_THROTTLE_CLASSES,
@@ -13,6 +13,7 @@ from rest_framework.routers import SimpleRouter
 from api.views.audio_views import AudioViewSet
 from api.views.health_views import HealthCheck
 from api.views.image_views import ImageViewSet
+from api.views.metrics_views import StageTimingMetrics
 from conf.urls.auth_tokens import urlpatterns as auth_tokens_urlpatterns
 from conf.urls.deprecations import urlpatterns as deprecations_urlpatterns
 from conf.urls.openapi import urlpatterns as openapi_urlpatterns
@@ -33,6 +34,7 @@ urlpatterns = [
     path("", RedirectView.as_view(pattern_name="root")),
     path("admin/", admin.site.urls),
     path("healthcheck/", HealthCheck.as_view(), name="health"),
+    path("metrics/", StageTimingMetrics.as_view(), name="metrics"),
     path("v1/", include(versioned_paths)),
 ] + [
     path(
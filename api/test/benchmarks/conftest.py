@@ -0,0 +1,85 @@
+"""
+Fixtures for the benchmarks of the hot paths of searches.
+
+The benchmarks run against ES responses built from ``test.factory.es_http``
+for media saved in the test database, so that the hits can be hydrated, and
+against the fake Redis of ``test.fixtures.cache``. The dead links among the
+hits are drawn from a seeded random generator, so every run benchmarks the
+same pages.
+"""
+
+import random
+
+from rest_framework.views import APIView
+
+import pytest
+from elasticsearch_dsl import Search
+from elasticsearch_dsl.response import Response
+
+from api.serializers.image_serializers import ImageSearchRequestSerializer
+from test.factory.es_http import create_mock_es_http_image_hit
+from test.factory.models.image import ImageFactory
+
+
+PAGE_SIZES = (20, 100)
+DEAD_LINK_RATIOS = (0, 0.5)
+SEED = 4096
+
+
+@pytest.fixture(params=PAGE_SIZES, ids=lambda page_size: f"page_size_{page_size}")
+def page_size(request) -> int:
+    return request.param
+
+
+@pytest.fixture(params=DEAD_LINK_RATIOS, ids=lambda ratio: f"dead_{ratio:.0%}")
+def dead_link_ratio(request) -> float:
+    return request.param
+
+
+@pytest.fixture
+def search_params(db, request_factory):
+    request = APIView().initialize_request(
+        request_factory.get("/v1/images/", {"q": "bird nature"})
+    )
+    params = ImageSearchRequestSerializer(
+        data=request.query_params,
+        context={"request": request, "media_type": "image"},
+    )
+    params.is_valid(raise_exception=True)
+    return params
+
+
+@pytest.fixture
+def make_es_response(db):
+    """
+    Make the response of ES to a search, with a hit for each new image.
+
+    :param size: The number of hits.
+    :param dead_link_ratio: The ratio of hits whose links are dead.
+    :return: The response and the positions of the hits with dead links.
+    """
+
+    def make(size: int, dead_link_ratio: float = 0) -> tuple[Response, set[int]]:
+        images = ImageFactory.create_batch(size=size, skip_es=True)
+        dead = set(random.Random(SEED).sample(range(size), int(size * dead_link_ratio)))
+        hits = [
+            create_mock_es_http_image_hit(
+                _id=str(image.pk),
+                index="image",
+                live=position not in dead,
+                identifier=str(image.identifier),
+            )
+            for position, image in enumerate(images)
+        ]
+        body = {
+            "took": 3,
+            "timed_out": False,
+            "hits": {
+                "total": {"value": 10_000, "relation": "gte"},
+                "max_score": 11.0,
+                "hits": hits,
+            },
+        }
+        return Response(Search(), body), dead
+
+    return make
@@ -0,0 +1,27 @@
+"""
+The implementations replaced by optimizations of the hot paths of searches.
+
+They are kept here, rather than in the API, only so that the benchmarks can
+compare the current implementations to them.
+"""
+
+from django.db.models import QuerySet
+
+from api.models import ContentSource
+
+
+def legacy_hydrate_hits(queryset: QuerySet, hits) -> list:
+    """Map ES hits to model instances as ``MediaViewSet`` used to."""
+
+    identifiers = [hit.identifier for hit in hits]
+    results = list(
+        queryset.exclude(
+            source__in=ContentSource.objects.filter(filter_content=True).values_list(
+                "source_identifier"
+            )
+        ).filter(identifier__in=identifiers)
+    )
+    results.sort(key=lambda x: identifiers.index(str(x.identifier)))
+    for result, hit in zip(results, hits):
+        result.fields_matched = getattr(hit.meta, "highlight", None)
+    return results
@@ -0,0 +1,153 @@
+"""
+Benchmarks of searches against the Elasticsearch cluster of the API.
+
+Unlike the other benchmarks, these send the searches to ES, with profiling
+enabled, to compare the time ES spends in the phases of a search. The time
+of each search is benchmarked, and the fastest time of the phases reported by
+the profiles is saved in the extra info of the benchmark. They are only run
+when the benchmarks are enabled, see ``just benchmark``, and are skipped if
+ES cannot be reached.
+"""
+
+from django.conf import settings
+
+import pytest
+from elastic_transport import JsonSerializer
+from elasticsearch_dsl.response import Hit
+
+from api.controllers import search_controller
+from api.models import Image
+from api.utils.hydration import (
+    HIT_SOURCE_FIELDS,
+    get_es_hydration_source_fields,
+    get_fields_matched,
+)
+
+
+ROUNDS = 5
+
+
+@pytest.fixture
+def es(benchmark):
+    if benchmark.disabled:
+        pytest.skip("Searches ES, only run with `just benchmark`.")
+    if not settings.ES.ping():
+        pytest.skip("ES cannot be reached.")
+    return settings.ES
+
+
+def get_fetch_time(response: dict) -> float:
+    """Get the time ES spent in the fetch phase, across all shards, in ms."""
+
+    return (
+        sum(
+            shard["fetch"]["time_in_nanos"]
+            for shard in response["profile"]["shards"]
+            if "fetch" in shard
+        )
+        / 1_000_000
+    )
+
+
+def get_query_time(response: dict) -> float:
+    """Get the time ES spent in the query phase, across all shards, in ms."""
+
+    return (
+        sum(
+            query["time_in_nanos"]
+            for shard in response["profile"]["shards"]
+            for search in shard["searches"]
+            for query in search["query"]
+        )
+        / 1_000_000
+    )
+
+
+def profile_search(benchmark, es, index: str, body: dict) -> list[dict]:
+    """
+    Benchmark the search, profiled by ES.
+
+    :return: The response of each round.
+    """
+
+    responses = []
+
+    def search():
+        response = es.search(
+            index=index, body=body, profile=True, request_cache=False
+        ).body
+        responses.append(response)
+
+    benchmark.pedantic(search, rounds=ROUNDS)
+    return responses
+
+
+SOURCE_PROJECTIONS = {
+    "full": None,
+    "hydration": HIT_SOURCE_FIELDS,
+    "es_only_hydration": get_es_hydration_source_fields(Image),
+}
+
+
+@pytest.mark.benchmark(group="es_source_filtering")
+@pytest.mark.parametrize(
+    "source_fields", SOURCE_PROJECTIONS.values(), ids=SOURCE_PROJECTIONS.keys()
+)
+def test_fetch_source_projection(
+    benchmark, es, search_params, page_size, source_fields
+):
+    s, index, _ = search_controller._build_search(
+        search_params, "image", False, 0, source_fields
+    )
+
+    responses = profile_search(benchmark, es, index, s[:page_size].to_dict())
+
+    benchmark.extra_info["fetch_ms"] = min(map(get_fetch_time, responses))
+    response = responses[-1]
+    # Profiles are left out, as they are not part of actual responses
+    response.pop("profile")
+    benchmark.extra_info["response_kib"] = len(JsonSerializer().dumps(response)) / 1024
+    if source_fields is not None:
+        assert all(
+            set(hit["_source"]) <= set(source_fields)
+            for hit in response["hits"]["hits"]
+        )
+
+
+def _build_fields_matched_search(
+    settings, search_params, page_size: int, named_queries: bool
+) -> tuple[str, dict]:
+    settings.ENABLE_FIELDS_MATCHED_NAMED_QUERIES = named_queries
+    s, index, _ = search_controller._build_search(search_params, "image", False, 0)
+    return index, s[:page_size].to_dict()
+
+
+def _get_fields_matched(response: dict) -> dict[str, list[str]]:
+    return {
+        hit["_id"]: list(get_fields_matched(Hit(hit)) or [])
+        for hit in response["hits"]["hits"]
+    }
+
+
+@pytest.mark.benchmark(group="es_fields_matched")
+@pytest.mark.parametrize(
+    "named_queries", (False, True), ids=("highlighting", "named_queries")
+)
+def test_find_fields_matched(
+    benchmark, es, settings, search_params, page_size, named_queries
+):
+    index, body = _build_fields_matched_search(
+        settings, search_params, page_size, named_queries
+    )
+
+    responses = profile_search(benchmark, es, index, body)
+
+    # Named queries run in the query phase, highlighting in the fetch phase
+    benchmark.extra_info["query_ms"] = min(map(get_query_time, responses))
+    benchmark.extra_info["fetch_ms"] = min(map(get_fetch_time, responses))
+    # Both implementations find the same fields for each hit
+    index, body = _build_fields_matched_search(
+        settings, search_params, page_size, not named_queries
+    )
+    other_response = es.search(index=index, body=body, request_cache=False).body
+    assert _get_fields_matched(responses[-1]) == _get_fields_matched(other_response)
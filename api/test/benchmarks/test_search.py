@@ -0,0 +1,240 @@
+"""
+Benchmarks of the pure Python hot paths of searches.
+
+These run as regular tests, once and without timing, as the benchmarks are
+disabled by default. See ``just benchmark`` to time them and compare them to
+the saved baselines.
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+import pytest
+from elastic_transport import JsonSerializer
+from elasticsearch_dsl import Search
+from elasticsearch_dsl.response import Response
+
+from api.controllers import search_controller
+from api.controllers.elasticsearch.helpers import (
+    DEAD_LINK_RATIO,
+    _paginate_with_dead_link_mask,
+)
+from api.models import Image
+from api.utils.check_dead_links import check_dead_links
+from api.utils.check_dead_links.status_cache import cache_statuses
+from api.utils.dead_link_mask import (
+    get_legacy_query_hash,
+    get_query_hash,
+    save_query_mask,
+)
+from api.utils.drf_renderer import ORJSONRenderer
+from api.utils.hydration import (
+    FIELDS_MATCHED_ORDER,
+    HIT_SOURCE_FIELDS,
+    get_es_hydration_source_fields,
+    get_fields_matched,
+    hydrate_hits,
+)
+from api.views.image_views import ImageViewSet
+from test.benchmarks.legacy import legacy_hydrate_hits
+
+
+@pytest.fixture
+def search(search_params):
+    s, _, _ = search_controller._build_search(
+        search_params, "image", False, 0, HIT_SOURCE_FIELDS
+    )
+    return s
+
+
+def test_build_search_query(benchmark, search_params):
+    query = benchmark(search_controller.build_search_query, search_params)
+
+    assert query.to_dict()["bool"]["must"]
+
+
+@pytest.mark.benchmark(group="query_hash")
+@pytest.mark.parametrize(
+    "hash_query",
+    (get_legacy_query_hash, get_query_hash),
+    ids=("legacy_deephash", "blake2b"),
+)
+def test_get_query_hash(benchmark, search, hash_query):
+    query_hash = benchmark(hash_query, search[0:40])
+
+    assert query_hash == hash_query(search[0:40])
+
+
+def test_paginate_with_dead_link_mask(
+    benchmark, search, redis, page_size, dead_link_ratio, make_es_response
+):
+    size = int(page_size * 3 / DEAD_LINK_RATIO)
+    _, dead = make_es_response(size, dead_link_ratio)
+    query_hash = get_query_hash(search)
+    save_query_mask(query_hash, [int(i not in dead) for i in range(size)])
+
+    start, end = benchmark(
+        _paginate_with_dead_link_mask, search, page_size, 2, query_hash
+    )
+
+    assert start < end
+
+
+def test_check_dead_links(
+    benchmark, redis, page_size, dead_link_ratio, make_es_response
+):
+    es_response, dead = make_es_response(
+        int(page_size / DEAD_LINK_RATIO), dead_link_ratio
+    )
+    hits = list(es_response)
+    # All statuses are cached, so that no link is requested
+    cache_statuses(
+        redis, [(hit.url, 404 if i in dead else 200) for i, hit in enumerate(hits)]
+    )
+
+    def setup():
+        # The dead links are removed from the list of hits in place
+        return ("benchmark", 0, list(hits), page_size), {}
+
+    benchmark.pedantic(check_dead_links, setup=setup, rounds=100)
+
+    results = list(hits)
+    check_dead_links("benchmark", 0, results, page_size)
+    assert len(results) == min(page_size, len(hits) - len(dead))
+
+
+SOURCE_PROJECTIONS = {
+    "full": None,
+    "hydration": HIT_SOURCE_FIELDS,
+    "es_only_hydration": get_es_hydration_source_fields(Image),
+}
+
+
+@pytest.mark.benchmark(group="source_filtering")
+@pytest.mark.parametrize(
+    "source_fields", SOURCE_PROJECTIONS.values(), ids=SOURCE_PROJECTIONS.keys()
+)
+def test_parse_es_response(benchmark, page_size, make_es_response, source_fields):
+    es_response, _ = make_es_response(page_size)
+    body = es_response.to_dict()
+    if source_fields is not None:
+        for hit in body["hits"]["hits"]:
+            hit["_source"] = {
+                field: value
+                for field, value in hit["_source"].items()
+                if field in source_fields
+            }
+    serializer = JsonSerializer()
+    content = serializer.dumps(body)
+    benchmark.extra_info["response_kib"] = len(content) / 1024
+
+    def parse():
+        return list(Response(Search(), serializer.loads(content)))
+
+    hits = benchmark(parse)
+
+    assert len(hits) == page_size
+    if source_fields is not None:
+        assert all(set(hit.to_dict()) <= set(source_fields) for hit in hits)
+
+
+@pytest.mark.benchmark(group="fields_matched")
+@pytest.mark.parametrize(
+    "named_queries", (False, True), ids=("highlighting", "named_queries")
+)
+def test_get_fields_matched(benchmark, page_size, make_es_response, named_queries):
+    es_response, _ = make_es_response(page_size)
+    body = es_response.to_dict()
+    for hit in body["hits"]["hits"]:
+        if named_queries:
+            hit["matched_queries"] = ["title", "tags.name", "description"]
+        else:
+            hit["highlight"] = {
+                "description": ["A <em>bird</em> in <em>nature</em>"],
+                "title": ["<em>Bird</em> <em>Nature</em> Photo"],
+                "tags.name": ["<em>bird</em>"],
+            }
+    serializer = JsonSerializer()
+    content = serializer.dumps(body)
+    benchmark.extra_info["response_kib"] = len(content) / 1024
+
+    def parse():
+        hits = Response(Search(), serializer.loads(content))
+        return [list(get_fields_matched(hit)) for hit in hits]
+
+    fields_matched = benchmark(parse)
+
+    assert fields_matched == [FIELDS_MATCHED_ORDER] * page_size
+
+
+def test_get_db_results(benchmark, page_size, make_es_response):
+    es_response, _ = make_es_response(page_size)
+
+    results = benchmark(ImageViewSet().get_db_results, list(es_response))
+
+    assert len(results) == page_size
+
+
+@pytest.mark.benchmark(group="hydration")
+@pytest.mark.parametrize(
+    "hydrate", (legacy_hydrate_hits, hydrate_hits), ids=("legacy", "current")
+)
+def test_hydrate_hits(benchmark, page_size, make_es_response, hydrate):
+    es_response, _ = make_es_response(page_size)
+    hits = list(es_response)
+    queryset = Image.objects.select_related(*ImageViewSet.select_related_fields)
+
+    results = benchmark(hydrate, queryset, hits)
+
+    assert [str(result.identifier) for result in results] == [
+        hit.identifier for hit in hits
+    ]
+
+
+@pytest.mark.benchmark(group="serialization")
+@pytest.mark.parametrize("compiled", (False, True), ids=("drf", "compiled"))
+def test_serialize_results(
+    benchmark, settings, search_params, page_size, make_es_response, compiled
+):
+    es_response, _ = make_es_response(page_size)
+    view = ImageViewSet(
+        request=search_params.context["request"], format_kwarg=None, kwargs={}
+    )
+    results = view.get_db_results(list(es_response))
+    context = {
+        "request": search_params.context["request"],
+        "validated_data": search_params.validated_data,
+    }
+    settings.ENABLE_COMPILED_SERIALIZERS = compiled
+
+    data = benchmark(view.serialize_results, results, context)
+
+    assert len(data) == page_size
+
+
+@pytest.mark.benchmark(group="rendering")
+@pytest.mark.parametrize(
+    "renderer", (JSONRenderer(), ORJSONRenderer()), ids=("drf", "orjson")
+)
+def test_render_results(
+    benchmark, search_params, page_size, make_es_response, renderer
+):
+    es_response, _ = make_es_response(page_size)
+    view = ImageViewSet(
+        request=search_params.context["request"], format_kwarg=None, kwargs={}
+    )
+    results = view.get_db_results(list(es_response))
+    context = {
+        "request": search_params.context["request"],
+        "validated_data": search_params.validated_data,
+    }
+    page = {
+        "result_count": page_size,
+        "page_count": 1,
+        "page_size": page_size,
+        "page": 1,
+        "results": view.serialize_results(results, context),
+    }
+
+    content = benchmark(renderer.render, page)
+
+    assert content == JSONRenderer().render(page)
@@ -3,7 +3,9 @@
 from test.fixtures.asynchronous import ensure_asgi_lifecycle, get_new_loop, session_loop
 from test.fixtures.cache import (
     django_cache,
+    local_caches,
     redis,
+    redis_round_trips,
     unreachable_django_cache,
     unreachable_redis,
 )
@@ -18,6 +20,7 @@ from test.fixtures.rest_framework import (
     anon_request,
     api_client,
     authed_request,
+    request_counters,
     request_factory,
 )
 
@@ -27,11 +30,14 @@ __all__ = [
     "get_new_loop",
     "session_loop",
     "django_cache",
+    "local_caches",
     "redis",
+    "redis_round_trips",
     "unreachable_django_cache",
     "unreachable_redis",
     "api_client",
     "request_factory",
+    "request_counters",
     "access_token",
     "authed_request",
     "anon_request",
@@ -4,6 +4,9 @@ import pytest
 from django_redis.cache import RedisCache
 from fakeredis import FakeRedis, FakeServer
 
+from api.utils.local_cache import clear_local_caches
+from api.utils.request_counters import instrument_redis, uninstrument_redis
+
 
 @pytest.fixture(autouse=True)
 def redis(monkeypatch) -> FakeRedis:
@@ -19,6 +22,15 @@ def redis(monkeypatch) -> FakeRedis:
     fake_redis.client().close()
 
 
+@pytest.fixture(autouse=True)
+def local_caches():
+    """Prevent values cached in memory from leaking between tests."""
+
+    clear_local_caches()
+    yield
+    clear_local_caches()
+
+
 @pytest.fixture
 def unreachable_redis(monkeypatch) -> FakeRedis:
     """
@@ -72,3 +84,12 @@ def unreachable_django_cache(unreachable_redis) -> RedisCache:
     caches["default"] = unreachable_redis
     yield cache
     caches["default"] = original_default_cache
+
+
+@pytest.fixture
+def redis_round_trips():
+    """Count the round trips to Redis, see ``api.utils.request_counters``."""
+
+    instrument_redis()
+    yield
+    uninstrument_redis()
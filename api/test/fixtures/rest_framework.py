@@ -2,6 +2,8 @@ from rest_framework.test import APIClient, APIRequestFactory
 from rest_framework.views import APIView
 
 import pytest
+import structlog
+from django_structlog.signals import bind_extra_request_finished_metadata
 
 from test.factory.models.oauth2 import AccessTokenFactory
 
@@ -38,3 +40,22 @@ def authed_request(access_token, request_factory):
 @pytest.fixture
 def anon_request(request_factory):
     return APIView().initialize_request(request_factory.get("/"))
+
+
+@pytest.fixture
+def request_counters() -> list[dict]:
+    """
+    Record the counters of each request made during the test, in the order in
+    which the requests finish. See ``api.utils.request_counters``.
+    """
+
+    counters = []
+
+    def record(**kwargs):
+        counters.append(structlog.contextvars.get_contextvars())
+
+    # Counters incremented outside of requests are not reset by the middleware
+    structlog.contextvars.clear_contextvars()
+    bind_extra_request_finished_metadata.connect(record, weak=False)
+    yield counters
+    bind_extra_request_finished_metadata.disconnect(record)
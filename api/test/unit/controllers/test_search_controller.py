@@ -1,5 +1,6 @@
 import random
 import re
+import time
 from collections.abc import Callable
 from datetime import datetime, timezone
 from enum import Enum, auto
@@ -9,6 +10,8 @@ from uuid import uuid4
 
 import pook
 import pytest
+import structlog
+from asgiref.sync import async_to_sync
 from django_redis import get_redis_connection
 from elasticsearch_dsl import Search
 from elasticsearch_dsl.query import Terms
@@ -22,10 +25,13 @@ from api.controllers.search_controller import (
 )
 from api.utils import tallies
 from api.utils.dead_link_mask import get_query_hash, save_query_mask
+from api.utils.local_cache import clear_local_caches
 from api.utils.search_context import SearchContext
+from api.utils.search_cursor import CursorExpired, CursorMismatch, SearchCursor
 from test.factory.es_http import (
     MOCK_DEAD_RESULT_URL_PREFIX,
     MOCK_LIVE_RESULT_URL_PREFIX,
+    create_mock_es_http_image_hit,
     create_mock_es_http_image_search_response,
 )
 from test.factory.models.content_source import ContentSourceFactory
@@ -115,6 +121,38 @@ def test_get_result_and_page_count(
     assert actual == expected
 
 
+def test_get_result_and_page_count_with_lower_bound_of_hits():
+    response_obj = mock.MagicMock()
+    response_obj.hits.total.value = search_controller.TRACK_TOTAL_HITS
+    response_obj.hits.total.relation = "gte"
+    # A short page, which does not mean that the hits are exhausted
+    results = [mock.MagicMock() for _ in range(10)]
+
+    actual = search_controller._get_result_and_page_count(
+        response_obj, results, page_size=20, page=3
+    )
+
+    assert actual == (
+        search_controller.TRACK_TOTAL_HITS,
+        search_controller.TRACK_TOTAL_HITS // 20,
+    )
+
+
+@pytest.mark.parametrize(
+    "relation, expected_end",
+    (
+        pytest.param("eq", None, id="exact_count"),
+        pytest.param("gte", 360, id="lower_bound"),
+    ),
+)
+def test_get_backfill_end_only_stops_at_exact_count_of_hits(relation, expected_end):
+    search_results = mock.MagicMock()
+    search_results.hits.total.value = 240
+    search_results.hits.total.relation = relation
+
+    assert search_controller._get_backfill_end(0, 240, search_results) == expected_end
+
+
 @pytest.fixture
 def unique_search() -> Search:
     s = Search()
@@ -250,7 +288,13 @@ def create_mask_fixture() -> Callable[[Search, int, int], None]:
     yield create_mask
 
     with get_redis_connection("default") as redis:
-        redis.delete(*[f"{h}:dead_link_mask" for h in created_masks])
+        redis.delete(
+            *[
+                f"{h}:{suffix}"
+                for h in created_masks
+                for suffix in ("dead_link_bitmask", "dead_link_bitmask_size")
+            ]
+        )
 
 
 @pytest.mark.parametrize(
@@ -547,6 +591,40 @@ def test_search_tallies_handles_empty_page(
     count_provider_occurrences_mock.assert_not_called()
 
 
+@pytest.mark.parametrize(
+    "page, filter_dead, counts_query",
+    ((1, True, True), (1, False, False), (2, True, False)),
+)
+@mock.patch.object(tallies, "count_occurrences")
+def test_tally_response_tallies_serialized_results(
+    count_occurrences_mock: mock.MagicMock,
+    page,
+    filter_dead,
+    counts_query,
+    media_type_config,
+):
+    serializer = media_type_config.search_request_serializer(
+        data={"q": "dogs"}, context={"media_type": media_type_config.media_type}
+    )
+    serializer.is_valid()
+    results = [{"provider": "flickr"}, {"provider": "stocksnap"}]
+
+    search_controller.tally_response(
+        serializer,
+        media_type_config.origin_index,
+        False,
+        results,
+        page,
+        20,
+        filter_dead,
+    )
+
+    index, tallied_results, *query = count_occurrences_mock.call_args.args
+    assert index == media_type_config.filtered_index
+    assert tallied_results == results
+    assert bool(query) == counts_query
+
+
 @pytest.mark.parametrize(
     ("feature_enabled", "include_sensitive_results", "index_suffix"),
     (
@@ -660,6 +738,233 @@ def test_no_post_process_results_recursion(
     assert mock_search.total_matches == 1
 
 
+def _mock_es_http_multi_search_response(*responses):
+    return {"took": 3, "responses": list(responses)}
+
+
+@mock.patch(
+    "api.controllers.search_controller._apost_process_results",
+    wraps=search_controller._apost_process_results,
+)
+@mock.patch("api.controllers.search_controller.SearchContext")
+@pook.on
+def test_no_apost_process_results_recursion(
+    mock_search_context,
+    wrapped_apost_process_results,
+    image_media_type_config,
+    settings,
+    redis,
+):
+    # Search context does not matter for this test, so we can mock it
+    # to avoid needing to account for additional ES requests
+    mock_search_context.abuild = mock.AsyncMock(
+        return_value=SearchContext(set(), set())
+    )
+
+    hit_count = 5
+    mock_es_response = create_mock_es_http_image_search_response(
+        index=image_media_type_config.origin_index,
+        total_hits=45,
+        hit_count=hit_count,
+    )
+
+    # The main query and the speculative backfill slice are sent together
+    mock_search = (
+        pook.post(f"{settings.ES_ENDPOINT}/_msearch")
+        .times(1)
+        .reply(200)
+        .header("x-elastic-product", "Elasticsearch")
+        .json(
+            _mock_es_http_multi_search_response(
+                mock_es_response,
+                create_mock_es_http_image_search_response(
+                    index=image_media_type_config.origin_index,
+                    total_hits=45,
+                    hit_count=0,
+                ),
+            )
+        )
+        .mock
+    )
+
+    # Ensure dead link filtering does not remove any results
+    pook.head(
+        pook.regex(rf"{MOCK_LIVE_RESULT_URL_PREFIX}/\d"),
+    ).times(hit_count).reply(200)
+
+    serializer = image_media_type_config.search_request_serializer(
+        data={"q": "bird perched"},
+        context={"media_type": image_media_type_config.media_type},
+    )
+    serializer.is_valid()
+    results, _, _, _ = async_to_sync(search_controller.aquery_media)(
+        search_params=serializer,
+        ip=0,
+        origin_index=image_media_type_config.origin_index,
+        exact_index=True,
+        page=3,
+        page_size=20,
+        filter_dead=True,
+    )
+
+    assert {r["_source"]["identifier"] for r in mock_es_response["hits"]["hits"]} == {
+        r.identifier for r in results
+    }
+
+    assert wrapped_apost_process_results.call_count == 1
+    assert mock_search.total_matches == 1
+    mock_search_context.abuild.assert_awaited_once()
+
+
+@mock.patch(
+    "api.controllers.search_controller._apost_process_results",
+    wraps=search_controller._apost_process_results,
+)
+@mock.patch("api.controllers.search_controller.SearchContext")
+@pook.on
+def test_apost_process_results_backfills_from_prefetched_results(
+    mock_search_context,
+    wrapped_apost_process_results,
+    image_media_type_config,
+    settings,
+    redis,
+):
+    mock_search_context.abuild = mock.AsyncMock(
+        return_value=SearchContext(set(), set())
+    )
+
+    # First slice: from: 0, size: 10, speculative slice: from: 10, size: 5.
+    # The backfill is clamped to the 12 available hits, all of which are
+    # covered by the two slices, so no further query is needed.
+    mock_es_response_1 = create_mock_es_http_image_search_response(
+        index=image_media_type_config.origin_index,
+        total_hits=12,
+        hit_count=10,
+        live_hit_count=2,
+    )
+    mock_es_response_2 = create_mock_es_http_image_search_response(
+        index=image_media_type_config.origin_index,
+        total_hits=12,
+        hit_count=2,
+        base_hits=mock_es_response_1["hits"]["hits"],
+    )
+    mock_es_response_2["hits"]["hits"] = mock_es_response_2["hits"]["hits"][10:]
+
+    mock_multi_search = (
+        pook.post(f"{settings.ES_ENDPOINT}/_msearch")
+        .body(re.compile('from":10,"size":5'))
+        .times(1)
+        .reply(200)
+        .header("x-elastic-product", "Elasticsearch")
+        .json(
+            _mock_es_http_multi_search_response(mock_es_response_1, mock_es_response_2)
+        )
+        .mock
+    )
+    pook.head(pook.regex(rf"{MOCK_LIVE_RESULT_URL_PREFIX}/\d+")).times(4).reply(200)
+    pook.head(pook.regex(rf"{MOCK_DEAD_RESULT_URL_PREFIX}/\d+")).times(8).reply(400)
+
+    serializer = image_media_type_config.search_request_serializer(
+        data={"q": "bird perched"},
+        context={"media_type": image_media_type_config.media_type},
+    )
+    serializer.is_valid()
+    structlog.contextvars.clear_contextvars()
+    results, _, _, _ = async_to_sync(search_controller.aquery_media)(
+        search_params=serializer,
+        ip=0,
+        origin_index=image_media_type_config.origin_index,
+        exact_index=True,
+        page=1,
+        page_size=5,
+        filter_dead=True,
+    )
+
+    assert len(results) == 4
+    assert structlog.contextvars.get_contextvars()["es_round_trips"] == 1
+    assert wrapped_apost_process_results.call_count == 2
+    # Any further query would fail, as pook does not allow unmatched requests
+    assert mock_multi_search.total_matches == 1
+
+
+@mock.patch("api.controllers.search_controller.SearchContext")
+@pook.on
+def test_apost_process_results_backfills_with_search_after(
+    mock_search_context,
+    image_media_type_config,
+    settings,
+    redis,
+):
+    settings.ENABLE_SEARCH_AFTER_BACKFILL = True
+    mock_search_context.abuild = mock.AsyncMock(
+        return_value=SearchContext(set(), set())
+    )
+
+    # First slice: from: 0, size: 10, 2 live hits
+    # Speculative slice: from: 10, size: 5, 1 live hit
+    # search_after window: size: 4 to fetch the 2 missing live results
+    total_hits = 30
+    mock_responses = []
+    for hit_count, live_hit_count in ((10, 2), (5, 1), (4, 2)):
+        base_hits = [hit for r in mock_responses for hit in r["hits"]["hits"]]
+        mock_response = create_mock_es_http_image_search_response(
+            index=image_media_type_config.origin_index,
+            total_hits=total_hits,
+            hit_count=hit_count,
+            live_hit_count=live_hit_count,
+            base_hits=base_hits,
+        )
+        mock_response["hits"]["hits"] = mock_response["hits"]["hits"][len(base_hits) :]
+        for hit in mock_response["hits"]["hits"]:
+            hit["sort"] = [hit["_score"], hit["_source"]["identifier"]]
+        mock_responses.append(mock_response)
+
+    pook.post(f"{settings.ES_ENDPOINT}/_msearch").times(1).reply(200).header(
+        "x-elastic-product", "Elasticsearch"
+    ).json(_mock_es_http_multi_search_response(*mock_responses[:2]))
+
+    last_prefetched_hit = mock_responses[1]["hits"]["hits"][-1]
+    mock_search_after = (
+        pook.post(
+            f"{settings.ES_ENDPOINT}/{image_media_type_config.origin_index}/_search"
+        )
+        .body(re.compile(last_prefetched_hit["_source"]["identifier"]))
+        .body(re.compile('from":0,"size":4'))
+        .times(1)
+        .reply(200)
+        .header("x-elastic-product", "Elasticsearch")
+        .json(mock_responses[2])
+        .mock
+    )
+
+    pook.head(pook.regex(rf"{MOCK_LIVE_RESULT_URL_PREFIX}/\d+")).times(5).reply(200)
+    pook.head(pook.regex(rf"{MOCK_DEAD_RESULT_URL_PREFIX}/\d+")).times(14).reply(400)
+
+    serializer = image_media_type_config.search_request_serializer(
+        data={"q": "bird perched"},
+        context={"media_type": image_media_type_config.media_type},
+    )
+    serializer.is_valid()
+    results, _, _, _ = async_to_sync(search_controller.aquery_media)(
+        search_params=serializer,
+        ip=0,
+        origin_index=image_media_type_config.origin_index,
+        exact_index=True,
+        page=1,
+        page_size=5,
+        filter_dead=True,
+    )
+
+    live_identifiers = [
+        hit["_source"]["identifier"]
+        for r in mock_responses
+        for hit in r["hits"]["hits"]
+        if hit["_source"]["url"].startswith(MOCK_LIVE_RESULT_URL_PREFIX)
+    ]
+    assert [r.identifier for r in results] == live_identifiers
+    assert mock_search_after.total_matches == 1
+
+
 @pytest.mark.parametrize(
     # both scenarios force `post_process_results`
     # to recurse to fill the page due to the dead link
@@ -879,6 +1184,49 @@ def test_get_excluded_sources_query_returns_excluded(
         )
 
 
+def test_get_filtered_sources_reads_memory_then_redis(
+    search_con_cache, redis_round_trips
+):
+    search_con_cache.set(
+        key=FILTERED_SOURCES_CACHE_KEY,
+        version=FILTERED_SOURCES_CACHE_VERSION,
+        value=["source1"],
+    )
+    structlog.contextvars.clear_contextvars()
+
+    assert search_controller.get_filtered_sources() == ["source1"]
+    assert search_controller.get_filtered_sources() == ["source1"]
+
+    # The version of the cached list, then the list
+    assert structlog.contextvars.get_contextvars()["redis_round_trips"] == 2
+
+
+def test_content_source_changes_invalidate_filtered_sources(search_con_cache):
+    source = ContentSourceFactory.create(
+        created_on=datetime.now(tz=timezone.utc),
+        source_identifier="source1",
+        source_name="Source 1",
+        filter_content=False,
+        media_type="image",
+    )
+    # Caches the empty list, in memory and in Redis
+    assert search_controller.get_filtered_sources() == []
+
+    source.filter_content = True
+    source.save()
+
+    assert search_controller.get_filtered_sources() == ["source1"]
+    # A list read from the DB before the change, by another worker, is cached
+    # for the previous version
+    search_con_cache.set(
+        key=FILTERED_SOURCES_CACHE_KEY,
+        version=FILTERED_SOURCES_CACHE_VERSION,
+        value=[],
+    )
+    clear_local_caches()
+    assert search_controller.get_filtered_sources() == ["source1"]
+
+
 @cache_availability_params
 def test_get_sources_returns_stats(is_cache_reachable, cache_name, request, caplog):
     cache = request.getfixturevalue(cache_name)
@@ -913,3 +1261,340 @@ def test_get_sources_returns_stats(is_cache_reachable, cache_name, request, capl
                 "Redis connect failed, cannot cache sources.",
             ]
         )
+
+
+SOURCES_RESPONSE = {
+    "aggregations": {
+        "unique_sources": {"buckets": [{"key": "source_1", "doc_count": 2000}]}
+    }
+}
+
+
+def _wait_for_sources_refresh():
+    # The executor runs one refresh at a time, in order
+    search_controller._sources_refresh_executor.submit(lambda: None).result()
+
+
+def test_get_sources_serves_stale_sources_while_refreshing(search_con_cache):
+    search_con_cache.set(
+        "sources-multimedia",
+        value={"fresh_until": time.time() - 1, "sources": {"source_1": 1000}},
+    )
+
+    with patch(
+        "api.controllers.search_controller.get_raw_es_response",
+        return_value=SOURCES_RESPONSE,
+    ) as get_raw_es_response:
+        assert search_controller.get_sources("multimedia") == {"source_1": 1000}
+        _wait_for_sources_refresh()
+
+    get_raw_es_response.assert_called_once()
+    entry = search_con_cache.get("sources-multimedia")
+    assert entry["sources"] == {"source_1": 2000}
+    assert entry["fresh_until"] > time.time()
+    assert search_con_cache.get("sources-multimedia:refresh_lock") is None
+
+
+def test_get_sources_refreshes_once_at_a_time(search_con_cache):
+    search_con_cache.set(
+        "sources-multimedia",
+        value={"fresh_until": time.time() - 1, "sources": {"source_1": 1000}},
+    )
+    # Another worker is refreshing the sources
+    search_con_cache.set("sources-multimedia:refresh_lock", 1)
+
+    with patch(
+        "api.controllers.search_controller.get_raw_es_response",
+        return_value=SOURCES_RESPONSE,
+    ) as get_raw_es_response:
+        assert search_controller.get_sources("multimedia") == {"source_1": 1000}
+        _wait_for_sources_refresh()
+
+    get_raw_es_response.assert_not_called()
+
+
+def test_get_sources_does_not_refresh_fresh_sources(search_con_cache):
+    search_con_cache.set(
+        "sources-multimedia",
+        value={"fresh_until": time.time() + 60, "sources": {"source_1": 1000}},
+    )
+
+    with patch(
+        "api.controllers.search_controller.get_raw_es_response",
+    ) as get_raw_es_response:
+        assert search_controller.get_sources("multimedia") == {"source_1": 1000}
+        _wait_for_sources_refresh()
+
+    get_raw_es_response.assert_not_called()
+
+
+def test_warm_up_sources_caches_sources_of_each_media_type():
+    with patch.object(search_controller, "get_sources") as get_sources:
+        async_to_sync(search_controller.warm_up_sources)(sender=None)
+
+    assert [call.args for call in get_sources.call_args_list] == [
+        ("audio",),
+        ("image",),
+    ]
+
+
+def _mock_es_http_pit_search_response(index, pit_id, liveness, start=0):
+    response = create_mock_es_http_image_search_response(
+        index=index, total_hits=100, hit_count=0
+    )
+    response["pit_id"] = pit_id
+    response["hits"]["hits"] = [
+        create_mock_es_http_image_hit(_id=start + i, index=index, live=live)
+        for i, live in enumerate(liveness)
+    ]
+    for hit in response["hits"]["hits"]:
+        hit["sort"] = [hit["_score"], hit["_source"]["identifier"]]
+    return response
+
+
+def _mock_es_http_endpoint(method, url, response, *body_patterns, status=200):
+    mock = getattr(pook, method)(url)
+    for pattern in body_patterns:
+        mock = mock.body(re.compile(pattern))
+    return (
+        mock.times(1)
+        .reply(status)
+        .header("x-elastic-product", "Elasticsearch")
+        .json(response)
+        .mock
+    )
+
+
+def _get_cursor_search_params(media_type_config):
+    serializer = media_type_config.search_request_serializer(
+        data={"q": "bird perched"},
+        context={"media_type": media_type_config.media_type},
+    )
+    serializer.is_valid()
+    return serializer
+
+
+def _get_cursor_query_hash(media_type_config) -> str:
+    """Get the query hash of the cursors of ``_query_media_with_cursor``."""
+
+    s, index, _ = search_controller._build_search(
+        _get_cursor_search_params(media_type_config),
+        media_type_config.origin_index,
+        True,
+        0,
+    )
+    s = search_controller._with_tiebreaker_sort(s)
+    return f"{index}:{get_query_hash(s)}"
+
+
+def _query_media_with_cursor(media_type_config, cursor, page_size, filter_dead):
+    return async_to_sync(search_controller.aquery_media_with_cursor)(
+        search_params=_get_cursor_search_params(media_type_config),
+        ip=0,
+        origin_index=media_type_config.origin_index,
+        exact_index=True,
+        page_size=page_size,
+        filter_dead=filter_dead,
+        cursor=cursor,
+    )
+
+
+@mock.patch("api.controllers.search_controller.SearchContext")
+@pook.on
+def test_aquery_media_with_cursor_reads_pages_from_point_in_time(
+    mock_search_context, image_media_type_config, settings
+):
+    mock_search_context.abuild = mock.AsyncMock(
+        return_value=SearchContext(set(), set())
+    )
+    index = image_media_type_config.origin_index
+    first_page = _mock_es_http_pit_search_response(index, "pit-2", [True] * 5)
+    last_page = _mock_es_http_pit_search_response(index, "pit-3", [True] * 3, 5)
+
+    open_pit = _mock_es_http_endpoint(
+        "post", f"{settings.ES_ENDPOINT}/{index}/_pit", {"id": "pit-1"}
+    )
+    # The index is that of the point in time, so it is not in the URL
+    _mock_es_http_endpoint(
+        "post",
+        f"{settings.ES_ENDPOINT}/_search",
+        first_page,
+        '"id":"pit-1"',
+        '"size":5',
+    )
+    last_identifier = first_page["hits"]["hits"][-1]["_source"]["identifier"]
+    _mock_es_http_endpoint(
+        "post",
+        f"{settings.ES_ENDPOINT}/_search",
+        last_page,
+        '"id":"pit-2"',
+        f'"search_after":\\[7.607353,"{last_identifier}"\\]',
+    )
+    close_pit = _mock_es_http_endpoint(
+        "delete", f"{settings.ES_ENDPOINT}/_pit", {"succeeded": True}, '"pit-3"'
+    )
+
+    results, next_cursor, result_count, _ = _query_media_with_cursor(
+        image_media_type_config, SearchCursor(), page_size=5, filter_dead=False
+    )
+
+    assert [r.identifier for r in results] == [
+        hit["_source"]["identifier"] for hit in first_page["hits"]["hits"]
+    ]
+    assert result_count == 100
+    assert next_cursor == SearchCursor(
+        pit_id="pit-2",
+        search_after=[7.607353, last_identifier],
+        offset=5,
+        depth=5,
+        query_hash=_get_cursor_query_hash(image_media_type_config),
+    )
+    assert open_pit.total_matches == 1
+    assert close_pit.total_matches == 0
+
+    results, next_cursor, _, _ = _query_media_with_cursor(
+        image_media_type_config, next_cursor, page_size=5, filter_dead=False
+    )
+
+    assert [r.identifier for r in results] == [
+        hit["_source"]["identifier"] for hit in last_page["hits"]["hits"]
+    ]
+    # The results are exhausted, so the point in time is closed
+    assert next_cursor is None
+    assert open_pit.total_matches == 1
+    assert close_pit.total_matches == 1
+
+
+@mock.patch("api.controllers.search_controller.SearchContext")
+@pook.on
+def test_aquery_media_with_cursor_skips_dead_links(
+    mock_search_context, image_media_type_config, settings, redis
+):
+    mock_search_context.abuild = mock.AsyncMock(
+        return_value=SearchContext(set(), set())
+    )
+    index = image_media_type_config.origin_index
+    query_hash = _get_cursor_query_hash(image_media_type_config)
+    cursor = SearchCursor(
+        pit_id="pit-1",
+        search_after=[1.0, "a"],
+        offset=8,
+        depth=6,
+        query_hash=query_hash,
+    )
+    response = _mock_es_http_pit_search_response(
+        index, "pit-1", [True, False, True, False, True, True]
+    )
+
+    _mock_es_http_endpoint(
+        "post", f"{settings.ES_ENDPOINT}/_search", response, '"size":6'
+    )
+    pook.head(pook.regex(rf"{MOCK_LIVE_RESULT_URL_PREFIX}/\d+")).times(4).reply(200)
+    pook.head(pook.regex(rf"{MOCK_DEAD_RESULT_URL_PREFIX}/\d+")).times(2).reply(404)
+
+    results, next_cursor, _, _ = _query_media_with_cursor(
+        image_media_type_config, cursor, page_size=3, filter_dead=True
+    )
+
+    hits = response["hits"]["hits"]
+    assert [r.identifier for r in results] == [
+        hits[idx]["_source"]["identifier"] for idx in (0, 2, 4)
+    ]
+    # The next page starts after the last result, not after the last hit
+    assert next_cursor == SearchCursor(
+        pit_id="pit-1",
+        search_after=hits[4]["sort"],
+        offset=13,
+        depth=9,
+        query_hash=query_hash,
+    )
+
+
+@pook.on
+def test_aquery_media_with_cursor_raises_for_expired_cursor(
+    image_media_type_config, settings
+):
+    _mock_es_http_endpoint(
+        "post",
+        f"{settings.ES_ENDPOINT}/_search",
+        {
+            "error": {"type": "search_context_missing_exception"},
+            "status": 404,
+        },
+        status=404,
+    )
+
+    with pytest.raises(CursorExpired):
+        _query_media_with_cursor(
+            image_media_type_config,
+            SearchCursor(
+                pit_id="pit-1",
+                search_after=[1.0, "a"],
+                offset=5,
+                depth=5,
+                query_hash=_get_cursor_query_hash(image_media_type_config),
+            ),
+            page_size=5,
+            filter_dead=False,
+        )
+
+
+@pook.on
+def test_aquery_media_with_cursor_rejects_cursor_of_other_query(
+    image_media_type_config, settings
+):
+    search = _mock_es_http_endpoint(
+        "post", f"{settings.ES_ENDPOINT}/_search", {}, '"id":"pit-1"'
+    )
+
+    with pytest.raises(CursorMismatch):
+        _query_media_with_cursor(
+            image_media_type_config,
+            SearchCursor(
+                pit_id="pit-1",
+                search_after=[1.0, "a"],
+                offset=5,
+                depth=5,
+                query_hash=f"{image_media_type_config.origin_index}:other",
+            ),
+            page_size=5,
+            filter_dead=False,
+        )
+
+    assert search.total_matches == 0
+
+
+@pytest.mark.parametrize(
+    "named_queries, has_highlight",
+    ((False, True), (True, False)),
+)
+def test_build_search_finds_fields_matched_by_setting(
+    image_media_type_config, settings, named_queries, has_highlight
+):
+    settings.ENABLE_FIELDS_MATCHED_NAMED_QUERIES = named_queries
+    serializer = image_media_type_config.search_request_serializer(
+        data={"q": "bird"},
+        context={"media_type": image_media_type_config.media_type},
+    )
+    serializer.is_valid(raise_exception=True)
+
+    s, _, _ = search_controller._build_search(
+        serializer, image_media_type_config.origin_index, True, 0
+    )
+
+    assert ("highlight" in s.to_dict()) == has_highlight
+
+
+def test_build_search_bounds_the_count_of_hits(image_media_type_config):
+    serializer = image_media_type_config.search_request_serializer(
+        data={"q": "nature"},
+        context={"media_type": image_media_type_config.media_type},
+    )
+    serializer.is_valid(raise_exception=True)
+
+    s, _, _ = search_controller._build_search(
+        serializer, image_media_type_config.origin_index, True, 0
+    )
+
+    # The deepest any request can paginate
+    assert s.to_dict()["track_total_hits"] == 20 * 240
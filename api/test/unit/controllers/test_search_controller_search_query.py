@@ -5,6 +5,7 @@ from api.constants.parameters import COLLECTION, TAG
 from api.controllers import search_controller
 from api.controllers.search_controller import (
     DEFAULT_SQS_FLAGS,
+    FIELDS_MATCHED_SQS_FLAGS,
     FILTERED_SOURCES_CACHE_KEY,
     FILTERED_SOURCES_CACHE_VERSION,
 )
@@ -141,6 +142,34 @@ def test_create_search_query_q_search_with_quotes_adds_raw_suffix(
     }
 
 
+def test_create_search_query_q_search_names_fields_matched_queries(
+    media_type_config, anon_request, settings
+):
+    settings.ENABLE_FIELDS_MATCHED_NAMED_QUERIES = True
+    serializer = media_type_config.search_request_serializer(
+        data={"q": '"cute cat" -dog'},
+        context={"media_type": media_type_config.media_type, "request": anon_request},
+    )
+    serializer.is_valid(raise_exception=True)
+    search_query = search_controller.build_search_query(serializer)
+    should_clauses = search_query.to_dict()["bool"]["should"]
+
+    assert should_clauses[1:4] == [
+        {
+            "simple_query_string": {
+                "default_operator": "OR",
+                "fields": [field],
+                "query": '"cute cat" -dog',
+                "flags": FIELDS_MATCHED_SQS_FLAGS,
+                "quote_field_suffix": ".raw",
+                "boost": 0,
+                "_name": field,
+            }
+        }
+        for field in ("title", "description", "tags.name")
+    ]
+
+
 def test_create_search_query_q_search_with_filters(
     image_media_type_config, anon_request
 ):
@@ -244,6 +273,28 @@ def test_create_search_query_non_q_query(image_media_type_config, anon_request):
     }
 
 
+def test_create_search_query_non_q_query_names_fields_matched_queries(
+    image_media_type_config, anon_request, settings
+):
+    settings.ENABLE_FIELDS_MATCHED_NAMED_QUERIES = True
+    serializer = image_media_type_config.search_request_serializer(
+        data={"creator": "Artist From Openverse", "tags": "cute"},
+        context={
+            "media_type": image_media_type_config.media_type,
+            "request": anon_request,
+        },
+    )
+    serializer.is_valid(raise_exception=True)
+    search_query = search_controller.build_search_query(serializer)
+    must_clauses = search_query.to_dict()["bool"]["must"]
+
+    # Only the fields that highlighting would report are named
+    assert [clause["simple_query_string"].get("_name") for clause in must_clauses] == [
+        None,
+        "tags.name",
+    ]
+
+
 def test_create_search_query_q_search_license_license_type_creates_2_terms_filters(
     image_media_type_config,
     anon_request,
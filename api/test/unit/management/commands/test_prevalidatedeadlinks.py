@@ -0,0 +1,60 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+import pook
+from elasticsearch_dsl import Search
+
+from api.utils import tallies
+from api.utils.check_dead_links.status_cache import (
+    cache_statuses,
+    get_cached_statuses,
+)
+from api.utils.dead_link_mask import get_query_hash, get_query_mask
+from test.factory.es_http import (
+    MOCK_LIVE_RESULT_URL_PREFIX,
+    create_mock_es_http_image_search_response,
+)
+
+
+def _tally_query(s: Search, occurrences: int) -> str:
+    query_hash = get_query_hash(s)
+    for _ in range(occurrences):
+        tallies.count_query_occurrence("image", query_hash, s.to_dict())
+    return query_hash
+
+
+@pook.on
+def test_revalidates_expiring_links_of_popular_queries(monkeypatch, redis, settings):
+    popular_hash = _tally_query(Search(index="image").query("match", title="dogs"), 3)
+    _tally_query(Search(index="image").query("match", title="cats"), 1)
+
+    es_response = create_mock_es_http_image_search_response(
+        index="image", total_hits=10, hit_count=10, live_hit_count=7
+    )
+    urls = [hit["_source"]["url"] for hit in es_response["hits"]["hits"]]
+    # These statuses do not expire soon, so are not revalidated
+    cache_statuses(redis, [(url, 200) for url in urls[:2]])
+
+    (
+        pook.post(f"{settings.ES_ENDPOINT}/image/_search")
+        .times(1)
+        .reply(200)
+        .header("x-elastic-product", "Elasticsearch")
+        .json(es_response)
+    )
+    requested_urls = []
+
+    async def head(url, session, provider):
+        requested_urls.append(url)
+        return url, 200 if url.startswith(MOCK_LIVE_RESULT_URL_PREFIX) else 404
+
+    monkeypatch.setattr("api.utils.check_dead_links._head", head)
+
+    out = StringIO()
+    call_command("prevalidatedeadlinks", rate=1000, stdout=out)
+
+    assert "Revalidated 8 links of 1 queries" in out.getvalue()
+    assert sorted(requested_urls) == sorted(urls[2:])
+    assert get_cached_statuses(redis, urls) == [200] * 7 + [404] * 3
+    assert list(get_query_mask(popular_hash)) == [1] * 7 + [0] * 3
@@ -0,0 +1,34 @@
+from django.http import HttpResponse
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+
+from api.middleware.stage_timing_middleware import stage_timing_middleware
+from api.utils.stage_timing import time_stage
+
+
+def view(request):
+    with time_stage("search"):
+        return HttpResponse()
+
+
+async def async_view(request):
+    return view(request)
+
+
+@pytest.mark.parametrize("get_response", (view, async_view), ids=("sync", "async"))
+def test_times_sync_and_async_requests(settings, request_factory, get_response):
+    settings.ENABLE_STAGE_TIMING = True
+    settings.ENABLE_SERVER_TIMING_HEADER = True
+    middleware = stage_timing_middleware(get_response)
+    request = request_factory.get("/")
+
+    # The middleware stays async for async views
+    if iscoroutinefunction(middleware):
+        response = async_to_sync(middleware)(request)
+    else:
+        response = middleware(request)
+
+    assert iscoroutinefunction(middleware) == iscoroutinefunction(get_response)
+    stages = [timing.split(";")[0] for timing in response["Server-Timing"].split(", ")]
+    assert set(stages) == {"search", "total"}
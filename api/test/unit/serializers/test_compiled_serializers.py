@@ -0,0 +1,51 @@
+import pytest
+
+from api.serializers.compiled_serializers import CompiledMediaSerializer, get_license
+
+
+@pytest.mark.django_db
+def test_compiled_serializer_matches_drf(media_type_config, anon_request):
+    factory = media_type_config.model_factory
+    results = [
+        factory.create(skip_es=True),
+        factory.create(skip_es=True, meta_data={}, license="BY", license_version="4.0"),
+        factory.create(skip_es=True, meta_data=None, license="not-a-license"),
+        factory.create(
+            skip_es=True,
+            url="example.com/media",
+            creator_url=None,
+            foreign_landing_url="http://example.com",
+        ),
+        factory.create(
+            skip_es=True,
+            tags=[
+                {"name": "cat", "accuracy": 0.9, "provider": "clarifai"},
+                {"name": "dog"},
+            ],
+        ),
+        factory.create(skip_es=True, tags=None, thumbnail=None),
+        factory.create(skip_es=True, mature_reported=True),
+    ]
+    results[0].fields_matched = ["title", "tags.name"]
+    context = {
+        "request": anon_request,
+        "validated_data": {"peaks": True},
+        "sensitive_text_result_identifiers": {str(results[1].identifier)},
+    }
+    serializer_class = media_type_config.model_serializer
+
+    expected = serializer_class(results, many=True, context=context).data
+    actual = CompiledMediaSerializer(serializer_class(context=context)).serialize(
+        results
+    )
+
+    assert actual == expected
+    # The order of the fields is the same too
+    assert [list(result) for result in actual] == [list(result) for result in expected]
+
+
+def test_get_license_is_none_for_invalid_licenses():
+    assert (
+        get_license("by", "4.0").url == "https://creativecommons.org/licenses/by/4.0/"
+    )
+    assert get_license("not-a-license", None) is None
@@ -8,6 +8,7 @@ from api.constants import sensitivity
 from api.serializers.audio_serializers import AudioSearchRequestSerializer
 from api.serializers.image_serializers import ImageSearchRequestSerializer
 from api.serializers.media_serializers import MediaSearchRequestSerializer
+from api.utils.search_cursor import SearchCursor
 
 
 @pytest.fixture
@@ -136,6 +137,55 @@ def test_search_request_serializer_include_sensitive_results_malformed_request(d
     assert not serializer.is_valid()
 
 
+def test_search_request_serializer_decodes_cursor():
+    cursor = SearchCursor(
+        pit_id="pit-id",
+        search_after=[1.0, "a"],
+        offset=24,
+        depth=20,
+        query_hash="image:hash",
+    )
+    serializer = MediaSearchRequestSerializer(
+        data={"cursor": cursor.encode()}, context={"media_type": "image"}
+    )
+
+    assert serializer.is_valid()
+    assert serializer.validated_data["cursor"] == cursor
+    assert serializer.data["cursor"] == cursor.encode()
+
+
+@pytest.mark.parametrize(
+    "data, error",
+    (
+        pytest.param({"cursor": "not a cursor"}, "Invalid cursor", id="invalid"),
+        pytest.param({"cursor": "*", "page": 2}, "exclusive", id="with_page"),
+    ),
+)
+def test_search_request_serializer_rejects_cursor(data, error):
+    serializer = MediaSearchRequestSerializer(
+        data=data, context={"media_type": "image"}
+    )
+
+    assert not serializer.is_valid()
+    assert error in str(serializer.errors["cursor"])
+
+
+@pytest.mark.parametrize(
+    "depth, has_next_cursor",
+    (
+        pytest.param(220, True, id="within_max_depth"),
+        pytest.param(240, False, id="at_max_depth"),
+    ),
+)
+def test_search_request_serializer_clamps_next_cursor(depth, has_next_cursor):
+    serializer = MediaSearchRequestSerializer(
+        data={"cursor": "*"}, context={"media_type": "image"}
+    )
+    next_cursor = SearchCursor(pit_id="pit-id", offset=depth, depth=depth)
+
+    assert (serializer.clamp_next_cursor(next_cursor) is not None) == has_next_cursor
+
+
 @pytest.mark.django_db
 @patch("django.conf.settings.ES")
 @pytest.mark.parametrize(
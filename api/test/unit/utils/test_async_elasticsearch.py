@@ -0,0 +1,20 @@
+from api.utils.async_elasticsearch import get_async_es_client
+
+
+def test_reuses_client_within_same_loop(get_new_loop):
+    loop = get_new_loop()
+
+    client_1 = loop.run_until_complete(get_async_es_client())
+    client_2 = loop.run_until_complete(get_async_es_client())
+
+    assert client_1 is client_2
+
+
+def test_creates_new_client_for_separate_loops(get_new_loop):
+    loop_1 = get_new_loop()
+    loop_2 = get_new_loop()
+
+    loop_1_client = loop_1.run_until_complete(get_async_es_client())
+    loop_2_client = loop_2.run_until_complete(get_async_es_client())
+
+    assert loop_1_client is not loop_2_client
@@ -1,14 +1,28 @@
 import asyncio
+from collections import Counter
 from collections.abc import Callable
 from typing import Any
+from unittest import mock
 
 import pook
 import pytest
+import structlog
 from aiohttp.client import ClientSession
+from asgiref.sync import async_to_sync
 from elasticsearch_dsl.response import Hit
 from structlog.testing import capture_logs
 
-from api.utils.check_dead_links import HEADERS, check_dead_links
+from api.utils.check_dead_links import HEADERS, _make_head_requests, check_dead_links
+from api.utils.check_dead_links.host_limits import (
+    FAILURES_KEY_PREFIX,
+    OPEN_KEY_PREFIX,
+)
+from api.utils.check_dead_links.status_cache import (
+    CACHE_PREFIX,
+    cache_statuses,
+    get_cached_statuses,
+)
+from api.utils.dead_link_mask import get_query_mask
 from test.factory.es_http import create_mock_es_http_image_hit
 
 
@@ -97,10 +111,10 @@ def test_403_considered_dead(provider):
     "is_cache_reachable, cache_name",
     [(True, "redis"), (False, "unreachable_redis")],
 )
-def test_mset_and_expire_for_responses(is_cache_reachable, cache_name, request):
+def test_caches_responses(is_cache_reachable, cache_name, request):
     cache = request.getfixturevalue(cache_name)
 
-    query_hash = "test_mset_and_expiry_for_responses"
+    query_hash = "test_caches_responses"
     results = _make_hits(40)
     start_slice = 0
 
@@ -115,10 +129,12 @@ def test_mset_and_expire_for_responses(is_cache_reachable, cache_name, request):
         check_dead_links(query_hash, start_slice, results)
 
     if is_cache_reachable:
-        for result in results:
-            assert cache.get(f"valid:{result.url}") == b"200"
-            # TTL is 30 days for 2xx responses
-            assert cache.ttl(f"valid:{result.url}") == 2592000
+        urls = [result.url for result in results]
+        assert get_cached_statuses(cache, urls) == [200] * len(results)
+        for key in cache.keys(f"{CACHE_PREFIX}*"):
+            # 2xx responses are cached for 30 days, in hashes that outlive
+            # them by up to a generation of two expiries
+            assert 2592000 < cache.ttl(key) <= 3 * 2592000
     else:
         messages = [record["event"] for record in cap_logs]
         assert all(
@@ -128,3 +144,159 @@ def test_mset_and_expire_for_responses(is_cache_reachable, cache_name, request):
                 "Redis connect failed, cannot cache link liveness.",
             ]
         )
+
+
+def _mock_head_by_id(monkeypatch, get_status: Callable[[int], int], delay_from: int):
+    """
+    Mock HEAD requests, replying with a status based on the result's id.
+
+    Requests for results from ``delay_from`` onwards never complete in time.
+    """
+
+    async def head(url, session, provider):
+        _id = int(url.rsplit("/", 1)[1])
+        if _id >= delay_from:
+            await asyncio.sleep(60)
+        return url, get_status(_id)
+
+    monkeypatch.setattr("api.utils.check_dead_links._head", head)
+
+
+def test_stops_validating_once_enough_results_are_live(monkeypatch, redis):
+    query_hash = "test_stops_validating_once_enough_results_are_live"
+    results = _make_hits(40)
+    _mock_head_by_id(monkeypatch, lambda _id: 400 if _id == 0 else 200, delay_from=6)
+
+    check_dead_links(query_hash, 0, results, live_needed=5)
+
+    # The first result is dead, so the sixth one completes the page
+    assert [r.id for r in results] == [1, 2, 3, 4, 5]
+    assert list(get_query_mask(query_hash)) == [0, 1, 1, 1, 1, 1]
+    assert get_cached_statuses(redis, [results[0].url]) == [200]
+
+
+def test_validates_all_results_without_live_needed(monkeypatch, redis):
+    query_hash = "test_validates_all_results_without_live_needed"
+    results = _make_hits(40)
+    _mock_head_by_id(monkeypatch, lambda _id: 400 if _id % 2 else 200, delay_from=40)
+
+    check_dead_links(query_hash, 0, results)
+
+    assert len(results) == 20
+    assert len(get_query_mask(query_hash)) == 40
+
+
+def test_stopping_early_keeps_deeper_mask(monkeypatch, redis):
+    query_hash = "test_stopping_early_keeps_deeper_mask"
+    _mock_head_by_id(
+        monkeypatch, lambda _id: 400 if _id % 4 == 0 else 200, delay_from=40
+    )
+
+    # A deeper page validates all of its results
+    check_dead_links(query_hash, 0, _make_hits(40))
+    deeper_mask = list(get_query_mask(query_hash))
+
+    # The first page stops validating once it has enough live results
+    results = _make_hits(40)
+    check_dead_links(query_hash, 0, results, live_needed=5)
+
+    assert len(results) == 5
+    assert list(get_query_mask(query_hash)) == deeper_mask
+
+
+@pook.on
+def test_skips_hosts_with_open_circuit_breaker(redis):
+    query_hash = "test_skips_hosts_with_open_circuit_breaker"
+    results = _make_hits(40)
+    redis.set(f"{OPEN_KEY_PREFIX}example.com", 1)
+
+    # pook fails the test on any unmatched request
+    check_dead_links(query_hash, 0, results)
+
+    # The status of the results is unknown, so they are kept
+    assert len(results) == 40
+    assert list(get_query_mask(query_hash)) == [1] * 40
+
+
+def test_opens_circuit_breaker_after_failures(monkeypatch, redis, settings):
+    settings.LINK_VALIDATION_CIRCUIT_BREAKER_FAILURE_THRESHOLD = 10
+    results = _make_hits(40)
+    _mock_head_by_id(monkeypatch, lambda _id: -2 if _id < 10 else 200, delay_from=40)
+
+    check_dead_links("test_opens_circuit_breaker_after_failures", 0, results)
+
+    assert redis.get(f"{OPEN_KEY_PREFIX}example.com") == b"10"
+    assert redis.get(f"{FAILURES_KEY_PREFIX}example.com") is None
+
+
+def test_records_failures_below_threshold(monkeypatch, redis, settings):
+    settings.LINK_VALIDATION_CIRCUIT_BREAKER_FAILURE_THRESHOLD = 20
+    results = _make_hits(40)
+    _mock_head_by_id(monkeypatch, lambda _id: -1 if _id < 10 else 200, delay_from=40)
+
+    check_dead_links("test_records_failures_below_threshold", 0, results)
+
+    assert redis.get(f"{OPEN_KEY_PREFIX}example.com") is None
+    assert redis.get(f"{FAILURES_KEY_PREFIX}example.com") == b"10"
+    assert redis.ttl(f"{FAILURES_KEY_PREFIX}example.com") > 0
+
+
+@pook.on
+def test_reads_redis_only_on_local_cache_miss(monkeypatch, redis):
+    results = _make_hits(40)
+    _mock_head_by_id(monkeypatch, lambda _id: 200, delay_from=40)
+    check_dead_links("test_reads_redis_only_on_local_cache_miss", 0, results)
+
+    redis.flushall()
+    monkeypatch.setattr(redis, "mget", mock.Mock(side_effect=AssertionError))
+    structlog.contextvars.clear_contextvars()
+    # The statuses are cached in memory, so neither Redis nor the providers
+    # are asked for them again
+    check_dead_links("test_reads_redis_only_on_local_cache_miss", 0, results)
+
+    assert len(results) == 40
+    assert structlog.contextvars.get_contextvars() == {
+        "link_status_local_hits": 40,
+        "link_status_local_misses": 0,
+    }
+
+
+@pook.on
+def test_caches_redis_statuses_locally(redis):
+    results = _make_hits(40)
+    cache_statuses(redis, [(result.url, 200) for result in results])
+    check_dead_links("test_caches_redis_statuses_locally", 0, results)
+
+    redis.flushall()
+    # pook fails the test on any unmatched request
+    check_dead_links("test_caches_redis_statuses_locally", 0, results)
+
+    assert len(results) == 40
+
+
+def test_limits_concurrent_requests_per_host(settings):
+    settings.LINK_VALIDATION_MAX_CONCURRENT_REQUESTS_PER_HOST = 2
+    results = _make_hits(40)
+    in_flight = Counter()
+    max_in_flight = Counter()
+
+    class Session:
+        async def head(self, url, **kwargs):
+            host = url.split("/")[2]
+            in_flight[host] += 1
+            max_in_flight[host] = max(max_in_flight[host], in_flight[host])
+            await asyncio.sleep(0.01)
+            in_flight[host] -= 1
+            return mock.Mock(status=200)
+
+    async def get_session():
+        return Session()
+
+    with mock.patch(
+        "api.utils.check_dead_links.get_aiohttp_session", side_effect=get_session
+    ):
+        async_to_sync(_make_head_requests)(
+            {result.url: idx for idx, result in enumerate(results)}, results
+        )
+
+    assert max_in_flight["example.com"] == 2
@@ -0,0 +1,136 @@
+import pytest
+from elasticsearch_dsl import Search
+
+from api.utils.dead_link_mask import (
+    get_legacy_query_hash,
+    get_query_hash,
+    get_query_mask,
+    migrate_legacy_query_mask,
+    save_query_mask,
+    update_query_mask,
+)
+
+
+QUERY_HASH = "test_query_hash"
+
+
+def test_missing_mask_is_empty(redis):
+    query_mask = get_query_mask(QUERY_HASH)
+
+    assert not query_mask
+    assert query_mask.live_count == 0
+    assert list(query_mask) == []
+
+
+@pytest.mark.parametrize(
+    "mask",
+    (
+        pytest.param([1], id="single_bit"),
+        pytest.param([0, 1, 1, 0, 1], id="less_than_a_byte"),
+        pytest.param([1, 0] * 100, id="spans_bitfield_chunks"),
+    ),
+)
+def test_save_and_get_mask(redis, mask):
+    save_query_mask(QUERY_HASH, mask)
+
+    query_mask = get_query_mask(QUERY_HASH)
+    assert len(query_mask) == len(mask)
+    assert query_mask.live_count == sum(mask)
+    assert list(query_mask) == mask
+
+
+@pytest.mark.parametrize(
+    ("start_slice", "new_mask", "expected_mask"),
+    (
+        pytest.param(4, [0, 1], [1, 1, 0, 1, 0, 1], id="extends_mask"),
+        pytest.param(2, [0, 0], [1, 1, 0, 0, 1], id="keeps_bits_after_new_mask"),
+        pytest.param(10, [0, 1], [1, 1, 0, 1, 1, 0, 1], id="does_not_leave_gaps"),
+    ),
+)
+def test_update_query_mask(redis, start_slice, new_mask, expected_mask):
+    save_query_mask(QUERY_HASH, [1, 1, 0, 1, 1])
+
+    update_query_mask(QUERY_HASH, start_slice, new_mask)
+
+    query_mask = get_query_mask(QUERY_HASH)
+    assert list(query_mask) == expected_mask
+    # Bits beyond the end of the mask must be cleared for the count to be exact
+    assert query_mask.live_count == sum(expected_mask)
+
+
+def test_update_query_mask_without_existing_mask(redis):
+    update_query_mask(QUERY_HASH, 0, [1, 0, 1])
+
+    assert list(get_query_mask(QUERY_HASH)) == [1, 0, 1]
+
+
+def test_live_result_position(redis):
+    mask = [0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 1, 0]
+    save_query_mask(QUERY_HASH, mask)
+
+    query_mask = get_query_mask(QUERY_HASH)
+    assert query_mask.live_result_position(1) == 1
+    assert query_mask.live_result_position(2) == 9
+    assert query_mask.live_result_position(3) == 10
+    with pytest.raises(ValueError):
+        query_mask.live_result_position(4)
+
+
+def test_get_query_mask_redis_unreachable(unreachable_redis):
+    assert not get_query_mask(QUERY_HASH)
+
+
+def test_query_hash_ignores_pagination():
+    s = Search(index="image").query("match", title="bird")
+
+    assert get_query_hash(s[0:20]) == get_query_hash(s[20:60])
+
+
+@pytest.mark.parametrize(
+    "modify",
+    (
+        pytest.param(lambda s: s.source(includes=["identifier"]), id="source"),
+        pytest.param(lambda s: s.extra(track_total_hits=240), id="track_total_hits"),
+    ),
+)
+def test_query_hash_ignores_what_does_not_change_hits(modify):
+    s = Search(index="image").query("match", title="bird")
+
+    assert get_query_hash(s) == get_query_hash(modify(s))
+    assert get_legacy_query_hash(s) == get_legacy_query_hash(modify(s))
+
+
+def test_query_hash_is_independent_of_key_order():
+    a = Search(index="image").query("match", title="bird").sort("created_on")
+    b = Search(index="image").sort("created_on").query("match", title="bird")
+
+    assert get_query_hash(a) == get_query_hash(b)
+
+
+def test_query_hash_differs_for_different_queries():
+    s = Search(index="image")
+
+    assert get_query_hash(s.query("match", title="bird")) != get_query_hash(
+        s.query("match", title="cat")
+    )
+
+
+def test_migrate_legacy_query_mask(redis):
+    s = Search(index="image").query("match", title="bird")
+    # Legacy masks are lists, saved under the DeepHash of the query
+    redis.rpush(f"{get_legacy_query_hash(s)}:dead_link_mask", 0, 1, 1)
+
+    query_mask = migrate_legacy_query_mask(s, get_query_hash(s))
+
+    assert (len(query_mask), query_mask.live_count) == (3, 2)
+    assert list(query_mask) == [0, 1, 1]
+    assert list(get_query_mask(get_query_hash(s))) == [0, 1, 1]
+
+
+def test_migrate_legacy_query_mask_without_legacy_mask(redis):
+    s = Search(index="image").query("match", title="bird")
+
+    query_mask = migrate_legacy_query_mask(s, get_query_hash(s))
+
+    assert not query_mask
+    assert not get_query_mask(get_query_hash(s))
@@ -1,9 +1,23 @@
+import json
+import math
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
 from rest_framework.request import Request
+from rest_framework.response import Response
 from rest_framework.views import APIView
 
 import pytest
+from asgiref.sync import async_to_sync
 
-from api.utils.drf_renderer import BrowsableAPIRendererWithoutForms
+from api.utils.drf_renderer import (
+    BrowsableAPIRendererWithoutForms,
+    ORJSONRenderer,
+    stream_large_response,
+)
 
 
 @pytest.fixture
@@ -62,3 +76,123 @@ def test_without_forms_renderer_get_rendered_html_form_empty(method, api_request
     data = {}
 
     assert cls.get_rendered_html_form(data, view, method, api_request) == ""
+
+
+RENDERED_DATA = {
+    "empty": {},
+    "primitives": {"a": 1, "b": 0.5, "c": None, "d": True, "e": [], "f": ""},
+    "unicode": {"title": 'Żółw 🐢 "quoted" \\ back\nslash', "tags": ["日本"]},
+    "separators": {"title": "line paragraph "},
+    "types": {
+        "uuid": uuid.UUID("8f2f7f00-6d14-4bc2-a2a1-5b4a6a1d3e2f"),
+        "decimal": Decimal("1.50"),
+        "utc": datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+        "naive": datetime(2024, 1, 2, 3, 4, 5),
+        "date": date(2024, 1, 2),
+        "lazy": gettext_lazy("lazy"),
+        "tuple": (1, 2),
+    },
+    "paginated": {
+        "result_count": 3,
+        "page_count": 1,
+        "page_size": 20,
+        "page": 1,
+        "results": [{"id": "a", "tags": [{"name": "cat"}]}, {"id": "b"}, {"id": "c"}],
+    },
+}
+
+
+@pytest.mark.parametrize("data", RENDERED_DATA.values(), ids=RENDERED_DATA.keys())
+def test_orjson_renderer_matches_json_renderer(data):
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+@pytest.mark.parametrize(
+    "value", (0.1, 1.5, 120.0, 3.14159, 123456789.123, 1e-5, 1e20, -2.5e-8)
+)
+def test_orjson_renderer_renders_floats_to_same_values(value):
+    data = {"value": value}
+
+    assert json.loads(ORJSONRenderer().render(data)) == data
+
+
+@pytest.mark.parametrize("value", (0.1, 1.5, 120.0, 3.14159, 123456789.123))
+def test_orjson_renderer_renders_plain_floats_like_json_renderer(value):
+    data = {"value": value}
+
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+@pytest.mark.parametrize("value", (math.nan, math.inf, -math.inf))
+def test_orjson_renderer_renders_non_finite_floats_as_null(value):
+    assert ORJSONRenderer().render({"value": value}) == b'{"value":null}'
+
+
+def test_orjson_renderer_falls_back_for_unsupported_data():
+    data = {"big": 2**70}
+
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_orjson_renderer_falls_back_for_indented_output():
+    data = RENDERED_DATA["paginated"]
+    media_type = "application/json; indent=4"
+
+    assert ORJSONRenderer().render(data, media_type) == JSONRenderer().render(
+        data, media_type
+    )
+
+
+@pytest.mark.parametrize("chunk_size", (1, 2, 3, 20))
+@pytest.mark.parametrize(
+    "data",
+    (
+        RENDERED_DATA["empty"],
+        RENDERED_DATA["paginated"],
+        RENDERED_DATA["paginated"] | {"results": []},
+        {"results": [1, 2, 3], "warnings": ["first"]},
+    ),
+)
+def test_orjson_renderer_chunks_put_together_match_render(data, chunk_size):
+    renderer = ORJSONRenderer()
+
+    assert b"".join(renderer.render_chunks(data, chunk_size)) == renderer.render(data)
+
+
+async def _join(response) -> bytes:
+    return b"".join([chunk async for chunk in response])
+
+
+class ResultsView(APIView):
+    renderer_classes = [ORJSONRenderer]
+
+    def get(self, request):
+        return Response(RENDERED_DATA["paginated"])
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        return stream_large_response(response)
+
+
+@pytest.mark.parametrize(
+    "min_results, is_streamed",
+    (
+        (0, False),
+        (3, True),
+        (4, False),
+    ),
+)
+def test_stream_large_response(settings, api_request, min_results, is_streamed):
+    settings.JSON_CHUNKED_RESPONSE_MIN_RESULTS = min_results
+    settings.JSON_CHUNKED_RESPONSE_CHUNK_SIZE = 2
+
+    response = ResultsView.as_view()(api_request)
+
+    assert response.streaming is is_streamed
+    if is_streamed:
+        # Streamed responses are served asynchronously, by the ASGI handler
+        content = async_to_sync(_join)(response)
+    else:
+        content = response.render().content
+    assert response["Content-Type"] == "application/json"
+    assert content == JSONRenderer().render(RENDERED_DATA["paginated"])
@@ -0,0 +1,130 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+from elasticsearch_dsl.response import Hit
+
+from api.models import Image
+from api.utils.hydration import (
+    DEFERRED_FIELDS,
+    HIT_SOURCE_FIELDS,
+    build_from_hits,
+    get_es_hydration_source_fields,
+    get_fields_matched,
+    hydrate_hits,
+)
+from test.factory.models.image import ImageFactory
+
+
+def _hit(identifier, highlight=None):
+    return SimpleNamespace(
+        identifier=str(identifier), meta=SimpleNamespace(highlight=highlight)
+    )
+
+
+@pytest.mark.django_db
+def test_hydrates_hits_in_order_skipping_missing_rows():
+    images = ImageFactory.create_batch(size=3, skip_es=True)
+    hits = [
+        _hit(images[2].identifier, highlight={"title": ["bird"]}),
+        _hit("00000000-0000-0000-0000-000000000000"),
+        _hit(images[0].identifier),
+        _hit(images[1].identifier),
+    ]
+
+    results = hydrate_hits(Image.objects.all(), hits)
+
+    assert [result.pk for result in results] == [
+        images[2].pk,
+        images[0].pk,
+        images[1].pk,
+    ]
+    assert results[0].fields_matched == {"title": ["bird"]}
+    assert results[1].fields_matched is None
+
+
+@pytest.mark.django_db
+def test_hydrates_license_url_without_loading_deferred_fields():
+    image = ImageFactory.create(
+        skip_es=True, meta_data={"license_url": "https://example.com/license"}
+    )
+    other_image = ImageFactory.create(skip_es=True, meta_data={})
+
+    with CaptureQueriesContext(connection) as queries:
+        results = hydrate_hits(
+            Image.objects.all(),
+            [_hit(image.identifier), _hit(other_image.identifier)],
+        )
+        license_urls = [result.meta_data for result in results]
+
+    assert len(queries) == 1
+    assert license_urls == [{"license_url": "https://example.com/license"}, None]
+
+
+@pytest.mark.django_db
+def test_builds_instances_from_hits_without_queries():
+    source = {
+        "id": 1,
+        "identifier": "4bc43a04-ef46-4544-a0c1-63c63f56e276",
+        "created_on": "2022-02-26T08:48:33+00:00",
+        "title": "Bird",
+        "creator": "Jane",
+        "license": "by",
+        "license_version": "4.0",
+        "license_url": "https://creativecommons.org/licenses/by/4.0/",
+        "mature": True,
+        "height": 500,
+        "extension": "jpg",
+    }
+    hits = [
+        Hit({"_source": source, "highlight": {"title": ["Bird"]}}),
+        Hit({"_source": {**source, "id": 2, "mature": False}}),
+    ]
+
+    with CaptureQueriesContext(connection) as queries:
+        results = build_from_hits(Image, hits)
+        sensitive = [result.sensitive for result in results]
+
+    assert len(queries) == 0
+    assert sensitive == [True, False]
+    image = results[0]
+    assert image.pk == 1
+    assert image.created_on == datetime(2022, 2, 26, 8, 48, 33, tzinfo=timezone.utc)
+    assert image.height == 500
+    assert image.license_url == "https://creativecommons.org/licenses/by/4.0/"
+    assert image.attribution.startswith('"Bird" by Jane is licensed under CC BY 4.0.')
+    assert image.fields_matched == {"title": ["Bird"]}
+    assert results[1].fields_matched is None
+
+
+def test_es_hydration_source_fields_include_fields_read_from_hits():
+    fields = get_es_hydration_source_fields(Image)
+
+    assert set(HIT_SOURCE_FIELDS) <= set(fields)
+    assert {"id", "created_on", "title", "tags", "license_url"} <= set(fields)
+    assert not set(DEFERRED_FIELDS) & set(fields)
+
+
+@pytest.mark.parametrize(
+    "meta",
+    (
+        pytest.param(
+            {"highlight": {"description": ["A <em>bird</em>"], "title": ["Bird"]}},
+            id="highlight",
+        ),
+        pytest.param(
+            {"matched_queries": ["title", "description"]}, id="matched_queries"
+        ),
+    ),
+)
+def test_fields_matched_are_the_same_from_highlight_and_named_queries(meta):
+    hit = Hit({"_source": {}, **meta})
+
+    assert list(get_fields_matched(hit)) == ["description", "title"]
+
+
+def test_fields_matched_are_none_without_highlight_or_named_queries():
+    assert get_fields_matched(Hit({"_source": {}})) is None
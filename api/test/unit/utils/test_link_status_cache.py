@@ -0,0 +1,126 @@
+import time
+from collections import defaultdict
+
+import pytest
+
+from api.utils.check_dead_links.status_cache import (
+    CACHE_PREFIX,
+    LEGACY_CACHE_PREFIX,
+    cache_statuses,
+    decode_status,
+    encode_status,
+    get_cached_statuses,
+    get_url_digest,
+)
+
+
+@pytest.fixture
+def now(monkeypatch):
+    # Redis expires keys by the real time, so the clock must not go back
+    clock = [int(time.time())]
+    monkeypatch.setattr(
+        "api.utils.check_dead_links.status_cache.time.time", lambda: clock[0]
+    )
+    return clock
+
+
+@pytest.mark.parametrize(
+    "status, decoded",
+    [(-2, -2), (-1, -1), (200, 200), (403, 403), (429, 429), (499, 400), (520, 500)],
+)
+def test_encodes_status_as_single_byte(status, decoded):
+    encoded = encode_status(status)
+
+    assert len(encoded) == 1
+    assert decode_status(encoded) == decoded
+
+
+def test_caches_statuses_in_few_hashes(redis):
+    verified = [(f"https://example.com/{idx}", 200) for idx in range(100)]
+    cache_statuses(redis, verified)
+
+    assert len(redis.keys(f"{CACHE_PREFIX}*")) <= 8
+    assert get_cached_statuses(redis, [url for url, _ in verified]) == [200] * 100
+    assert get_cached_statuses(redis, ["https://example.com/other"]) == [None]
+
+
+@pytest.mark.parametrize(
+    "offset, generations",
+    [
+        pytest.param(10, 2, id="rotating"),
+        pytest.param(110, 1, id="not_rotating"),
+    ],
+)
+def test_reads_statuses_in_one_round_trip(
+    redis, settings, monkeypatch, now, offset, generations
+):
+    settings.LINK_VALIDATION_CACHE_EXPIRY_CONFIGURATION = defaultdict(lambda: 100)
+    # Generations of an expiry of 100 seconds last 200 seconds
+    now[0] = now[0] // 200 * 200 + offset
+
+    command_counts = []
+    pipeline = redis.pipeline
+
+    def counting_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        def counting_execute(*args, **kwargs):
+            command_counts.append(len(pipe.command_stack))
+            return execute(*args, **kwargs)
+
+        pipe.execute = counting_execute
+        return pipe
+
+    monkeypatch.setattr(redis, "pipeline", counting_pipeline)
+    urls = [f"https://example.com/{idx}" for idx in range(3)]
+    shards = {
+        get_url_digest(url)[0] % settings.LINK_VALIDATION_CACHE_SHARDS for url in urls
+    }
+
+    get_cached_statuses(redis, urls)
+
+    # One read per live generation of each shard of the URLs, and the legacy keys
+    assert command_counts == [generations * len(shards) + 1]
+
+
+def test_statuses_expire_within_their_expiry(redis, settings, now):
+    expiry_configuration = settings.LINK_VALIDATION_CACHE_EXPIRY_CONFIGURATION
+    settings.LINK_VALIDATION_CACHE_EXPIRY_CONFIGURATION = defaultdict(
+        expiry_configuration.default_factory, {**expiry_configuration, 404: 100}
+    )
+    cache_statuses(redis, [("https://example.com/a", 404)])
+
+    (key,) = redis.keys(f"{CACHE_PREFIX}*")
+    assert 100 < redis.ttl(key) <= 300
+
+    now[0] += 99
+    assert get_cached_statuses(redis, ["https://example.com/a"]) == [404]
+
+    # Expired statuses are not used, even if Redis has not evicted their hash
+    now[0] += 1
+    assert get_cached_statuses(redis, ["https://example.com/a"]) == [None]
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [(-1, 200), (200, -1), (404, 200)],
+)
+def test_uses_most_recent_status(redis, now, first, second):
+    cache_statuses(redis, [("https://example.com/a", first)])
+    now[0] += 60
+    cache_statuses(redis, [("https://example.com/a", second)])
+
+    assert get_cached_statuses(redis, ["https://example.com/a"]) == [second]
+
+
+@pytest.mark.parametrize("legacy_fallback", (True, False))
+def test_falls_back_to_legacy_keys(redis, settings, legacy_fallback):
+    settings.LINK_VALIDATION_CACHE_LEGACY_FALLBACK = legacy_fallback
+    redis.set(f"{LEGACY_CACHE_PREFIX}https://example.com/a", 404)
+    redis.set(f"{LEGACY_CACHE_PREFIX}https://example.com/b", 404)
+    cache_statuses(redis, [("https://example.com/b", 200)])
+
+    assert get_cached_statuses(
+        redis, ["https://example.com/a", "https://example.com/b"]
+    ) == [404 if legacy_fallback else None, 200]
@@ -0,0 +1,57 @@
+import pytest
+
+from api.utils.local_cache import LocalTTLCache
+
+
+@pytest.fixture
+def now(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("api.utils.local_cache.time.monotonic", lambda: clock[0])
+    return clock
+
+
+def test_evicts_least_recently_used():
+    cache = LocalTTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_expires_entries(now):
+    cache = LocalTTLCache(maxsize=10, ttl=60)
+    cache.set("default", 1)
+    cache.set("custom", 2, ttl=10)
+
+    now[0] += 30
+    assert cache.get("default") == 1
+    assert cache.get("custom") is None
+
+    now[0] += 30
+    assert cache.get("default") is None
+    assert len(cache) == 0
+
+
+def test_counts_hits_and_misses():
+    cache = LocalTTLCache(maxsize=10)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    cache.clear()
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+
+def test_zero_size_disables_cache():
+    cache = LocalTTLCache(maxsize=0)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
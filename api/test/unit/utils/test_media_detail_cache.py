@@ -0,0 +1,94 @@
+from unittest import mock
+from uuid import uuid4
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+from api.models import Image, SensitiveImage
+from api.utils.local_cache import clear_local_caches
+from api.utils.media_detail_cache import get_cache_key, get_media, invalidate_media
+from test.factory.models.image import ImageFactory
+
+
+@pytest.fixture(autouse=True)
+def media_detail_cache(settings):
+    settings.MEDIA_DETAIL_CACHE_TTL = 60 * 60
+
+
+def _get(identifier):
+    return get_media(Image.objects.select_related("sensitive_image"), identifier)
+
+
+def _count_queries(func, *args):
+    with CaptureQueriesContext(connection) as queries:
+        result = func(*args)
+    return result, len(queries)
+
+
+@pytest.mark.django_db
+def test_reads_through_memory_and_redis(redis):
+    image = ImageFactory.create(skip_es=True)
+
+    first, first_queries = _count_queries(_get, image.identifier)
+    second, second_queries = _count_queries(_get, image.identifier)
+    clear_local_caches()
+    third, third_queries = _count_queries(_get, image.identifier)
+
+    assert (first_queries, second_queries, third_queries) == (1, 0, 0)
+    assert first.pk == second.pk == third.pk == image.pk
+    # Each read gets its own copy
+    assert first is not second
+    assert not third.sensitive
+    assert redis.exists(get_cache_key("image", image.identifier))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("identifier", [uuid4(), "not-a-uuid"])
+def test_returns_none_for_missing_media(redis, identifier):
+    assert _get(identifier) is None
+    assert not redis.exists(get_cache_key("image", identifier))
+
+
+@pytest.mark.django_db
+def test_invalidate_media_drops_cached_media(redis):
+    image = ImageFactory.create(skip_es=True)
+    _get(image.identifier)
+
+    invalidate_media("image", image.identifier)
+
+    _, queries = _count_queries(_get, image.identifier)
+    assert queries == 1
+
+
+@pytest.mark.django_db
+def test_sensitive_media_hooks_invalidate_cached_media(redis):
+    image = ImageFactory.create(skip_es=True)
+    assert not _get(image.identifier).sensitive
+
+    with mock.patch.object(SensitiveImage, "_update_es"):
+        sensitive = SensitiveImage.objects.create(media_obj=image)
+        assert _get(image.identifier).sensitive
+
+        sensitive.delete()
+        assert not _get(image.identifier).sensitive
+
+
+@pytest.mark.django_db
+def test_reads_from_db_when_redis_is_unreachable(unreachable_redis):
+    image = ImageFactory.create(skip_es=True)
+
+    assert _get(image.identifier).pk == image.pk
+
+
+@pytest.mark.django_db
+def test_reads_from_db_when_disabled(redis, settings):
+    settings.MEDIA_DETAIL_CACHE_TTL = 0
+    image = ImageFactory.create(skip_es=True)
+
+    _, first_queries = _count_queries(_get, image.identifier)
+    _, second_queries = _count_queries(_get, image.identifier)
+
+    assert (first_queries, second_queries) == (1, 1)
+    assert not redis.exists(get_cache_key("image", image.identifier))
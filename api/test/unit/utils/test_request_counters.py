@@ -0,0 +1,42 @@
+import structlog
+
+from api.utils.request_counters import (
+    increment_request_counter,
+    instrument_redis,
+    uninstrument_redis,
+)
+
+
+def test_increment_request_counter():
+    structlog.contextvars.clear_contextvars()
+
+    assert increment_request_counter("things") == 1
+    assert increment_request_counter("things", 2) == 3
+    assert structlog.contextvars.get_contextvars()["things"] == 3
+
+
+def test_counts_redis_round_trips(redis, redis_round_trips):
+    structlog.contextvars.clear_contextvars()
+    # Instrumenting again must not count round trips twice
+    instrument_redis()
+
+    redis.set("key", "value")
+    redis.get("key")
+    pipe = redis.pipeline()
+    pipe.get("key")
+    pipe.get("other")
+    pipe.execute()
+    # Empty pipelines are not sent to Redis
+    redis.pipeline().execute()
+
+    assert structlog.contextvars.get_contextvars()["redis_round_trips"] == 3
+
+
+def test_uninstrumented_redis_round_trips_are_not_counted(redis):
+    structlog.contextvars.clear_contextvars()
+    instrument_redis()
+    uninstrument_redis()
+
+    redis.get("key")
+
+    assert "redis_round_trips" not in structlog.contextvars.get_contextvars()
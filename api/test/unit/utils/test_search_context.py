@@ -1,5 +1,6 @@
 import pook
 import pytest
+from asgiref.sync import async_to_sync
 
 from api.utils.search_context import SearchContext
 
@@ -13,6 +14,14 @@ def test_no_results(media_type_config):
     assert search_context == SearchContext(list(), set())
 
 
+def test_no_results_async(media_type_config):
+    search_context = async_to_sync(SearchContext.abuild)(
+        [], media_type_config.origin_index
+    )
+
+    assert search_context == SearchContext(list(), set())
+
+
 @pytest.mark.parametrize(
     "has_sensitive_text",
     (True, False),
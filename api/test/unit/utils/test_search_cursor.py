@@ -0,0 +1,78 @@
+from django.core import signing
+
+import pytest
+
+from api.utils.search_cursor import (
+    CURSOR_SALT,
+    CURSOR_START,
+    SearchCursor,
+)
+
+
+def test_start_cursor_round_trips():
+    cursor = SearchCursor.decode(CURSOR_START)
+
+    assert cursor.is_start
+    assert cursor.encode() == CURSOR_START
+
+
+def test_cursor_round_trips():
+    cursor = SearchCursor(
+        pit_id="pit-id",
+        search_after=[7.6, "identifier"],
+        offset=12,
+        depth=10,
+        query_hash="image:hash",
+    )
+
+    token = cursor.encode()
+
+    assert "=" not in token
+    assert SearchCursor.decode(token) == cursor
+
+
+def _encode(payload) -> str:
+    return signing.Signer(salt=CURSOR_SALT).sign_object(payload)
+
+
+@pytest.mark.parametrize(
+    "token",
+    (
+        pytest.param("not a cursor", id="not_signed"),
+        pytest.param(_encode(["pit-id"]), id="not_an_object"),
+        pytest.param(_encode({"pit_id": "pit-id", "page": 2}), id="unknown_key"),
+        pytest.param(_encode({"search_after": [1]}), id="no_pit_id"),
+        pytest.param(
+            _encode({"pit_id": "pit-id", "offset": 1, "depth": 2}),
+            id="depth_beyond_offset",
+        ),
+        pytest.param(_encode({"pit_id": "pit-id", "depth": "2"}), id="wrong_type"),
+        pytest.param(_encode({"pit_id": "pit-id"}), id="no_query_hash"),
+    ),
+)
+def test_decode_rejects_invalid_cursors(token):
+    with pytest.raises(ValueError, match="Invalid cursor."):
+        SearchCursor.decode(token)
+
+
+def test_decode_rejects_tampered_cursors():
+    token = SearchCursor(
+        pit_id="pit-id", offset=12, depth=10, query_hash="image:hash"
+    ).encode()
+    _, signature = token.split(":", 1)
+    forged = signing.b64_encode(
+        b'{"pit_id":"pit-id","search_after":[],"offset":1000,"depth":1000,'
+        b'"query_hash":"image:hash"}'
+    ).decode()
+
+    with pytest.raises(ValueError, match="Invalid cursor."):
+        SearchCursor.decode(f"{forged}:{signature}")
+
+
+def test_decode_rejects_cursors_signed_for_other_values():
+    token = signing.Signer().sign_object(
+        {"pit_id": "pit-id", "offset": 1000, "depth": 1000, "query_hash": "image:hash"}
+    )
+
+    with pytest.raises(ValueError, match="Invalid cursor."):
+        SearchCursor.decode(token)
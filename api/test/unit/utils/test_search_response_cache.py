@@ -0,0 +1,108 @@
+import asyncio
+from datetime import datetime, timezone
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from api.utils import search_response_cache
+from api.utils.search_response_cache import (
+    aget_or_compute,
+    get_cache_key,
+    invalidate_search_response_cache,
+)
+from test.factory.models.content_source import ContentSourceFactory
+
+
+@pytest.fixture
+def compute():
+    calls = []
+
+    async def compute():
+        calls.append(None)
+        await asyncio.sleep(0.01)
+        return {"calls": len(calls)}
+
+    compute.calls = calls
+    return compute
+
+
+def _get(compute, key="key"):
+    return async_to_sync(aget_or_compute)("image", key, compute)
+
+
+def test_get_cache_key_ignores_order():
+    assert get_cache_key("image", {"q": "dogs", "page": 1}) == get_cache_key(
+        "image", {"page": 1, "q": "dogs"}
+    )
+    assert get_cache_key("image", {"q": "dogs"}) != get_cache_key(
+        "audio", {"q": "dogs"}
+    )
+
+
+def test_caches_response(compute):
+    assert _get(compute) == {"calls": 1}
+    assert _get(compute) == {"calls": 1}
+    assert _get(compute, key="other") == {"calls": 2}
+
+
+def test_invalidate_ignores_cached_responses(compute):
+    _get(compute)
+    invalidate_search_response_cache("audio")
+    assert _get(compute) == {"calls": 1}
+
+    invalidate_search_response_cache("image")
+    assert _get(compute) == {"calls": 2}
+
+
+def test_serves_stale_response_while_refreshing(compute, settings):
+    settings.SEARCH_RESPONSE_CACHE_TTL = 0
+    _get(compute)
+
+    async def get_stale_then_fresh():
+        stale = await aget_or_compute("image", "key", compute)
+        await asyncio.gather(*search_response_cache._background_tasks)
+        fresh = await aget_or_compute("image", "key", compute)
+        return stale, fresh
+
+    stale, fresh = async_to_sync(get_stale_then_fresh)()
+    assert stale == {"calls": 1}
+    assert fresh == {"calls": 2}
+
+
+def test_computes_concurrent_misses_once(compute):
+    async def get_concurrently():
+        return await asyncio.gather(
+            *(aget_or_compute("image", "key", compute) for _ in range(5))
+        )
+
+    assert async_to_sync(get_concurrently)() == [{"calls": 1}] * 5
+    assert len(compute.calls) == 1
+
+
+def test_does_not_cache_errors(compute):
+    failing_compute = mock.AsyncMock(side_effect=ValueError)
+    with pytest.raises(ValueError):
+        _get(failing_compute)
+
+    # The lock is released, so the next request computes the response at once
+    assert _get(compute) == {"calls": 1}
+
+
+def test_computes_response_without_redis(compute, unreachable_redis):
+    assert _get(compute) == {"calls": 1}
+    assert _get(compute) == {"calls": 2}
+
+
+@pytest.mark.django_db
+def test_content_source_changes_invalidate_cached_responses(compute):
+    source = ContentSourceFactory.create(
+        created_on=datetime.now(tz=timezone.utc),
+        source_identifier="test_content_source_changes",
+        media_type="image",
+    )
+    _get(compute)
+
+    source.filter_content = True
+    source.save()
+    assert _get(compute) == {"calls": 2}
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from api.utils.stage_timing import (
+    StageTimings,
+    clear_stage_histograms,
+    observe_stage_timings,
+    record_stage_timings,
+    render_stage_histograms,
+    time_stage,
+    timed_stage,
+)
+
+
+@pytest.fixture(autouse=True)
+def histograms():
+    clear_stage_histograms()
+    yield
+    clear_stage_histograms()
+
+
+def test_time_stage_is_not_timed_outside_of_recording():
+    with time_stage("es"):
+        pass
+
+    with record_stage_timings() as timings:
+        pass
+
+    assert timings.durations == {}
+
+
+def test_time_stage_sums_repeated_stages_and_times_nested_stages_once():
+    with record_stage_timings() as timings:
+        with time_stage("es"):
+            pass
+        with time_stage("dead_links"):
+            with time_stage("dead_links"), time_stage("es"):
+                pass
+
+    assert list(timings.durations) == ["es", "dead_links"]
+    assert timings.durations["dead_links"] >= timings.durations["es"] > 0
+
+
+def test_timed_stage_times_async_functions():
+    @timed_stage("dead_links")
+    async def check():
+        await asyncio.sleep(0.01)
+        return "checked"
+
+    with record_stage_timings() as timings:
+        assert asyncio.run(check()) == "checked"
+
+    assert timings.durations["dead_links"] >= 0.01
+
+
+def test_server_timing_is_in_milliseconds():
+    timings = StageTimings()
+    timings.durations = {"es": 0.0123, "hydration": 0.004}
+
+    assert timings.server_timing() == "es;dur=12.3, hydration;dur=4.0"
+
+
+def test_render_stage_histograms():
+    timings = StageTimings()
+    for duration in (0.02, 0.2):
+        timings.durations = {"es": duration}
+        observe_stage_timings("list", "image", timings)
+
+    metrics = render_stage_histograms()
+
+    labels = 'endpoint="list",media_type="image",stage="es"'
+    assert "# TYPE openverse_api_stage_duration_seconds histogram" in metrics
+    assert (
+        f'openverse_api_stage_duration_seconds_bucket{{{labels},le="0.01"}} 0'
+        in metrics
+    )
+    assert (
+        f'openverse_api_stage_duration_seconds_bucket{{{labels},le="0.025"}} 1'
+        in metrics
+    )
+    assert (
+        f'openverse_api_stage_duration_seconds_bucket{{{labels},le="0.25"}} 2'
+        in metrics
+    )
+    assert (
+        f'openverse_api_stage_duration_seconds_bucket{{{labels},le="+Inf"}} 2'
+        in metrics
+    )
+    assert f"openverse_api_stage_duration_seconds_count{{{labels}}} 2" in metrics
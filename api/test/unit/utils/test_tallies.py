@@ -127,4 +127,94 @@ def test_writes_error_logs_for_redis_connection_errors(unreachable_redis):
         tallies.count_provider_occurrences(results, FAKE_MEDIA_TYPE)
 
     messages = [record["event"] for record in cap_logs]
-    assert "Redis connect failed, cannot increment provider tallies." in messages
+    assert "Redis connect failed, cannot increment tallies." in messages
+
+
+def test_count_query_occurrence_only_stores_popular_queries(redis, settings):
+    settings.LINK_PREVALIDATION_MIN_QUERY_OCCURRENCES = 2
+    popular_query = {"query": {"match": {"title": "dogs"}}}
+
+    for _ in range(3):
+        tallies.count_query_occurrence(FAKE_MEDIA_TYPE, "popular", popular_query)
+    tallies.count_query_occurrence(FAKE_MEDIA_TYPE, "unpopular", {"query": {}})
+
+    assert redis.get("query:unpopular") is None
+    assert tallies.get_popular_queries(10) == [
+        ("popular", FAKE_MEDIA_TYPE, popular_query)
+    ]
+
+
+def test_get_popular_queries_sums_this_and_last_week(redis, settings):
+    settings.LINK_PREVALIDATION_MIN_QUERY_OCCURRENCES = 1
+
+    with freeze_time(datetime(2023, 1, 12)):
+        for _ in range(3):
+            tallies.count_query_occurrence(FAKE_MEDIA_TYPE, "last_week", {})
+    with freeze_time(datetime(2023, 1, 19)):
+        for _ in range(2):
+            tallies.count_query_occurrence(FAKE_MEDIA_TYPE, "this_week", {})
+        tallies.count_query_occurrence(FAKE_MEDIA_TYPE, "last_week", {})
+
+        assert [query_hash for query_hash, *_ in tallies.get_popular_queries(10)] == [
+            "last_week",
+            "this_week",
+        ]
+        assert len(tallies.get_popular_queries(1)) == 1
+
+
+def test_count_query_occurrence_keeps_most_frequent_queries(redis, settings):
+    settings.LINK_PREVALIDATION_MAX_TALLIED_QUERIES = 2
+
+    now = datetime(2023, 1, 19)  # 16th is start of week
+    with freeze_time(now):
+        for query_hash, occurrences in (("a", 3), ("b", 2), ("c", 1), ("d", 1)):
+            for _ in range(occurrences):
+                tallies.count_query_occurrence(FAKE_MEDIA_TYPE, query_hash, {})
+
+        # Queries are only evicted once there are twice as many as the cap
+        assert redis.zcard("query_occurrences:2023-01-16") == 4
+
+        tallies.count_query_occurrence(FAKE_MEDIA_TYPE, "e", {})
+
+        assert redis.zrange("query_occurrences:2023-01-16", 0, -1) == [b"b", b"a"]
+
+
+def test_count_query_occurrence_keeps_new_popular_queries(redis, settings):
+    settings.LINK_PREVALIDATION_MIN_QUERY_OCCURRENCES = 3
+    settings.LINK_PREVALIDATION_MAX_TALLIED_QUERIES = 2
+
+    with freeze_time(datetime(2023, 1, 19)):
+        for query_hash in ("x", "y", "z"):
+            tallies.count_query_occurrence(FAKE_MEDIA_TYPE, query_hash, {})
+        # A new query that sorts before the others of the same score
+        for _ in range(3):
+            tallies.count_query_occurrence(FAKE_MEDIA_TYPE, "a", {})
+        for query_hash in ("v", "w"):
+            tallies.count_query_occurrence(FAKE_MEDIA_TYPE, query_hash, {})
+
+        assert tallies.get_popular_queries(10) == [("a", FAKE_MEDIA_TYPE, {})]
+
+
+def test_count_occurrences_in_one_round_trip(redis, monkeypatch):
+    command_counts = []
+    pipeline = redis.pipeline
+
+    def counting_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        def counting_execute(*args, **kwargs):
+            command_counts.append(len(pipe.command_stack))
+            return execute(*args, **kwargs)
+
+        pipe.execute = counting_execute
+        return pipe
+
+    monkeypatch.setattr(redis, "pipeline", counting_pipeline)
+    results = [{"provider": "flickr"}, {"provider": "stocksnap"}]
+
+    tallies.count_occurrences(FAKE_MEDIA_TYPE, results, "dogs", {})
+
+    # Two increments per provider, and the increment, expiry and size of the
+    # query tally
+    assert command_counts == [2 * 2 + 3]
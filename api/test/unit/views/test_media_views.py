@@ -1,11 +1,16 @@
 from datetime import datetime, timezone
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
 import pytest
 import pytest_django.asserts
+from elasticsearch_dsl.response import Hit
 
+from api.controllers import search_controller
 from api.models.models import ContentSource
+from api.utils.hydration import HIT_SOURCE_FIELDS, get_es_hydration_source_fields
+from api.utils.search_cursor import SearchCursor
+from api.utils.stage_timing import clear_stage_histograms
 
 
 @pytest.mark.django_db
@@ -26,7 +31,7 @@ def test_list_query_count(api_client, media_type_config):
     )
     with patch(
         "api.views.media_views.search_controller",
-        query_media=MagicMock(return_value=controller_ret),
+        aquery_media=AsyncMock(return_value=controller_ret),
     ), patch(
         "api.serializers.media_serializers.search_controller",
         get_sources=MagicMock(return_value={}),
@@ -36,9 +41,284 @@ def test_list_query_count(api_client, media_type_config):
     assert res.status_code == 200
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize("enabled", (True, False))
+def test_list_times_stages(api_client, media_type_config, settings, enabled):
+    settings.ENABLE_STAGE_TIMING = enabled
+    settings.ENABLE_SERVER_TIMING_HEADER = True
+    settings.STAGE_TIMING_METRICS_TOKEN = "metrics-token"
+    clear_stage_histograms()
+    results = media_type_config.model_factory.create_batch(size=2)
+    for result in results:
+        result.meta = None
+
+    with patch(
+        "api.views.media_views.search_controller",
+        aquery_media=AsyncMock(return_value=(results, 1, 2, {})),
+    ):
+        res = api_client.get(f"/v1/{media_type_config.url_prefix}/")
+    metrics = api_client.get("/metrics/", HTTP_AUTHORIZATION="Bearer metrics-token")
+
+    assert res.status_code == 200
+    if not enabled:
+        assert "Server-Timing" not in res.headers
+        assert metrics.status_code == 404
+        return
+
+    stages = [timing.split(";")[0] for timing in res["Server-Timing"].split(", ")]
+    assert {"total", "hydration", "serialization"} <= set(stages)
+    assert metrics.status_code == 200
+    assert (
+        f'endpoint="list",media_type="{media_type_config.media_type}",'
+        'stage="hydration"'
+    ) in metrics.content.decode()
+
+
+@pytest.mark.django_db
+def test_list_returns_server_timing_only_when_enabled(
+    api_client, media_type_config, settings
+):
+    settings.ENABLE_STAGE_TIMING = True
+    settings.ENABLE_SERVER_TIMING_HEADER = False
+    settings.DEBUG = False
+
+    with patch(
+        "api.views.media_views.search_controller",
+        aquery_media=AsyncMock(return_value=([], 0, 0, {})),
+    ):
+        res = api_client.get(f"/v1/{media_type_config.url_prefix}/")
+
+    assert res.status_code == 200
+    assert "Server-Timing" not in res.headers
+
+
+@pytest.mark.django_db
+def test_list_validates_request_once(
+    api_client, media_type_config, settings, request_counters, redis_round_trips
+):
+    sources = {
+        "aggregations": {
+            "unique_sources": {"buckets": [{"key": "flickr", "doc_count": 1}]}
+        }
+    }
+
+    with patch.object(settings.ES, "search", return_value=sources) as search, patch(
+        "api.views.media_views.search_controller.aquery_media",
+        AsyncMock(return_value=([], 0, 0, {})),
+    ), patch.object(
+        search_controller, "get_sources", wraps=search_controller.get_sources
+    ) as get_sources:
+        for _ in range(2):
+            res = api_client.get(
+                f"/v1/{media_type_config.url_prefix}/", {"source": "flickr"}
+            )
+            assert res.status_code == 200
+
+    # Once per request, to validate ``source``
+    assert get_sources.call_count == 2
+    search.assert_called_once()
+    first, second = request_counters
+    assert first["es_round_trips"] == 1
+    assert "es_round_trips" not in second
+    # Getting and caching the sources, then getting the version of the filtered
+    # sources, and getting and caching them
+    assert first["redis_round_trips"] == 5
+    # Both lists of sources are then read from the memory of the worker
+    assert "redis_round_trips" not in second
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "next_cursor",
+    (
+        pytest.param(
+            SearchCursor(
+                pit_id="pit-id",
+                search_after=[1.0, "a"],
+                offset=48,
+                depth=40,
+                query_hash="image:hash",
+            ),
+            id="more_results",
+        ),
+        pytest.param(None, id="exhausted"),
+    ),
+)
+def test_list_paginates_with_cursor(
+    api_client, media_type_config, settings, next_cursor
+):
+    settings.ENABLE_SEARCH_RESPONSE_CACHE = True
+    cursor = SearchCursor(
+        pit_id="pit-id",
+        search_after=[2.0, "b"],
+        offset=24,
+        depth=20,
+        query_hash="image:hash",
+    )
+
+    with patch(
+        "api.views.media_views.search_controller",
+        aquery_media_with_cursor=AsyncMock(return_value=([], next_cursor, 1000, {})),
+    ) as controller, patch(
+        "api.views.media_views.search_response_cache"
+    ) as search_response_cache:
+        res = api_client.get(
+            f"/v1/{media_type_config.url_prefix}/", {"cursor": cursor.encode()}
+        )
+
+    assert res.status_code == 200
+    data = res.json()
+    assert data["page"] == 2
+    assert data["next_cursor"] == (next_cursor and next_cursor.encode())
+    assert cursor in controller.aquery_media_with_cursor.await_args.args
+    controller.aquery_media.assert_not_called()
+    # Cursors point to a snapshot of the index, so their pages are not cached
+    search_response_cache.aget_or_compute.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_list_rejects_tampered_cursor(api_client, media_type_config):
+    cursor = SearchCursor(
+        pit_id="pit-id",
+        search_after=[2.0, "b"],
+        offset=24,
+        depth=20,
+        query_hash="image:hash",
+    )
+    _, signature = cursor.encode().split(":", 1)
+    # Skip ahead to a depth the client may not reach
+    forged = SearchCursor(
+        pit_id="pit-id", offset=10_000, depth=10_000, query_hash="image:hash"
+    ).encode()
+    payload, _ = forged.split(":", 1)
+
+    with patch(
+        "api.views.media_views.search_controller", aquery_media_with_cursor=AsyncMock()
+    ) as controller:
+        res = api_client.get(
+            f"/v1/{media_type_config.url_prefix}/",
+            {"cursor": f"{payload}:{signature}"},
+        )
+
+    assert res.status_code == 400
+    assert res.json()["detail"] == {
+        "cursor": ["Invalid cursor. Use the `next_cursor` of the previous page."]
+    }
+    controller.aquery_media_with_cursor.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_list_paginated_by_page_has_no_cursor(api_client, media_type_config):
+    with patch(
+        "api.views.media_views.search_controller",
+        aquery_media=AsyncMock(return_value=([], 0, 0, {})),
+    ):
+        res = api_client.get(f"/v1/{media_type_config.url_prefix}/")
+
+    assert res.status_code == 200
+    assert "next_cursor" not in res.json()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("es_only_hydration", (True, False))
+def test_list_fetches_only_fields_needed_for_hydration(
+    api_client, media_type_config, settings, es_only_hydration
+):
+    settings.ENABLE_ES_ONLY_HYDRATION = es_only_hydration
+
+    with patch(
+        "api.views.media_views.search_controller",
+        aquery_media=AsyncMock(return_value=([], 0, 0, {})),
+    ) as controller:
+        res = api_client.get(f"/v1/{media_type_config.url_prefix}/")
+
+    assert res.status_code == 200
+    source_fields = controller.aquery_media.await_args.args[-1]
+    if es_only_hydration:
+        model_class = media_type_config.model_factory._meta.model
+        assert source_fields == get_es_hydration_source_fields(model_class)
+    else:
+        assert source_fields == HIT_SOURCE_FIELDS
+
+
+@pytest.mark.django_db
+def test_list_es_only_hydration_matches_db(api_client, media_type_config, settings):
+    results = media_type_config.model_factory.create_batch(size=2, skip_es=True)
+    for result in results:
+        result.meta = None
+    hits = [
+        Hit(
+            {
+                "_source": {"mature": False}
+                | {
+                    field.attname: getattr(result, field.attname)
+                    for field in result._meta.concrete_fields
+                }
+            }
+        )
+        for result in results
+    ]
+
+    def get_results(controller_results):
+        with patch(
+            "api.views.media_views.search_controller",
+            aquery_media=AsyncMock(return_value=(controller_results, 1, 2, {})),
+        ), patch(
+            "api.serializers.media_serializers.search_controller",
+            get_sources=MagicMock(return_value={}),
+        ):
+            res = api_client.get(f"/v1/{media_type_config.url_prefix}/")
+        assert res.status_code == 200
+        return res.json()["results"]
+
+    db_results = get_results(results)
+    settings.ENABLE_ES_ONLY_HYDRATION = True
+    with pytest_django.asserts.assertNumQueries(0):
+        es_results = get_results(hits)
+
+    assert es_results == db_results
+
+
+@pytest.mark.django_db
+def test_list_uses_search_response_cache(api_client, media_type_config, settings):
+    settings.ENABLE_SEARCH_RESPONSE_CACHE = True
+    results = media_type_config.model_factory.create_batch(size=2, skip_es=True)
+    for result in results:
+        result.meta = None
+
+    url = f"/v1/{media_type_config.url_prefix}/"
+    aquery_media = AsyncMock(return_value=(results, 1, 2, {}))
+    tally_response = MagicMock()
+    with patch(
+        "api.views.media_views.search_controller",
+        aquery_media=aquery_media,
+        tally_response=tally_response,
+    ), patch(
+        "api.serializers.media_serializers.search_controller",
+        get_sources=MagicMock(return_value={}),
+    ):
+        first = api_client.get(url, {"q": "dogs", "filter_dead": True})
+        second = api_client.get(url, {"q": "dogs", "filter_dead": True})
+        api_client.get(url, {"q": "cats", "filter_dead": True})
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert aquery_media.await_count == 2
+    # Responses are tallied after the lookup, even when they are cached
+    assert tally_response.call_count == 3
+    assert all(
+        [result["provider"] for result in call.args[3]]
+        == [result.provider for result in results]
+        for call in tally_response.call_args_list
+    )
+    assert all(call.kwargs["tally"] is False for call in aquery_media.await_args_list)
+
+
 @pytest.mark.django_db
 def test_retrieve_query_count(api_client, media_type_config):
     media = media_type_config.model_factory.create()
+    # The hidden sources are cached for all requests
+    search_controller.get_filtered_sources()
 
     # This number goes up without `select_related` in the viewset queryset.
     with pytest_django.asserts.assertNumQueries(1):
@@ -46,6 +326,12 @@ def test_retrieve_query_count(api_client, media_type_config):
 
     assert res.status_code == 200
 
+    # The media is cached for the following requests
+    with pytest_django.asserts.assertNumQueries(0):
+        res = api_client.get(f"/v1/{media_type_config.url_prefix}/{media.identifier}/")
+
+    assert res.status_code == 200
+
 
 @pytest.mark.parametrize(
     "filter_content", (True, False), ids=lambda x: "filtered" if x else "not_filtered"
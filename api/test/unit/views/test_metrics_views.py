@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ("token", "authorization", "status_code"),
+    (
+        pytest.param("", "Bearer ", 404, id="no_token"),
+        pytest.param("metrics-token", None, 403, id="no_authorization"),
+        pytest.param("metrics-token", "Bearer other", 403, id="wrong_token"),
+        pytest.param("metrics-token", "Bearer metrics-token", 200, id="token"),
+    ),
+)
+def test_metrics_requires_token(
+    api_client, settings, token, authorization, status_code
+):
+    settings.ENABLE_STAGE_TIMING = True
+    settings.STAGE_TIMING_METRICS_TOKEN = token
+    headers = {"HTTP_AUTHORIZATION": authorization} if authorization else {}
+
+    res = api_client.get("/metrics/", **headers)
+
+    assert res.status_code == status_code
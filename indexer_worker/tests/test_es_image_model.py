@@ -44,3 +44,17 @@ class TestImage:
         # Default to not flagged
         sfw = create_mock_image()
         assert not sfw["mature"]
+
+    @staticmethod
+    def test_fields_for_serialization():
+        image = create_mock_image({"tags": [{"name": "cat", "provider": "clarifai"}]})
+        assert image.foreign_landing_url == "https://creativecommons.org"
+        assert image.license_version == "4.0"
+        assert (
+            image.license_url
+            == "https://creativecommons.org/licenses/by/2.0/fr/legalcode"
+        )
+        assert image.height == 500
+        assert image.width == 500
+        assert image.filetype is None
+        assert image.tags[0].to_dict() == {"name": "cat", "provider": "clarifai"}
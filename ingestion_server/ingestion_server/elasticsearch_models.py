@@ -125,8 +125,22 @@ class Media(SyncableDocType):
             "tags": Media.parse_detailed_tags(row[schema["tags"]]),
             # Extra fields, not indexed
             "url": row[schema["url"]],
+            # Extra fields for serializing search results without the DB, not
+            # indexed either
+            "foreign_landing_url": Media.get_column(row, schema, "foreign_landing_url"),
+            "creator_url": Media.get_column(row, schema, "creator_url"),
+            "license_version": Media.get_column(row, schema, "license_version"),
+            "license_url": Media.get_license_url(meta),
+            "thumbnail": Media.get_column(row, schema, "thumbnail"),
+            "filesize": Media.get_column(row, schema, "filesize"),
         }
 
+    @staticmethod
+    def get_column(row, schema, column):
+        """Get the value of the column in the DB row, ``None`` if it is missing."""
+
+        return row[schema[column]] if column in schema else None
+
     @staticmethod
     def parse_description(metadata_field):
         """
@@ -202,6 +216,8 @@ class Media(SyncableDocType):
                 parsed_tag = {"name": tag["name"]}
                 if "accuracy" in tag:
                     parsed_tag["accuracy"] = tag["accuracy"]
+                if "provider" in tag:
+                    parsed_tag["provider"] = tag["provider"]
                 parsed_tags.append(parsed_tag)
         return parsed_tags
 
@@ -248,6 +264,9 @@ class Image(Media):
             aspect_ratio=aspect_ratio,
             extension=extension,
             size=size,
+            height=height,
+            width=width,
+            filetype=Media.get_column(row, schema, "filetype"),
             **attrs,
         )
 
@@ -322,6 +341,14 @@ class Audio(Media):
             length=length,
             filetype=filetype,
             extension=extension,
+            genres=Media.get_column(row, schema, "genres"),
+            alt_files=alt_files,
+            duration=Media.get_column(row, schema, "duration"),
+            bit_rate=Media.get_column(row, schema, "bit_rate"),
+            sample_rate=Media.get_column(row, schema, "sample_rate"),
+            audio_set_foreign_identifier=Media.get_column(
+                row, schema, "audio_set_foreign_identifier"
+            ),
             **attrs,
         )
 
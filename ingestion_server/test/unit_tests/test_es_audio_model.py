@@ -8,3 +8,14 @@ class TestAudio:
         assert single_file.extension == "mp3"
         alt_files = create_mock_audio()
         assert alt_files.extension == ["m4a"]
+
+    @staticmethod
+    def test_fields_for_serialization():
+        audio = create_mock_audio({"audio_set_foreign_identifier": "album"})
+        assert audio.creator_url == "https://freesound.org/people/MartaSarmento"
+        assert audio.filesize == 168919
+        assert audio.genres == ["genre1", "genre2"]
+        assert audio.duration == 8544
+        assert audio.alt_files[0].filetype == "m4a"
+        assert audio.audio_set_foreign_identifier == "album"
+        assert audio.thumbnail is None